@@ -0,0 +1,13 @@
+# file: backend/benchmarks/__init__.py
+#
+# Benchmark API backend. Data sintetis (user, lagu, playlist) dibuat di folder
+# sementara, lalu aplikasi dari myapp.main dijalankan dengan data tersebut:
+# - mode wsgi: request dipanggil in-process lewat webtest (tanpa socket)
+# - mode http: aplikasi dilayani waitress di port lokal, client memakai koneksi keep-alive
+# Hasil (throughput, latensi p50/p95/p99 per route, peak RSS, memori koleksi lagu) disimpan sebagai JSON
+# di benchmarks/results/ agar bisa dibandingkan antar commit.
+#
+# Pemakaian (dari folder backend/, butuh WebTest: pip install -e .[benchmark]):
+#   python -m benchmarks.run --songs 10000 --duration 10
+#   python -m benchmarks.run --songs 1000000 --storage sqlite --mode http --concurrency 16
+#   python -m benchmarks.compare benchmarks/results/A.json benchmarks/results/B.json
@@ -0,0 +1,70 @@
+# file: backend/benchmarks/compare.py
+#
+# Membandingkan dua hasil benchmark (file JSON dari benchmarks.run), per label:
+#   python -m benchmarks.compare benchmarks/results/SEBELUM.json benchmarks/results/SESUDAH.json
+# Perubahan ditampilkan dalam persen; latensi negatif / throughput positif berarti lebih baik.
+
+import argparse
+import sys
+
+from myapp.fastjson import loads
+
+METRICS = (('throughput_rps', 'rps'), ('p50_ms', 'p50'), ('p95_ms', 'p95'), ('p99_ms', 'p99'))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Bandingkan dua hasil benchmark.')
+    parser.add_argument('baseline', help='File JSON hasil sebelum perubahan')
+    parser.add_argument('candidate', help='File JSON hasil sesudah perubahan')
+    return parser.parse_args(argv[1:])
+
+
+def load_result(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def change(old, new):
+    if old is None or new is None:
+        return '-'
+    if old == 0:
+        return 'n/a'
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    baseline = load_result(args.baseline)
+    candidate = load_result(args.candidate)
+
+    for name, result in (('baseline', baseline), ('candidate', candidate)):
+        meta = result['meta']
+        print(f"{name:9}: commit {meta['commit']}, {meta['mode']}/{meta['storage']}, {meta['concurrency']} client, "
+              f"skala {meta['scale']}")
+        if meta['scale'] != baseline['meta']['scale'] or meta['mode'] != baseline['meta']['mode']:
+            print('  PERINGATAN: skala data atau mode berbeda, hasil tidak sebanding.')
+
+    header = f"{'label':34}" + ''.join(f'  {title:>28}' for _, title in METRICS)
+    print(header)
+    print('-' * len(header))
+    rows = sorted(set(baseline['routes']) | set(candidate['routes'])) + ['TOTAL']
+    for label in rows:
+        old = baseline['total'] if label == 'TOTAL' else baseline['routes'].get(label, {})
+        new = candidate['total'] if label == 'TOTAL' else candidate['routes'].get(label, {})
+        cells = []
+        for key, _ in METRICS:
+            old_value, new_value = old.get(key), new.get(key)
+            cells.append(f"{old_value if old_value is not None else '-'} -> "
+                         f"{new_value if new_value is not None else '-'} ({change(old_value, new_value)})")
+        print(f'{label:34}' + ''.join(f'  {cell:>28}' for cell in cells))
+
+    old_rss, new_rss = baseline['peak_rss_mb']['self'], candidate['peak_rss_mb']['self']
+    print(f'Peak RSS: {old_rss} MB -> {new_rss} MB ({change(old_rss, new_rss)})')
+    old_catalog, new_catalog = baseline.get('songs_catalog_mb'), candidate.get('songs_catalog_mb')
+    if old_catalog is not None or new_catalog is not None:
+        print(f'Memori koleksi lagu: {old_catalog} MB -> {new_catalog} MB ({change(old_catalog, new_catalog)})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
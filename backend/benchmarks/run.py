@@ -0,0 +1,373 @@
+# file: backend/benchmarks/run.py
+#
+# Menjalankan benchmark: seed data sintetis -> myapp.main -> login semua user ->
+# beban campuran (lihat scenarios.py) selama --duration detik oleh --concurrency
+# client paralel -> ringkasan per label disimpan sebagai JSON.
+#
+# Contoh (dari folder backend/):
+#   python -m benchmarks.run --songs 100000 --playlists 5000 --duration 20
+#   python -m benchmarks.run --mode http --concurrency 16 --server-threads 8
+#   python -m benchmarks.run --storage sqlite --scenario api_export_songs=1 --scenario api_login=0
+
+import argparse
+import http.client
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from myapp.fastjson import dumps, loads
+
+from .scenarios import SCENARIOS, BenchContext
+from .seed import BENCHMARK_PASSWORD, seed_data, user_email
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark API backend Asyik.in.')
+    parser.add_argument('--songs', type=int, default=10000, help='Jumlah lagu sintetis (1000 .. 1000000)')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--playlists', type=int, default=1000)
+    parser.add_argument('--playlist-size', type=int, default=50, help='Jumlah lagu per playlist')
+    parser.add_argument('--storage', choices=('json', 'sqlite'), default='json')
+    parser.add_argument('--mode', choices=('wsgi', 'http'), default='wsgi',
+                        help='wsgi: in-process lewat webtest; http: lewat waitress di port lokal')
+    parser.add_argument('--concurrency', type=int, default=4, help='Jumlah client paralel')
+    parser.add_argument('--server-threads', type=int, default=4, help='Thread waitress (mode http)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Lama pengukuran (detik)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Beban awal yang tidak diukur (detik)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    parser.add_argument('--bcrypt-pool-size', type=int, default=2)
+    parser.add_argument('--scenario', action='append', default=[], metavar='LABEL=BOBOT',
+                        help=f"Ubah bobot skenario. Label: {', '.join(SCENARIOS)}")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--data-dir', help='Folder data (default: folder sementara yang dihapus setelah selesai)')
+    parser.add_argument('--output', help='File JSON hasil (default: benchmarks/results/<waktu>-<commit>.json)')
+    args = parser.parse_args(argv[1:])
+
+    weights = {label: weight for label, (_, weight) in SCENARIOS.items()}
+    for item in args.scenario:
+        label, _, weight = item.partition('=')
+        if label not in SCENARIOS or not weight.isdigit():
+            parser.error(f'--scenario tidak valid: {item}')
+        weights[label] = int(weight)
+    if not any(weights.values()):
+        parser.error('Minimal satu skenario harus berbobot > 0.')
+    if args.users > args.playlists:
+        # Skenario playlist memakai playlist milik user sendiri (BenchContext.own_playlist):
+        # user tanpa playlist akan meminta /api/playlists/None/... dan dihitung error
+        parser.error('--users tidak boleh lebih besar dari --playlists (setiap user butuh minimal satu playlist).')
+    args.weights = weights
+    return args
+
+
+# --- Client ---
+class WsgiClient:
+    """Memanggil aplikasi WSGI langsung (tanpa socket) lewat webtest."""
+
+    def __init__(self, app):
+        from webtest import TestApp
+        self._app = TestApp(app)
+
+    def request(self, method, path, body, headers):
+        response = self._app.request(path, method=method, body=body or b'', headers=headers, expect_errors=True)
+        return response.status_int, response.body
+
+    def close(self):
+        pass
+
+
+class HttpClient:
+    """Satu koneksi HTTP/1.1 keep-alive per client."""
+
+    def __init__(self, host, port):
+        self._host = host
+        self._port = port
+        self._conn = http.client.HTTPConnection(host, port, timeout=60)
+
+    def request(self, method, path, body, headers):
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # Server menutup koneksi keep-alive: buka ulang sekali
+            self._conn.close()
+            self._conn = http.client.HTTPConnection(self._host, self._port, timeout=60)
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self._conn.close()
+
+
+# --- Statistik ---
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile dari list yang sudah diurutkan."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    """samples: list (latensi detik, status, ukuran body)."""
+    latencies = sorted(latency for latency, _, _ in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 500),
+        'statuses': statuses,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1]) if latencies else None,
+        'mean_bytes': round(sum(size for _, _, size in samples) / len(samples)) if samples else None,
+    }
+
+
+def peak_rss_mb():
+    """Peak RSS proses ini dan proses anak (pool bcrypt), dalam MB."""
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024  # ru_maxrss: byte di macOS, KB di Linux
+    return {
+        'self': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 1),
+        'children': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor, 1),
+    }
+
+
+def deep_size(root):
+    """Perkiraan total byte objek beserta isinya (objek yang dipakai bersama dihitung sekali)."""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+            stack.append(vars(obj))
+    return total
+
+
+def songs_catalog_mb():
+    """Memori koleksi lagu backend json (ALL_SONGS_DB), dalam MB; None untuk backend lain."""
+    from myapp.storage import get_storage
+    catalog = getattr(get_storage(), 'ALL_SONGS_DB', None)
+    if catalog is None:
+        return None
+    return round(deep_size(catalog) / (1024 * 1024), 1)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+# --- Beban ---
+def _worker(make_client, ctx, weights, worker_number, seed, stop_at, measure_from, samples):
+    rng = random.Random(seed * 1000 + worker_number)
+    labels = [label for label, weight in weights.items() if weight > 0]
+    label_weights = [weights[label] for label in labels]
+    client = make_client()
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            label = rng.choices(labels, label_weights)[0]
+            user = rng.randint(1, ctx.users)
+            request = SCENARIOS[label][0](ctx, rng, user)
+            headers = {'Authorization': f'Bearer {ctx.tokens[user]}'}
+            if request.body is not None:
+                headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            status, body = client.request(request.method, request.path, request.body, headers)
+            elapsed = time.perf_counter() - start
+            if start >= measure_from:
+                samples.append((label, elapsed, status, len(body)))
+    finally:
+        client.close()
+
+
+def run_load(make_client, ctx, weights, concurrency, warmup, duration, seed):
+    samples = []  # list.append atomik di CPython, aman dipakai bersama oleh thread client
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    threads = [
+        threading.Thread(target=_worker, args=(make_client, ctx, weights, number, seed, stop_at, measure_from, samples),
+                         name=f'bench-client-{number}', daemon=True)
+        for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - measure_from
+
+
+def login_all(client, ctx):
+    for user in range(1, ctx.users + 1):
+        status, body = client.request(
+            'POST', '/api/login', dumps({'email': user_email(user), 'password': BENCHMARK_PASSWORD}),
+            {'Content-Type': 'application/json'})
+        if status != 200:
+            raise RuntimeError(f'Login {user_email(user)} gagal: {status} {body[:200]!r}')
+        ctx.tokens[user] = loads(body)['token']
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='asyikin-bench-')
+
+    try:
+        t0 = time.perf_counter()
+        scale = seed_data(data_dir, songs=args.songs, users=args.users, playlists=args.playlists,
+                          playlist_size=args.playlist_size, bcrypt_rounds=args.bcrypt_rounds, seed=args.seed)
+        seed_seconds = time.perf_counter() - t0
+        print(f'Data sintetis dibuat di {data_dir} ({seed_seconds:.1f} detik): {scale}')
+
+        # Semua file storage diarahkan ke data_dir sebelum aplikasi dibuat
+        from myapp import json_utils
+        json_utils.DATA_DIR = data_dir
+        from myapp import lifecycle, main as make_app
+        from myapp.fastjson import BACKEND as JSON_BACKEND
+
+        settings = {
+            'myapp.storage': args.storage,
+            'myapp.storage.sqlite_path': os.path.join(data_dir, 'bench.sqlite3'),
+            'myapp.bcrypt.rounds': str(args.bcrypt_rounds),
+            'myapp.bcrypt.pool_size': str(args.bcrypt_pool_size),
+            'myapp.bcrypt.max_pending': str(max(8, args.concurrency * 2)),
+            # Seperti di development.ini: di mode http satu thread waitress selalu bebas dari bcrypt;
+            # di mode wsgi tidak ada thread pool, jadi setiap client boleh menunggu bcrypt
+            'myapp.bcrypt.max_in_flight': str(max(1, args.server_threads - 1) if args.mode == 'http'
+                                              else args.concurrency),
+            'myapp.session.persist': 'false',
+            'myapp.session.max_entries': str(max(10000, args.users * 2)),
+            'myapp.ratelimit.enabled': 'false',  # benchmark sengaja membanjiri endpoint
+            'myapp.warmup': 'true',
+        }
+        t0 = time.perf_counter()
+        app = make_app({}, **settings)
+        create_seconds = time.perf_counter() - t0
+        while not lifecycle.is_ready():
+            time.sleep(0.01)
+        ready_seconds = time.perf_counter() - t0
+        print(f'Aplikasi dibuat dalam {create_seconds:.2f} detik, siap dalam {ready_seconds:.2f} detik')
+
+        server = None
+        if args.mode == 'http':
+            from waitress.server import create_server
+            server = create_server(app, host='127.0.0.1', port=0, threads=args.server_threads)
+            threading.Thread(target=server.run, name='bench-waitress', daemon=True).start()
+            port = server.effective_port
+
+            def make_client():
+                return HttpClient('127.0.0.1', port)
+        else:
+            def make_client():
+                return WsgiClient(app)
+
+        ctx = BenchContext(scale)
+        login_client = make_client()
+        login_all(login_client, ctx)
+        login_client.close()
+
+        print(f'Beban: mode {args.mode}, {args.concurrency} client, warm-up {args.warmup} detik, '
+              f'pengukuran {args.duration} detik')
+        samples, elapsed = run_load(make_client, ctx, args.weights, args.concurrency, args.warmup, args.duration, args.seed)
+        if server is not None:
+            server.close()
+
+        by_label = {}
+        for label, latency, status, size in samples:
+            by_label.setdefault(label, []).append((latency, status, size))
+        result = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'json_backend': JSON_BACKEND,
+                'storage': args.storage,
+                'mode': args.mode,
+                'concurrency': args.concurrency,
+                'server_threads': args.server_threads if args.mode == 'http' else None,
+                'duration_seconds': round(elapsed, 3),
+                'warmup_seconds': args.warmup,
+                'weights': args.weights,
+                'scale': scale,
+            },
+            'startup': {
+                'seed_seconds': round(seed_seconds, 3),
+                'create_app_seconds': round(create_seconds, 3),
+                'ready_seconds': round(ready_seconds, 3),
+                'phases': {name: round(seconds, 4) for name, seconds in lifecycle.startup_phases().items()},
+            },
+            'routes': {label: summarize(by_label[label], elapsed) for label in sorted(by_label)},
+            'total': summarize([(latency, status, size) for _, latency, status, size in samples], elapsed),
+            'peak_rss_mb': peak_rss_mb(),
+            'songs_catalog_mb': songs_catalog_mb(),
+        }
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{result['meta']['commit'] or 'nocommit'}-"
+                                           f"{args.mode}-{args.storage}-{args.songs}.json")
+    with open(output, 'wb') as f:
+        f.write(dumps(result))
+
+    print_summary(result)
+    print(f'Hasil disimpan di {output}')
+    return 0
+
+
+def print_summary(result):
+    header = f"{'label':34} {'req':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>5}"
+    print(header)
+    print('-' * len(header))
+    rows = list(result['routes'].items()) + [('TOTAL', result['total'])]
+    for label, stats in rows:
+        print(f"{label:34} {stats['requests']:>7} {stats['throughput_rps'] or 0:>9.1f} "
+              f"{stats['p50_ms'] or 0:>9.2f} {stats['p95_ms'] or 0:>9.2f} {stats['p99_ms'] or 0:>9.2f} {stats['errors']:>5}")
+    rss = result['peak_rss_mb']
+    print(f"Peak RSS: {rss['self']} MB (pool bcrypt: {rss['children']} MB)")
+    if result.get('songs_catalog_mb') is not None:
+        print(f"Memori koleksi lagu: {result['songs_catalog_mb']} MB")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
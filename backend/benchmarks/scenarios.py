@@ -0,0 +1,91 @@
+# file: backend/benchmarks/scenarios.py
+#
+# Campuran request yang dijalankan benchmark. Setiap skenario diberi label (nama
+# route dari myapp/routes.py, ditambah akhiran jika satu route diuji dengan
+# parameter berbeda) dan bobot: peluang skenario dipilih sebanding dengan bobotnya.
+# Bobot bisa diubah dari command line: --scenario api_export_songs=1
+
+import json
+from collections import namedtuple
+
+from .seed import BENCHMARK_PASSWORD, playlist_id, random_word, song_id, user_email
+
+BenchRequest = namedtuple('BenchRequest', 'method path body')
+
+
+class BenchContext:
+    """Skala data dan token login setiap user (diisi sebelum pengukuran dimulai)."""
+
+    def __init__(self, scale):
+        self.songs = scale['songs']
+        self.users = scale['users']
+        self.playlists = scale['playlists']
+        self.tokens = {}  # {nomor user: token}
+
+    def own_playlist(self, rng, user):
+        # Playlist nomor n dimiliki user ((n - 1) % users) + 1, lihat seed.py
+        owned = (self.playlists - user) // self.users + 1 if user <= self.playlists else 0
+        if owned <= 0:
+            return None
+        return playlist_id(user + self.users * rng.randrange(owned))
+
+    def random_song(self, rng):
+        return song_id(rng.randint(1, self.songs))
+
+
+def _json(data):
+    return json.dumps(data).encode('utf-8')
+
+
+def get_playlists(ctx, rng, user):
+    return BenchRequest('GET', '/api/playlists?limit=50&fields=id,name,song_count', None)
+
+
+def get_playlist_songs(ctx, rng, user):
+    return BenchRequest('GET', f'/api/playlists/{ctx.own_playlist(rng, user)}/songs', None)
+
+
+def stream_playlist_songs(ctx, rng, user):
+    return BenchRequest('GET', f'/api/playlists/{ctx.own_playlist(rng, user)}/songs?format=ndjson', None)
+
+
+def search_songs(ctx, rng, user):
+    return BenchRequest('GET', f'/api/songs/search?limit=20&q={random_word(rng)[:rng.randint(2, 5)]}', None)
+
+
+def add_song_to_playlist(ctx, rng, user):
+    return BenchRequest('POST', f'/api/playlists/{ctx.own_playlist(rng, user)}/songs',
+                        _json({'song_id': ctx.random_song(rng)}))
+
+
+def batch_update_playlist_songs(ctx, rng, user):
+    add = [ctx.random_song(rng) for _ in range(5)]
+    return BenchRequest('PATCH', f'/api/playlists/{ctx.own_playlist(rng, user)}/songs',
+                        _json({'add': add, 'move': [{'song_id': add[0], 'position': 0}]}))
+
+
+def create_playlist(ctx, rng, user):
+    return BenchRequest('POST', '/api/playlists', _json({'name': f'Bench {random_word(rng)}'}))
+
+
+def login(ctx, rng, user):
+    return BenchRequest('POST', '/api/login', _json({'email': user_email(user), 'password': BENCHMARK_PASSWORD}))
+
+
+def export_songs(ctx, rng, user):
+    return BenchRequest('GET', '/api/songs/export?format=ndjson', None)
+
+
+# label -> (fungsi pembuat request, bobot default)
+SCENARIOS = {
+    'api_get_playlists': (get_playlists, 20),
+    'api_get_playlist_songs': (get_playlist_songs, 30),
+    'api_get_playlist_songs:stream': (stream_playlist_songs, 5),
+    'api_search_songs': (search_songs, 20),
+    'api_add_song_to_playlist': (add_song_to_playlist, 8),
+    'api_batch_update_playlist_songs': (batch_update_playlist_songs, 4),
+    'api_create_playlist': (create_playlist, 2),
+    'api_login': (login, 1),
+    # Mengirim seluruh koleksi lagu; aktifkan dengan --scenario api_export_songs=1
+    'api_export_songs': (export_songs, 0),
+}
@@ -0,0 +1,94 @@
+# file: backend/benchmarks/seed.py
+#
+# Membuat users.json, songs.json, playlists.json sintetis di sebuah folder data.
+# File ditulis bertahap (per potongan) sehingga 1 juta lagu tidak perlu
+# dirakit sebagai satu dict besar di memori. Backend sqlite mengisi databasenya
+# dari file-file ini saat pertama dibuka (lihat SQLiteStorage._seed).
+
+import os
+import random
+
+from myapp.fastjson import dumps
+from myapp.passwords import get_crypt_context
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+_SYLLABLES = ('ka', 'ri', 'to', 'me', 'na', 'lo', 'su', 'pa', 'de', 'vi', 'ra', 'mo', 'ne', 'ti', 'ba', 'zu', 'ho', 'ga')
+
+_WRITE_CHUNK = 5000
+
+
+def random_word(rng):
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def user_email(number):
+    return f'user{number}@bench.local'
+
+
+def song_id(number):
+    return f's{number}'
+
+
+def playlist_id(number):
+    return f'pl{number}'
+
+
+def _write_json_object(path, entries):
+    """Menulis {key: value} dari iterable (key, value) tanpa membangun dict-nya."""
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        first = True
+        chunk = []
+        for key, value in entries:
+            chunk.append(dumps(key) + b':' + dumps(value))
+            if len(chunk) >= _WRITE_CHUNK:
+                f.write((b'' if first else b',') + b','.join(chunk))
+                first = False
+                chunk = []
+        if chunk:
+            f.write((b'' if first else b',') + b','.join(chunk))
+        f.write(b'}')
+
+
+def seed_data(data_dir, songs=10000, users=100, playlists=1000, playlist_size=50, bcrypt_rounds=4, seed=1):
+    """
+    Mengisi data_dir dengan data sintetis. Setiap playlist dimiliki user secara
+    bergiliran; sepersepuluh playlist publik. Semua user memakai BENCHMARK_PASSWORD.
+    Mengembalikan ringkasan skala data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # Hash yang sama untuk semua user: seeding tidak menghabiskan waktu di bcrypt
+    password_hash = get_crypt_context(bcrypt_rounds).hash(BENCHMARK_PASSWORD)
+    _write_json_object(os.path.join(data_dir, 'users.json'), (
+        (user_email(number), {'name': f'User {number}', 'password_hash': password_hash})
+        for number in range(1, users + 1)))
+
+    def song_entries():
+        for number in range(1, songs + 1):
+            yield song_id(number), {
+                'id': song_id(number),
+                'title': ' '.join(random_word(rng) for _ in range(3)),
+                'artist': f'{random_word(rng)} {random_word(rng)}',
+                'url': f'https://bench.local/audio/{number}.mp3',
+                'album': random_word(rng),
+                'source': 'jamendo',
+                'original_id': str(number),
+            }
+    _write_json_object(os.path.join(data_dir, 'songs.json'), song_entries())
+
+    def playlist_entries():
+        size = min(playlist_size, songs)
+        for number in range(1, playlists + 1):
+            yield playlist_id(number), {
+                'id': playlist_id(number),
+                'name': f'Playlist {number} {random_word(rng)}',
+                'song_ids': [song_id(song_number) for song_number in rng.sample(range(1, songs + 1), size)],
+                'owner': user_email((number - 1) % users + 1),
+                'public': number % 10 == 0,
+            }
+    _write_json_object(os.path.join(data_dir, 'playlists.json'), playlist_entries())
+
+    return {'songs': songs, 'users': users, 'playlists': playlists, 'playlist_size': playlist_size}
@@ -3,6 +3,8 @@
 from pyramid.config import Configurator
 from pyramid.events import NewResponse
 
+from .lifecycle import startup_phase
+
 def add_cors_headers_response_callback(event):
     """
     Callback untuk event NewResponse, menambahkan header CORS.
@@ -12,7 +14,7 @@ def add_cors_headers_response_callback(event):
 
     event.response.headers.update({
         'Access-Control-Allow-Origin': allowed_origin,
-        'Access-Control-Allow-Methods': 'POST, GET, DELETE, PUT, OPTIONS', # OPTIONS penting untuk pre-flight
+        'Access-Control-Allow-Methods': 'POST, GET, DELETE, PUT, PATCH, OPTIONS', # OPTIONS penting untuk pre-flight
         'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization, X-Requested-With',
         'Access-Control-Allow-Credentials': 'true', # Jika akan menggunakan cookies/session atau Authorization header
         'Access-Control-Max-Age': '3600' # Berapa lama browser bisa cache pre-flight response (detik)
@@ -24,20 +26,66 @@ def main(global_config, **settings):
     Fungsi ini mengembalikan aplikasi WSGI Pyramid.
     """
     config = Configurator(settings=settings)
+    with startup_phase('configure'):
+        _configure(config)
+
+    with startup_phase('scan'):
+        # 4. Pindai @view_config decorators di dalam paket ini (terutama di folder views)
+        # Ini akan otomatis menemukan fungsi-fungsi view kita
+        config.scan()
+
+    # (Opsional) Sertakan pyramid_debugtoolbar jika diinstall dan diinginkan saat development
+    # config.include('pyramid_debugtoolbar') # Pastikan sudah ada di 'requires' setup.py
+
+    with startup_phase('make_wsgi_app'):
+        return config.make_wsgi_app()
 
+
+def _configure(config):
     # 1. Tambahkan event subscriber untuk CORS manual
     # Ini akan memastikan header CORS ditambahkan ke semua response.
     config.add_subscriber(add_cors_headers_response_callback, NewResponse)
 
-    # 2. Sertakan konfigurasi rute (URL) dari file routes.py
-    # Kita akan buat file myapp.routes sebentar lagi
-    config.include('.routes') # Tanda '.' berarti relatif terhadap paket 'myapp'
+    # Logging asinkron (QueueHandler) untuk logger 'myapp', level dari [logger_myapp]
+    config.include('.logs')
 
-    # 3. Pindai @view_config decorators di dalam paket ini (terutama di folder views)
-    # Ini akan otomatis menemukan fungsi-fungsi view kita
-    config.scan()
+    # Metrik latensi/status/ukuran per route + waktu storage/serialisasi/bcrypt di GET /metrics
+    config.include('.metrics')
 
-    # (Opsional) Sertakan pyramid_debugtoolbar jika diinstall dan diinginkan saat development
-    # config.include('pyramid_debugtoolbar') # Pastikan sudah ada di 'requires' setup.py
+    # Rate limit token bucket per route (IP/akun/user) sebelum view dijalankan
+    config.include('.ratelimit')
+
+    # Renderer 'json' cepat (orjson jika terpasang) + cache bytes JSON per lagu
+    config.include('.renderers')
+
+    # 2. Pilih dan siapkan backend storage (json/sqlite) dari settings development.ini
+    config.include('.storage')
+
+    # Pool proses untuk bcrypt (hash/verify password), ukuran & cost dari settings
+    config.include('.passwords')
+
+    # Security policy berbasis token Bearer + session store (TTL/LRU), mengisi request.user
+    config.include('.security')
+
+    # Token URL bertanda tangan berumur pendek untuk <audio src> dan EventSource (tanpa header)
+    config.include('.url_tokens')
+
+    # Change feed SSE (opsional): publish event perubahan playlist + sidecar asyncio untuk /api/events
+    config.include('.events')
+
+    # Mode multi-proses (opsional): sesi & versi ETag di SQLite bersama, cache per proses diinvalidasi
+    config.include('.shared_state')
+
+    # File audio lokal untuk GET /api/songs/{song_id}/stream (direktori media dari settings)
+    config.include('.media')
+
+    # Proxy pencarian Jamendo: pool koneksi keep-alive + cache TTL/LRU
+    config.include('.external_search')
+
+    # Warm-up di background (storage + index pencarian) dan GET /api/ready
+    config.include('.lifecycle')
+
+    # 3. Sertakan konfigurasi rute (URL) dari file routes.py
+    # Kita akan buat file myapp.routes sebentar lagi
+    config.include('.routes') # Tanda '.' berarti relatif terhadap paket 'myapp'
 
-    return config.make_wsgi_app()
\ No newline at end of file
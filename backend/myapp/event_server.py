@@ -0,0 +1,294 @@
+# file: backend/myapp/event_server.py
+#
+# Sidecar SSE untuk GET /api/events (lihat myapp/events.py).
+# Waitress melayani satu request per thread, jadi stream yang terbuka lama akan
+# memakan satu thread per tab browser. Sidecar ini berjalan di satu thread dengan
+# event loop asyncio sendiri dan port sendiri (myapp.events.port); ribuan koneksi
+# cukup dilayani satu loop. Di depan, reverse proxy (atau proxy dev server Vite, lihat
+# frontend/vite.config.js) meneruskan /api/events ke port ini.
+#
+# Alur:
+# - Client tersambung dengan ?token=<token URL dari POST /api/event-token> (EventSource
+#   tidak bisa mengirim header Authorization, dan token login tidak boleh masuk URL) dan
+#   opsional header Last-Event-ID / ?last_event_id=.
+# - Event log membangunkan loop lewat listener (call_soon_threadsafe) setiap ada event
+#   baru; untuk log SQLite bersama, loop juga mem-poll setiap poll_interval.
+# - Setiap client punya antrean terbatas. Client yang terlalu lambat membaca
+#   (antrean penuh) diputus; browser tersambung ulang dengan Last-Event-ID dan
+#   event yang tertinggal diputar ulang dari log.
+#
+# Pada mode multi-proses hanya worker pertama yang berhasil bind port yang menjalankan
+# sidecar; worker lain cukup menulis event ke log SQLite bersama.
+
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+from urllib.parse import parse_qs, urlsplit
+
+from .events import format_event_id, format_sse, parse_event_id
+from .fastjson import dumps
+from .metrics import registry
+from .url_tokens import EVENTS_SCOPE, get_url_token_signer
+
+log = logging.getLogger(__name__)
+
+registry.describe('myapp_sse_clients', 'gauge', 'Jumlah client SSE yang sedang tersambung.')
+registry.describe('myapp_sse_disconnects_total', 'counter', 'Client SSE yang diputus server per alasan.')
+
+EVENTS_PATH = '/api/events'
+CLIENT_QUEUE_SIZE = 256
+REQUEST_TIMEOUT = 10
+# Client yang tidak membaca sama sekali (buffer socket penuh) diputus setelah sekian detik
+DRAIN_TIMEOUT = 30
+MAX_HEADER_BYTES = 16384
+RECONNECT_DELAY_MS = 3000
+
+_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found',
+            405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+# Item antrean client selain Event: log terlewat, client harus memuat ulang semua data
+_Reset = namedtuple('_Reset', 'seq')
+
+
+def _visible(event, email):
+    # Sama dengan _can_view di views/playlist_views.py
+    return event.owner is None or event.owner == email or event.public
+
+
+async def _drain(writer):
+    await asyncio.wait_for(writer.drain(), DRAIN_TIMEOUT)
+
+
+class _Client:
+    def __init__(self, email):
+        self.email = email
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, item):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventServer:
+    def __init__(self, event_log, host='127.0.0.1', port=6544, heartbeat=15.0, max_clients=1000,
+                 allow_origin='http://localhost:5173'):
+        self.event_log = event_log
+        self.host = host
+        self.port = port
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.allow_origin = allow_origin
+        self._clients = set()
+        self._loop = None
+        self._wake = None
+        self._started = threading.Event()
+        self._start_error = None
+
+    def start(self):
+        """Menjalankan loop di thread daemon. True jika port berhasil di-bind."""
+        threading.Thread(target=self._run, name='sse-server', daemon=True).start()
+        self._started.wait()
+        return self._start_error is None
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+        finally:
+            loop.close()
+
+    async def _serve(self):
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port, reuse_address=True)
+        except OSError as e:
+            self._start_error = e
+            self._started.set()
+            # Biasanya port sudah dipakai sidecar worker lain (mode multi-proses)
+            log.info('Sidecar SSE tidak dijalankan di proses ini: %s', e, extra={'host': self.host, 'port': self.port})
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._wake = asyncio.Event()
+        self.event_log.add_listener(self._notify)
+        self._started.set()
+        log.info('Sidecar SSE berjalan', extra={'host': self.host, 'port': self.port})
+        async with server:
+            await self._pump()
+
+    def _notify(self):
+        # Dipanggil dari thread waitress (publish); loop dibangunkan dengan aman antar-thread
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _call_log(self, method, *args):
+        if self.event_log.poll_interval is None:
+            return method(*args)
+        # Log SQLite: query dijalankan di thread pool agar loop tidak ikut menunggu disk
+        return await self._loop.run_in_executor(None, method, *args)
+
+    async def _read_since(self, seq):
+        return await self._call_log(self.event_log.read_since, seq)
+
+    async def _last_seq(self):
+        return await self._call_log(self.event_log.last_seq)
+
+    async def _pump(self):
+        """Membaca event baru dari log dan membagikannya ke semua client."""
+        last_seq = await self._last_seq()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.event_log.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                events = await self._read_since(last_seq)
+            except Exception:
+                log.exception('Gagal membaca event log')
+                continue
+            if events is None:
+                # Loop ini sendiri tertinggal lebih dari isi buffer: semua client harus memuat ulang
+                log.warning('Event log terlewat, semua client SSE di-reset', extra={'last_seq': last_seq})
+                last_seq = await self._last_seq()
+                for client in self._clients:
+                    client.offer(_Reset(last_seq))
+                continue
+            for event in events:
+                for client in self._clients:
+                    if _visible(event, client.email):
+                        client.offer(event)
+                last_seq = event.seq
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        try:
+            await self._handle_request(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        except Exception:
+            log.exception('Error tak terduga di sidecar SSE')
+        finally:
+            writer.close()
+
+    def _headers(self, status, content_type, extra=()):
+        lines = [f'HTTP/1.1 {status} {_REASONS[status]}',
+                 f'Content-Type: {content_type}',
+                 f'Access-Control-Allow-Origin: {self.allow_origin}',
+                 'Access-Control-Allow-Credentials: true',
+                 'Vary: Origin']
+        lines.extend(extra)
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _respond_json(self, writer, status, payload, extra=()):
+        body = dumps(payload)
+        writer.write(self._headers(status, 'application/json',
+                                   (f'Content-Length: {len(body)}', 'Connection: close', *extra)) + body)
+        await _drain(writer)
+
+    async def _handle_request(self, reader, writer):
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), REQUEST_TIMEOUT)
+        if len(head) > MAX_HEADER_BYTES:
+            await self._respond_json(writer, 400, {'error': 'Header request terlalu besar.'})
+            return
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            await self._respond_json(writer, 400, {'error': 'Request tidak valid.'})
+            return
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path != EVENTS_PATH:
+            await self._respond_json(writer, 404, {'error': 'Tidak ditemukan.'})
+            return
+        if method == 'OPTIONS':
+            writer.write(self._headers(204, 'text/plain', (
+                'Access-Control-Allow-Methods: GET, OPTIONS',
+                'Access-Control-Allow-Headers: Last-Event-ID, Cache-Control',
+                'Access-Control-Max-Age: 3600', 'Content-Length: 0', 'Connection: close')))
+            await _drain(writer)
+            return
+        if method != 'GET':
+            await self._respond_json(writer, 405, {'error': 'Hanya GET yang didukung.'}, ('Allow: GET, OPTIONS',))
+            return
+
+        params = parse_qs(url.query)
+        token = params.get('token', [None])[0]
+        # Token URL bertanda tangan: cukup cek HMAC, tanpa akses session store
+        email = get_url_token_signer().verify(token, EVENTS_SCOPE) if token else None
+        if email is None:
+            await self._respond_json(writer, 401, {'error': 'Parameter token tidak ada, tidak valid, atau sudah kedaluwarsa.'})
+            return
+        if len(self._clients) >= self.max_clients:
+            registry.inc('myapp_sse_disconnects_total', (('reason', 'max_clients'),))
+            await self._respond_json(writer, 503, {'error': 'Terlalu banyak koneksi event. Coba lagi nanti.'},
+                                     ('Retry-After: 5',))
+            return
+
+        last_event_id = headers.get('last-event-id') or params.get('last_event_id', [None])[0]
+        await self._stream(writer, email, last_event_id)
+
+    async def _stream(self, writer, email, last_event_id):
+        client = _Client(email)
+        # Didaftarkan sebelum backlog dibaca: event yang masuk di antaranya tidak hilang
+        # (yang dobel dilewati lewat sent_seq)
+        self._clients.add(client)
+        registry.set('myapp_sse_clients', len(self._clients))
+        epoch = self.event_log.epoch
+        try:
+            writer.write(self._headers(200, 'text/event-stream; charset=utf-8', (
+                'Cache-Control: no-cache', 'Connection: keep-alive', 'X-Accel-Buffering: no')))
+            writer.write(f'retry: {RECONNECT_DELAY_MS}\n\n'.encode('ascii'))
+
+            sent_seq = await self._last_seq()
+            resume_seq = parse_event_id(last_event_id, epoch)
+            backlog = []
+            if resume_seq is not None:
+                backlog = await self._read_since(resume_seq)
+            if backlog is None or (last_event_id and resume_seq is None):
+                # Last-Event-ID terlalu lama atau dari proses sebelum restart
+                writer.write(format_sse('reset', dumps({'reason': 'expired'}), format_event_id(epoch, sent_seq)))
+            elif resume_seq is not None:
+                for event in backlog:
+                    if _visible(event, email):
+                        writer.write(format_sse(event.type, event.data, format_event_id(epoch, event.seq)))
+                sent_seq = max([resume_seq] + [event.seq for event in backlog])
+            # ID awal untuk client baru, supaya reconnect berikutnya bisa melanjutkan dari sini
+            writer.write(format_sse('ready', dumps({'email': email}), format_event_id(epoch, sent_seq)))
+            await _drain(writer)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(client.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    if client.overflowed:
+                        break
+                    writer.write(b': ping\n\n')
+                    await _drain(writer)
+                    continue
+                if isinstance(item, _Reset):
+                    sent_seq = item.seq
+                    writer.write(format_sse('reset', dumps({'reason': 'expired'}), format_event_id(epoch, sent_seq)))
+                elif item.seq > sent_seq:
+                    writer.write(format_sse(item.type, item.data, format_event_id(epoch, item.seq)))
+                    sent_seq = item.seq
+                if client.overflowed and client.queue.empty():
+                    break
+                await _drain(writer)
+            registry.inc('myapp_sse_disconnects_total', (('reason', 'slow_client'),))
+            log.info('Client SSE terlalu lambat, koneksi diputus', extra={'email': email})
+        finally:
+            self._clients.discard(client)
+            registry.set('myapp_sse_clients', len(self._clients))
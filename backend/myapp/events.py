@@ -0,0 +1,208 @@
+# file: backend/myapp/events.py
+#
+# Change feed untuk client: perubahan playlist dikirim sebagai event kecil lewat
+# server-sent events (GET /api/events), jadi frontend tidak perlu me-refetch
+# /api/playlists dan daftar lagu setiap kali ada perubahan.
+#
+# View yang mengubah data memanggil publish(...) setelah perubahan tersimpan. Event
+# masuk ke event log dengan nomor urut (seq) yang naik terus; sidecar SSE
+# (myapp/event_server.py, asyncio di thread sendiri) membaca event baru dari log dan
+# mengirimkannya ke client yang boleh melihat playlist tersebut.
+#
+# ID event di stream: '<epoch>-<seq>'. Client yang tersambung ulang mengirim
+# Last-Event-ID; event setelah ID itu diputar ulang dari log. Jika ID terlalu lama
+# (sudah keluar dari buffer) atau epoch-nya berbeda (proses restart), client menerima
+# event 'reset' dan harus memuat ulang semua data.
+#
+# EventSource tidak bisa mengirim header Authorization, dan token login tidak boleh masuk
+# URL. Frontend meminta token URL berumur pendek lewat POST /api/event-token (lihat
+# myapp/url_tokens.py), lalu membuka GET /api/events?token=... . Token hanya dicek saat
+# tersambung; jika sudah kedaluwarsa saat EventSource tersambung ulang, client meminta
+# token baru dan melanjutkan dengan ?last_event_id=.
+#
+# Jenis event (data berupa JSON):
+#   playlist_created        {"playlist": {id, name, owner, public, song_count}}
+#   playlist_updated        {"playlist": {id, name, owner, public, song_count}}
+#   playlist_deleted        {"playlist_id": ...}
+#   song_added              {"playlist_id": ..., "song": {...}, "position": n, "song_count": n}
+#   song_removed            {"playlist_id": ..., "song_id": ..., "song_count": n}
+#   playlist_songs_updated  {"playlist_id": ..., "added": n, "removed": n, "moved": n, "song_count": n}
+#
+# Event log default (MemoryEventLog) hanya hidup di memori proses ini. Pada mode
+# multi-proses (myapp.shared_state) log diganti tabel SQLite bersama (lihat
+# myapp/shared_state.py), sehingga satu sidecar melihat perubahan dari semua worker.
+#
+# Setting di development.ini:
+#   myapp.events.enabled = false         (true: aktifkan publish + sidecar SSE)
+#   myapp.events.host = 127.0.0.1
+#   myapp.events.port = 6544
+#   myapp.events.buffer_size = 1000      (event terakhir yang bisa diputar ulang)
+#   myapp.events.heartbeat = 15          (detik, komentar ping agar koneksi tidak diputus proxy)
+#   myapp.events.max_clients = 1000
+#   myapp.events.allow_origin = http://localhost:5173
+#   myapp.events.token_ttl = 60          (detik, umur token URL dari POST /api/event-token)
+
+import logging
+import threading
+from collections import deque, namedtuple
+
+from pyramid.events import ApplicationCreated
+
+from .fastjson import dumps
+from .metrics import registry
+from .url_tokens import EVENTS_SCOPE, get_url_token_signer
+from .versions import PROCESS_EPOCH
+
+log = logging.getLogger(__name__)
+
+registry.describe('myapp_events_published_total', 'counter', 'Jumlah event change feed per jenis.')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 6544
+DEFAULT_BUFFER_SIZE = 1000
+DEFAULT_HEARTBEAT = 15.0
+DEFAULT_MAX_CLIENTS = 1000
+DEFAULT_ALLOW_ORIGIN = 'http://localhost:5173'
+DEFAULT_TOKEN_TTL = 60
+
+# owner/public menentukan siapa yang menerima event (sama dengan aturan _can_view di
+# views/playlist_views.py); data sudah berupa bytes JSON
+Event = namedtuple('Event', 'seq type data owner public')
+
+
+class MemoryEventLog:
+    """Ring buffer event di memori proses. Listener dipanggil setiap ada event baru."""
+
+    # Sidecar tidak perlu polling: setiap append langsung membangunkannya lewat listener
+    poll_interval = None
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.epoch = PROCESS_EPOCH
+        self.buffer_size = buffer_size
+        self._events = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def append(self, event_type, data, owner, public):
+        with self._lock:
+            self._seq += 1
+            self._events.append(Event(self._seq, event_type, dumps(data), owner, public))
+        for listener in self._listeners:
+            listener()
+
+    def last_seq(self):
+        return self._seq
+
+    def read_since(self, seq):
+        """Event dengan nomor > seq, atau None jika sebagian sudah keluar dari buffer."""
+        with self._lock:
+            if seq > self._seq:
+                return None
+            oldest = self._events[0].seq if self._events else self._seq + 1
+            if seq < oldest - 1:
+                return None
+            return [event for event in self._events if event.seq > seq]
+
+
+_event_log = None
+_token_ttl = DEFAULT_TOKEN_TTL
+
+
+def set_event_log(event_log):
+    global _event_log
+    _event_log = event_log
+
+
+def get_event_log():
+    """Event log aktif, atau None jika change feed dimatikan."""
+    return _event_log
+
+
+def events_token(email):
+    """(token URL untuk GET /api/events?token=..., umurnya dalam detik)."""
+    return get_url_token_signer().sign(EVENTS_SCOPE, email, _token_ttl), _token_ttl
+
+
+def publish(event_type, data, owner=None, public=False):
+    """
+    Menambahkan event ke change feed (no-op jika dimatikan). Kegagalan hanya dicatat:
+    perubahan data sudah tersimpan, client paling buruk ketinggalan satu event.
+    """
+    event_log = _event_log
+    if event_log is None:
+        return
+    try:
+        event_log.append(event_type, data, owner, public)
+    except Exception:
+        log.exception('Gagal mempublikasikan event', extra={'event_type': event_type})
+        return
+    registry.inc('myapp_events_published_total', (('type', event_type),))
+
+
+def playlist_summary(playlist):
+    """Bentuk playlist di event (tanpa song_ids yang bisa sangat panjang)."""
+    return {
+        'id': playlist['id'],
+        'name': playlist['name'],
+        'owner': playlist.get('owner'),
+        'public': playlist.get('public', False),
+        'song_count': len(playlist['song_ids']),
+    }
+
+
+def format_event_id(epoch, seq):
+    return f'{epoch}-{seq}'
+
+
+def parse_event_id(event_id, epoch):
+    """seq dari Last-Event-ID, atau None jika tidak valid / berasal dari epoch lain."""
+    if not event_id:
+        return None
+    event_epoch, _, seq = event_id.strip().rpartition('-')
+    if event_epoch != epoch or not (seq.isascii() and seq.isdigit()):
+        return None
+    return int(seq)
+
+
+def format_sse(event_type, data, event_id=None):
+    """Satu pesan SSE (bytes). data berupa bytes JSON satu baris."""
+    lines = []
+    if event_id is not None:
+        lines.append(b'id: ' + event_id.encode('ascii'))
+    lines.append(b'event: ' + event_type.encode('ascii'))
+    lines.append(b'data: ' + data)
+    return b'\n'.join(lines) + b'\n\n'
+
+
+def _start_event_server(settings):
+    # Import di sini: asyncio & server hanya dimuat jika change feed aktif
+    from .event_server import EventServer
+
+    def start(event):
+        server = EventServer(
+            get_event_log(),
+            host=settings.get('myapp.events.host', DEFAULT_HOST),
+            port=int(settings.get('myapp.events.port', DEFAULT_PORT)),
+            heartbeat=float(settings.get('myapp.events.heartbeat', DEFAULT_HEARTBEAT)),
+            max_clients=int(settings.get('myapp.events.max_clients', DEFAULT_MAX_CLIENTS)),
+            allow_origin=settings.get('myapp.events.allow_origin', DEFAULT_ALLOW_ORIGIN),
+        )
+        server.start()
+    return start
+
+
+def includeme(config):
+    global _token_ttl
+    settings = config.get_settings()
+    _token_ttl = int(settings.get('myapp.events.token_ttl', DEFAULT_TOKEN_TTL))
+    if settings.get('myapp.events.enabled', 'false').strip().lower() not in ('true', '1', 'yes', 'on'):
+        set_event_log(None)
+        return
+    set_event_log(MemoryEventLog(int(settings.get('myapp.events.buffer_size', DEFAULT_BUFFER_SIZE))))
+    # Sidecar dimulai setelah aplikasi dibuat, sehingga event log pengganti dari
+    # myapp.shared_state (di-include sesudah modul ini) sudah terpasang
+    config.add_subscriber(_start_event_server(settings), ApplicationCreated)
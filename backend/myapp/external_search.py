@@ -0,0 +1,253 @@
+# file: backend/myapp/external_search.py
+#
+# Proxy pencarian lagu ke API eksternal (Jamendo) lewat backend, supaya client ID
+# tidak perlu dikirim ke browser dan hasil pencarian yang sama bisa dipakai bersama.
+# - Koneksi HTTP keep-alive dipakai ulang dari pool (per upstream), tidak membuka
+#   koneksi TCP/TLS baru untuk setiap pencarian.
+# - Jumlah request bersamaan ke satu upstream dibatasi (max_concurrency). Jika slot
+#   tidak didapat dalam `timeout` detik, view membalas 503 + Retry-After.
+# - Hasil disimpan di cache TTL + LRU (di memori proses).
+# - Query identik yang sedang berjalan digabung: hanya satu request ke upstream,
+#   request lain menunggu hasil yang sama.
+#
+# Setting di development.ini:
+#   myapp.external_search.base_url = https://api.jamendo.com/v3.0
+#   myapp.external_search.client_id = ...      (atau environment variable JAMENDO_CLIENT_ID)
+#   myapp.external_search.timeout = 5          (detik, connect/read & menunggu slot)
+#   myapp.external_search.max_concurrency = 4  (request bersamaan ke upstream)
+#   myapp.external_search.cache_ttl = 300      (detik)
+#   myapp.external_search.cache_max_entries = 1000
+#
+# base_url bisa diarahkan ke server palsu lokal (lihat myapp/scripts/fake_jamendo.py)
+# untuk development/testing tanpa internet.
+
+import http.client
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_BASE_URL = 'https://api.jamendo.com/v3.0'
+DEFAULT_TIMEOUT = 5
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_MAX_ENTRIES = 1000
+
+# Field hasil Jamendo yang dipakai frontend (MainPage.jsx); sisanya tidak disimpan di cache
+TRACK_FIELDS = ('id', 'name', 'artist_name', 'album_name', 'image', 'audio', 'audiodownload', 'duration')
+
+
+class ExternalSearchError(Exception):
+    """Upstream gagal/timeout atau membalas data yang tidak valid (dibalas 502 oleh view)."""
+
+
+class ExternalSearchBusy(ExternalSearchError):
+    """Semua slot ke upstream sedang terpakai. View sebaiknya membalas 503 dengan header Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Upstream sedang sibuk, coba lagi dalam {retry_after} detik.')
+        self.retry_after = retry_after
+
+
+class HTTPConnectionPool:
+    """Pool koneksi keep-alive ke satu upstream, dengan batas request bersamaan."""
+
+    def __init__(self, base_url, max_connections=DEFAULT_MAX_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"base_url upstream tidak valid: '{base_url}'")
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle = []  # koneksi yang siap dipakai ulang (LIFO)
+        self._idle_lock = threading.Lock()
+
+    def _checkout(self):
+        with self._idle_lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connection_class(self._host, self._port, timeout=self.timeout), False
+
+    def _checkin(self, conn):
+        with self._idle_lock:
+            self._idle.append(conn)
+
+    def get_json(self, path, params):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ExternalSearchBusy(retry_after=max(1, int(self.timeout)))
+        try:
+            url = f'{self._base_path}{path}?{urlencode(params)}'
+            # Koneksi lama bisa saja sudah ditutup upstream (idle timeout): ulangi sekali dengan koneksi baru
+            for attempt in range(2):
+                conn, reused = self._checkout() if attempt == 0 else (
+                    self._connection_class(self._host, self._port, timeout=self.timeout), False)
+                try:
+                    conn.request('GET', url, headers={'Accept': 'application/json', 'Connection': 'keep-alive'})
+                    response = conn.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    conn.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise ExternalSearchError(f'Gagal menghubungi upstream: {e}') from e
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._checkin(conn)
+                break
+        finally:
+            self._slots.release()
+
+        if response.status != 200:
+            raise ExternalSearchError(f'Upstream membalas status {response.status}.')
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise ExternalSearchError('Respons upstream bukan JSON yang valid.') from e
+
+    def close(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class TTLCache:
+    """Cache {key: value} dengan masa berlaku (TTL) dan batas jumlah entri (LRU)."""
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (expires_at, value)}, paling lama dipakai di depan
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def normalize_query(query):
+    """Query yang hanya beda huruf besar/kecil atau spasi dianggap sama (satu entri cache)."""
+    return ' '.join(query.lower().split())
+
+
+class ExternalSearch:
+    def __init__(self, base_url=DEFAULT_BASE_URL, client_id=None, timeout=DEFAULT_TIMEOUT,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, cache_ttl=DEFAULT_CACHE_TTL,
+                 cache_max_entries=DEFAULT_CACHE_MAX_ENTRIES):
+        self.client_id = client_id
+        self.timeout = timeout
+        self._pool = HTTPConnectionPool(base_url, max_connections=max_concurrency, timeout=timeout)
+        self._cache = TTLCache(ttl=cache_ttl, max_entries=cache_max_entries)
+        self._inflight = {}  # {key: Future} untuk query yang sedang diambil dari upstream
+        self._inflight_lock = threading.Lock()
+
+    def _fetch(self, query, limit):
+        data = self._pool.get_json('/tracks/', {
+            'client_id': self.client_id or '',
+            'format': 'json',
+            'limit': limit,
+            'search': query,
+        })
+        if not isinstance(data, dict):
+            raise ExternalSearchError('Respons upstream bukan objek JSON.')
+        headers = data.get('headers')
+        if not isinstance(headers, dict):
+            headers = {}
+        if headers.get('status') == 'failed':
+            raise ExternalSearchError(f"Upstream menolak request: {headers.get('error_message', 'tanpa pesan')}")
+        results = data.get('results')
+        if not isinstance(results, list):
+            raise ExternalSearchError('Respons upstream tidak berisi "results".')
+        return [{field: track[field] for field in TRACK_FIELDS if field in track}
+                for track in results if isinstance(track, dict)]
+
+    def search(self, query, limit=20):
+        """
+        Mengembalikan (results, cache_status). cache_status: 'HIT' (dari cache),
+        'MISS' (diambil dari upstream), atau 'COALESCED' (ikut hasil request identik lain).
+        """
+        query = normalize_query(query)
+        key = (query, limit)
+        results = self._cache.get(key)
+        if results is not None:
+            return results, 'HIT'
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            try:
+                return future.result(timeout=self.timeout * 2), 'COALESCED'
+            except FutureTimeoutError:
+                raise ExternalSearchError('Timeout menunggu hasil pencarian dari upstream.')
+
+        try:
+            results = self._fetch(query, limit)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._cache.set(key, results)
+            future.set_result(results)
+            return results, 'MISS'
+        finally:
+            # Dilepas setelah cache terisi, sehingga request berikutnya langsung kena cache
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def close(self):
+        self._pool.close()
+
+
+_external_search = None
+
+
+def get_external_search():
+    global _external_search
+    if _external_search is None:
+        _external_search = ExternalSearch(client_id=os.environ.get('JAMENDO_CLIENT_ID'))
+    return _external_search
+
+
+def includeme(config):
+    global _external_search
+    settings = config.get_settings()
+    if _external_search is not None:
+        _external_search.close()
+    _external_search = ExternalSearch(
+        base_url=settings.get('myapp.external_search.base_url', DEFAULT_BASE_URL),
+        client_id=os.environ.get('JAMENDO_CLIENT_ID') or settings.get('myapp.external_search.client_id'),
+        timeout=float(settings.get('myapp.external_search.timeout', DEFAULT_TIMEOUT)),
+        max_concurrency=int(settings.get('myapp.external_search.max_concurrency', DEFAULT_MAX_CONCURRENCY)),
+        cache_ttl=float(settings.get('myapp.external_search.cache_ttl', DEFAULT_CACHE_TTL)),
+        cache_max_entries=int(settings.get('myapp.external_search.cache_max_entries', DEFAULT_CACHE_MAX_ENTRIES)),
+    )
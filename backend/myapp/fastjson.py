@@ -0,0 +1,47 @@
+# file: backend/myapp/fastjson.py
+#
+# Encoder/decoder JSON yang dipakai renderer dan json_utils.
+# Memakai orjson jika terpasang (pip install orjson, jauh lebih cepat), jika tidak
+# kembali ke modul json bawaan. Output selalu ringkas (tanpa spasi/indent) dan UTF-8.
+#
+# Error decode selalu berupa json.JSONDecodeError (orjson.JSONDecodeError adalah subclass-nya).
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson opsional
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def _default(obj):
+    """Tipe yang tidak dikenal encoder: objek dengan __json__() (seperti renderer Pyramid), set, tuple."""
+    if hasattr(obj, '__json__'):
+        return obj.__json__(None)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Objek bertipe {type(obj).__name__} tidak bisa diserialisasi ke JSON')
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Serialisasi ke bytes UTF-8."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data):
+        """Parse dari bytes/str."""
+        return orjson.loads(data)
+else:
+    def dumps(obj):
+        """Serialisasi ke bytes UTF-8."""
+        return json.dumps(obj, separators=_COMPACT_SEPARATORS, ensure_ascii=False, default=_default).encode('utf-8')
+
+    def loads(data):
+        """Parse dari bytes/str."""
+        return json.loads(data)
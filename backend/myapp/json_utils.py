@@ -1,6 +1,14 @@
-# file: backend/myapp/json_utils.py
 import os
-import json
+import json # Masih dipakai untuk json.JSONDecodeError
+import atexit
+import logging
+import threading
+import time
+
+# orjson jika terpasang, json bawaan jika tidak (lihat myapp/fastjson.py)
+from .fastjson import dumps, loads
+
+log = logging.getLogger(__name__)
 
 # Menentukan direktori DATA_DIR relatif terhadap lokasi file json_utils.py ini
 # __file__ adalah path ke json_utils.py
@@ -8,37 +16,352 @@ import json
 # os.path.join(..., '..', 'data') akan naik satu level ke 'backend/' lalu masuk ke 'data/'
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
+# --- Write-ahead log (WAL) ---
+# Setiap mutasi cukup menambahkan SATU baris JSON kecil ke file '<nama>.log'
+# (misal 'playlists.json.log'), bukan menulis ulang seluruh isi database.
+# Saat startup, snapshot '<nama>' dibaca lalu log diputar ulang di atasnya.
+# Jika log sudah melewati WAL_COMPACT_THRESHOLD_BYTES, thread background akan
+# memadatkan (compact) log menjadi snapshot baru secara atomik (file temp + rename).
+WAL_SUFFIX = '.log'
+WAL_COMPACTING_SUFFIX = '.log.compacting'
+WAL_COMPACT_THRESHOLD_BYTES = 1024 * 1024  # 1 MB
+# Jeda sebelum flusher mencoba lagi setelah append/fsync gagal (disk penuh dll.)
+WAL_RETRY_DELAY = 1.0
+
+_MISSING = object()
+
+# --- Group commit ---
+# save_data_to_json(..., changed_keys=...) hanya menandai key sebagai 'dirty'.
+# Satu thread flusher per file menulis SEMUA key dirty sekaligus dengan satu
+# append + satu fsync. Selama fsync berjalan, mutasi baru menumpuk dan ikut di
+# flush berikutnya, jadi burst N mutasi menghasilkan jauh lebih sedikit flush.
+# Key yang diubah berkali-kali sebelum flush hanya ditulis sekali (nilai terakhir).
+# Jika append/fsync gagal, key dikembalikan ke 'dirty' (dicoba lagi oleh flusher) dan
+# penunggu tiket yang ikut di flush itu mendapat JsonFlushError.
+
+# State per file, lihat _get_state(). Urutan lock: snapshot_lock -> io_lock -> lock
+_wal_state = {}
+_wal_state_lock = threading.Lock()
+
+
+class JsonFlushError(Exception):
+    """Mutasi belum tertulis ke log karena append/fsync gagal; akan dicoba lagi oleh flusher."""
+
+
 def ensure_data_dir_exists():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
-        print(f"Direktori data dibuat di: {DATA_DIR}")
+        log.info('Direktori data dibuat', extra={'path': DATA_DIR})
+
+
+def _get_state(filename):
+    with _wal_state_lock:
+        state = _wal_state.get(filename)
+        if state is None:
+            lock = threading.RLock()
+            state = {
+                'data': None,
+                'lock': lock,
+                # Menandai ada key dirty baru / flush selesai
+                'cond': threading.Condition(lock),
+                # Mengurutkan penulisan snapshot (save penuh vs compaction)
+                'snapshot_lock': threading.Lock(),
+                # Mengurutkan append log vs rename log saat compaction
+                'io_lock': threading.Lock(),
+                'compacting': False,
+                'dirty': set(),
+                'requested': 0,  # nomor mutasi terakhir yang ditandai dirty
+                'flushed': 0,    # nomor mutasi terakhir yang sudah di-fsync
+                'failed': 0,     # nomor mutasi terakhir yang ikut di flush yang gagal
+                'error': None,   # exception dari flush terakhir yang gagal
+                'flusher': None,
+            }
+            _wal_state[filename] = state
+        return state
+
 
-def load_data_from_json(filename, default_data={}):
+def _write_snapshot_atomic(filepath, serialized):
+    """
+    Menulis snapshot ke file temp lalu me-rename-nya ke filepath.
+    os.replace atomik, jadi crash di tengah penulisan tidak pernah memotong snapshot lama.
+    """
+    tmp_path = f"{filepath}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(serialized)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+def _replay_log(log_path, data):
+    """
+    Memutar ulang record dari file log ke dict data.
+    Baris terakhir yang terpotong (crash saat append) diabaikan dan dipotong dari file,
+    supaya append berikutnya tidak tersambung ke sisa baris itu (dan ikut hilang saat
+    log diputar ulang lagi).
+    """
+    if not os.path.exists(log_path):
+        return 0
+    applied = 0
+    offset = 0
+    torn_at = None  # posisi awal baris terakhir yang tidak diakhiri newline
+    with open(log_path, 'rb') as f:
+        for line in f:
+            start, offset = offset, offset + len(line)
+            complete = line.endswith(b'\n')
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = loads(line)
+            except ValueError:  # JSONDecodeError, juga UnicodeDecodeError (json bawaan) jika terpotong di tengah karakter
+                log.warning('Record log terpotong/korup diabaikan', extra={'path': log_path})
+                if not complete:
+                    torn_at = start
+                continue
+            if not complete:
+                torn_at = offset  # record utuh, hanya newline-nya yang belum tertulis
+            op = record.get('op') if isinstance(record, dict) and 'k' in record else None
+            if op == 'put' and 'v' in record:
+                data[record['k']] = record['v']
+            elif op == 'del':
+                data.pop(record['k'], None)
+            else:
+                log.warning('Record log tidak dikenal diabaikan', extra={'path': log_path})
+                continue
+            applied += 1
+    if torn_at is not None:
+        with open(log_path, 'r+b') as f:
+            f.truncate(torn_at)
+            if torn_at == offset:
+                f.seek(torn_at)
+                f.write(b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+    return applied
+
+
+def load_data_from_json(filename, default_data={}, factory=None):
+    """
+    Memuat data (snapshot + log) dari DATA_DIR. Jika factory diberikan, dict hasil
+    load diubah dengan factory(dict) setelah log diputar ulang (misal ke struktur
+    yang lebih hemat memori); hasilnya yang dipakai untuk snapshot berikutnya.
+    """
     filepath = os.path.join(DATA_DIR, filename)
-    try:
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        else:
-            print(f"File {filepath} tidak ditemukan atau kosong. Membuat file baru dengan data default.")
-            with open(filepath, 'w') as f:
-                json.dump(default_data, f, indent=4)
-            return default_data
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error memuat {filepath} atau file korup: {e}. Menggunakan data default dan membuat file baru.")
-        with open(filepath, 'w') as f:
-            json.dump(default_data, f, indent=4)
-        return default_data
-
-def save_data_to_json(data, filename):
+    state = _get_state(filename)
+    with state['lock']:
+        try:
+            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                with open(filepath, 'rb') as f:
+                    data = loads(f.read())
+            else:
+                log.info('File tidak ditemukan atau kosong, membuat file baru dengan data default', extra={'path': filepath})
+                data = dict(default_data)
+                _write_snapshot_atomic(filepath, dumps(data))
+        except json.JSONDecodeError as e:
+            log.error('Gagal memuat file atau file korup, memakai data default: %s', e, extra={'path': filepath})
+            data = dict(default_data)
+            _write_snapshot_atomic(filepath, dumps(data))
+
+        # Putar ulang log: sisa compaction yang belum selesai dulu, baru log aktif
+        replayed = _replay_log(filepath + WAL_COMPACTING_SUFFIX, data)
+        replayed += _replay_log(filepath + WAL_SUFFIX, data)
+        if replayed:
+            log.info('Record log diputar ulang', extra={'path': filepath, 'records': replayed})
+        if factory is not None:
+            data = factory(data)
+
+        state['data'] = data
+    _maybe_schedule_compaction(filename)
+    return data
+
+
+def save_data_to_json(data, filename, changed_keys=None, wait=True):
+    """
+    Menyimpan perubahan data ke disk.
+
+    - Jika changed_keys diberikan (iterable of key), hanya key tersebut yang
+      ditambahkan ke log: 'put' jika key masih ada di data, 'del' jika sudah dihapus.
+      Penulisan dilakukan oleh thread flusher (group commit). Jika wait=True fungsi
+      menunggu sampai record sudah di-fsync; jika wait=False langsung kembali dan
+      mengembalikan tiket untuk wait_for_json_flush().
+    - Jika changed_keys None, seluruh data ditulis sebagai snapshot baru (atomik)
+      dan log dikosongkan.
+
+    Nilai data[key] diserialisasi saat flush, jadi pemanggil tidak boleh mengubah
+    nilai tersebut di tempat (ganti dengan objek baru).
+    """
     filepath = os.path.join(DATA_DIR, filename)
+    state = _get_state(filename)
     try:
         ensure_data_dir_exists() # Pastikan direktori ada sebelum menyimpan
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"Data berhasil disimpan ke {filepath}")
-    except Exception as e:
-        print(f"Error menyimpan data ke {filepath}: {e}")
+        if changed_keys is None:
+            with state['snapshot_lock'], state['io_lock'], state['lock']:
+                state['data'] = data
+                _write_snapshot_atomic(filepath, dumps(data))
+                state['dirty'].clear()
+                for suffix in (WAL_COMPACTING_SUFFIX, WAL_SUFFIX):
+                    if os.path.exists(filepath + suffix):
+                        os.remove(filepath + suffix)
+                state['flushed'] = state['requested']
+                state['cond'].notify_all()
+            return state['flushed']
+
+        with state['cond']:
+            state['data'] = data
+            changed_keys = set(changed_keys)
+            if not changed_keys:
+                # Tidak ada yang perlu ditulis; tiket kosong tidak akan pernah di-flush
+                return state['flushed']
+            state['dirty'].update(changed_keys)
+            state['requested'] += 1
+            ticket = state['requested']
+            if state['flusher'] is None:
+                state['flusher'] = threading.Thread(target=_flusher_loop, args=(filename,),
+                                                    name=f"wal-flush-{filename}", daemon=True)
+                state['flusher'].start()
+            state['cond'].notify_all()
+        if wait:
+            wait_for_json_flush(filename, ticket)
+        return ticket
+    except JsonFlushError:
+        raise  # sudah dicatat oleh _flush_dirty
+    except Exception:
+        log.exception('Gagal menyimpan data', extra={'path': filepath})
+        raise
+
+
+def wait_for_json_flush(filename, ticket):
+    """
+    Menunggu sampai mutasi dengan nomor tiket tersebut sudah ditulis ke log.
+    JsonFlushError jika flush yang memuat mutasi itu gagal (key-nya tetap dicoba lagi).
+    """
+    state = _get_state(filename)
+    with state['cond']:
+        while state['flushed'] < ticket:
+            if state['failed'] >= ticket:
+                raise JsonFlushError(f'Gagal menulis log {filename}') from state['error']
+            state['cond'].wait()
+
+
+def _flush_dirty(filename, state):
+    """Menulis semua key dirty sebagai satu append + satu fsync. False jika gagal."""
+    filepath = os.path.join(DATA_DIR, filename)
+    with state['io_lock']:
+        with state['lock']:
+            keys = state['dirty']
+            if not keys:
+                return True
+            state['dirty'] = set()
+            ticket = state['requested']
+            data = state['data']
+            lines = []
+            for key in keys:
+                value = data.get(key, _MISSING)
+                if value is not _MISSING:
+                    record = {'op': 'put', 'k': key, 'v': value}
+                else:
+                    record = {'op': 'del', 'k': key}
+                lines.append(dumps(record))
+        try:
+            with open(filepath + WAL_SUFFIX, 'ab') as f:
+                f.write(b'\n'.join(lines) + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            log.exception('Gagal menulis log', extra={'path': filepath})
+            with state['cond']:
+                # Key dikembalikan agar ditulis lagi (dengan nilai terbaru) di flush berikutnya
+                state['dirty'] |= keys
+                state['failed'] = max(state['failed'], ticket)
+                state['error'] = e
+                state['cond'].notify_all()
+            return False
+        with state['cond']:
+            state['flushed'] = max(state['flushed'], ticket)
+            state['cond'].notify_all()
+    _maybe_schedule_compaction(filename)
+    return True
+
+
+def _flusher_loop(filename):
+    state = _get_state(filename)
+    while True:
+        with state['cond']:
+            while not state['dirty']:
+                state['cond'].wait()
+        if not _flush_dirty(filename, state):
+            time.sleep(WAL_RETRY_DELAY)
+
+
+def flush_json_logs():
+    """Flush semua key dirty (dipanggil saat proses berhenti)."""
+    with _wal_state_lock:
+        items = list(_wal_state.items())
+    for filename, state in items:
+        _flush_dirty(filename, state)
+
+
+atexit.register(flush_json_logs)
+
+
+def _maybe_schedule_compaction(filename):
+    log_path = os.path.join(DATA_DIR, filename) + WAL_SUFFIX
+    try:
+        log_size = os.path.getsize(log_path)
+    except OSError:
+        return
+    if log_size < WAL_COMPACT_THRESHOLD_BYTES:
+        return
+
+    state = _get_state(filename)
+    with state['lock']:
+        if state['compacting'] or state['data'] is None:
+            return
+        state['compacting'] = True
+    threading.Thread(target=compact_json_log, args=(filename,),
+                     name=f"wal-compact-{filename}", daemon=True).start()
+
+
+def compact_json_log(filename):
+    """
+    Memadatkan log menjadi snapshot baru.
+
+    Di bawah lock: data diserialisasi dan log aktif di-rename menjadi '.log.compacting',
+    sehingga mutasi baru langsung menulis ke log yang baru. Setelah lock dilepas,
+    snapshot ditulis atomik lalu '.log.compacting' dihapus. Jika crash di antara
+    keduanya, record di '.log.compacting' akan diputar ulang lagi saat startup
+    (put/del bersifat idempoten).
+    """
+    filepath = os.path.join(DATA_DIR, filename)
+    log_path = filepath + WAL_SUFFIX
+    compacting_path = filepath + WAL_COMPACTING_SUFFIX
+    state = _get_state(filename)
+    try:
+        with state['snapshot_lock']:
+            with state['io_lock'], state['lock']:
+                data = state['data']
+                if data is None:
+                    return
+                serialized = dumps(data)
+                if os.path.exists(log_path):
+                    if os.path.exists(compacting_path):
+                        # Sisa compaction sebelumnya yang gagal: gabungkan dulu
+                        with open(log_path, 'rb') as src, open(compacting_path, 'ab') as dst:
+                            dst.write(src.read())
+                        os.remove(log_path)
+                    else:
+                        os.replace(log_path, compacting_path)
+
+            _write_snapshot_atomic(filepath, serialized)
+            if os.path.exists(compacting_path):
+                os.remove(compacting_path)
+        log.info('Log dipadatkan menjadi snapshot baru', extra={'file': filename})
+    except Exception:
+        log.exception('Gagal memadatkan log', extra={'path': filepath})
+    finally:
+        with state['lock']:
+            state['compacting'] = False
 
 # Panggil ensure_data_dir_exists() saat modul ini diimpor pertama kali
-ensure_data_dir_exists()
\ No newline at end of file
+ensure_data_dir_exists()
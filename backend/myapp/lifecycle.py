@@ -0,0 +1,106 @@
+# file: backend/myapp/lifecycle.py
+#
+# Tahapan siklus hidup aplikasi: startup tidak lagi membaca data.
+# - Backend storage dibuat lazy (saat pertama dipakai), jadi myapp.main dan
+#   `pserve --reload` langsung siap tanpa menunggu parsing file JSON besar.
+# - Warm-up opsional di thread background setelah aplikasi dibuat: memuat storage
+#   lalu membangun index pencarian. Request yang datang lebih dulu tetap dilayani;
+#   request yang butuh storage menunggu sampai storage selesai dimuat.
+# - GET /api/ready: 200 jika warm-up selesai (atau warm-up dimatikan), 503 jika belum.
+# - Durasi setiap tahap dicatat (log INFO, metrik myapp_startup_phase_seconds,
+#   dan field 'phases' di /api/ready).
+#
+# Setting di development.ini:
+#   myapp.warmup = true   (false: tidak ada warm-up, data dimuat saat request pertama)
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from pyramid.events import ApplicationCreated
+
+from .metrics import registry
+
+log = logging.getLogger(__name__)
+
+registry.describe('myapp_startup_phase_seconds', 'gauge', 'Durasi setiap tahap startup/warm-up (detik).')
+
+_PROCESS_START = time.monotonic()
+_phases = {}  # {nama tahap: detik}, urutan = urutan selesai
+_ready = threading.Event()
+_warmup_error = None
+
+
+@contextmanager
+def startup_phase(name):
+    """Mencatat durasi satu tahap startup."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _phases[name] = _phases.get(name, 0.0) + elapsed
+        registry.set('myapp_startup_phase_seconds', _phases[name], (('phase', name),))
+        log.info('Tahap startup selesai', extra={'phase': name, 'duration_ms': round(elapsed * 1000, 2)})
+
+
+def startup_phases():
+    return dict(_phases)
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def _warmup():
+    global _warmup_error
+    # Import di sini agar lifecycle tidak memuat storage/index saat modul diimpor
+    from .search_index import get_search_index
+    from .storage import get_storage
+    try:
+        with startup_phase('warmup'):
+            storage = get_storage()
+            storage.load()
+            with startup_phase('search_index'):
+                get_search_index(storage)
+    except Exception as e:
+        _warmup_error = str(e)
+        log.exception('Warm-up gagal')
+        return
+    log.info('Aplikasi siap', extra={'uptime_ms': round((time.monotonic() - _PROCESS_START) * 1000, 2)})
+    _ready.set()
+
+
+def _start_warmup(event):
+    threading.Thread(target=_warmup, name='warmup', daemon=True).start()
+
+
+def ready_view(request):
+    """Readiness probe untuk load balancer / orkestrator."""
+    payload = {
+        'status': 'ready' if is_ready() else 'starting',
+        'uptime_seconds': round(time.monotonic() - _PROCESS_START, 3),
+        'phases': {name: round(seconds, 4) for name, seconds in startup_phases().items()},
+    }
+    if _warmup_error is not None:
+        payload['status'] = 'error'
+        payload['error'] = _warmup_error
+    if payload['status'] != 'ready':
+        request.response.status_code = 503 # Service Unavailable
+        request.response.headers['Retry-After'] = '1'
+    return payload
+
+
+def includeme(config):
+    global _warmup_error
+    settings = config.get_settings()
+    _ready.clear()
+    _warmup_error = None
+    if settings.get('myapp.warmup', 'true').strip().lower() in ('true', '1', 'yes', 'on'):
+        config.add_subscriber(_start_warmup, ApplicationCreated)
+    else:
+        # Tanpa warm-up: data dimuat saat request pertama, aplikasi dianggap siap sejak awal
+        _ready.set()
+    config.add_route('api_ready', '/api/ready', request_method='GET')
+    config.add_view(ready_view, route_name='api_ready', renderer='json')
@@ -0,0 +1,88 @@
+# file: backend/myapp/logs.py
+#
+# Logging terstruktur & asinkron untuk logger 'myapp' (pengganti print()).
+# - Modul memakai logging.getLogger(__name__) dan mengirim data tambahan lewat
+#   extra={...}; StructuredFormatter menambahkannya di akhir baris sebagai key=value.
+# - includeme() memindahkan handler logger 'myapp' (dari [logger_myapp] di
+#   development.ini) ke belakang QueueHandler + QueueListener: thread request hanya
+#   memasukkan record ke antrean, penulisan ke stderr dilakukan thread listener.
+# - Level tetap diatur dari [logger_myapp] level = ... di development.ini.
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Atribut bawaan LogRecord; atribut lain berasal dari extra={...}
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+def _format_value(value):
+    text = str(value)
+    if not text or any(char in text for char in ' ="'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter biasa + field extra sebagai ' key=value' (mudah di-grep / di-parse)."""
+
+    def format(self, record):
+        line = super().format(record)
+        extras = [(key, value) for key, value in vars(record).items()
+                  if key not in _RESERVED_ATTRS and not key.startswith('_')]
+        if extras:
+            line += ' ' + ' '.join(f'{key}={_format_value(value)}' for key, value in extras)
+        return line
+
+
+class _PreparedQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Cukup gabungkan msg % args; format lengkap (termasuk extra & traceback)
+        # dilakukan oleh handler asli di thread listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+_queued_logger = None  # (logger, handler asli) selama queue logging aktif
+
+
+def setup_queue_logging(logger_name='myapp'):
+    """Mengganti handler logger dengan QueueHandler. Aman dipanggil lebih dari sekali."""
+    global _listener, _queued_logger
+    stop_queue_logging()
+    logger = logging.getLogger(logger_name)
+    handlers = list(logger.handlers)
+    if not handlers:
+        # Belum dikonfigurasi (misal dijalankan tanpa pserve): biarkan propagate ke root
+        return
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queued_logger = (logger, handlers)
+    logger.handlers = [_PreparedQueueHandler(log_queue)]
+    _listener.start()
+
+
+def stop_queue_logging():
+    """Menulis semua record yang masih di antrean lalu mengembalikan handler asli."""
+    global _listener, _queued_logger
+    if _queued_logger is not None:
+        logger, handlers = _queued_logger
+        logger.handlers = handlers
+        _queued_logger = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_queue_logging)
+
+
+def includeme(config):
+    setup_queue_logging()
@@ -0,0 +1,236 @@
+# file: backend/myapp/media.py
+#
+# File audio yang di-host sendiri, dilayani lewat GET /api/songs/{song_id}/stream
+# (lihat views/song_views.py). Lagu di koleksi hanya menyimpan `url`; lagu yang url-nya
+# bukan URL http(s) (misal 'URL_MUSIK_DUMMY_4.mp3') dicari sebagai file di direktori media:
+#   1. <media_dir>/<url>            (path relatif, tidak boleh keluar dari media_dir)
+#   2. <media_dir>/<song_id>.<ext>  untuk setiap ekstensi di AUDIO_TYPES
+# Hanya ekstensi audio di AUDIO_TYPES yang dilayani.
+#
+# Respons mendukung Range (satu atau beberapa range -> multipart/byteranges),
+# If-Range, ETag/If-None-Match dan Accept-Ranges, sehingga seek di player hanya
+# mengambil bagian file yang dibutuhkan.
+#
+# Isi file tidak dibaca di thread request: untuk satu range (atau seluruh file) body
+# berupa wsgi.file_wrapper. Waitress menyerahkan file wrapper ke thread I/O-nya
+# (channel asyncore), thread worker langsung bebas untuk request berikutnya; gunicorn
+# mengirimnya dengan sendfile(). Tanpa file_wrapper (atau untuk multi-range) body
+# dibaca per potongan FILE_CHUNK_SIZE dengan read() biasa. mmap sengaja tidak dipakai:
+# file yang terpotong saat sedang dibaca lewat mmap membuat proses mati karena SIGBUS.
+#
+# Elemen <audio> tidak bisa mengirim header Authorization: frontend meminta URL stream
+# lewat POST /api/songs/{song_id}/stream-token, berisi token URL bertanda tangan yang
+# hanya berlaku untuk lagu itu selama token_ttl detik (lihat myapp/url_tokens.py).
+#
+# Setting di development.ini:
+#   myapp.media.dir = %(here)s/data/media
+#   myapp.media.max_age = 3600      (detik, Cache-Control: private, max-age=...)
+#   myapp.media.token_ttl = 3600    (detik, umur token URL stream)
+
+import logging
+import os
+import secrets
+import stat as stat_module
+from email.utils import formatdate, parsedate_to_datetime
+
+from .json_utils import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MEDIA_DIR = os.path.join(DATA_DIR, 'media')
+DEFAULT_MAX_AGE = 3600
+DEFAULT_TOKEN_TTL = 3600
+FILE_CHUNK_SIZE = 256 * 1024
+# Lebih dari ini, header Range diabaikan dan seluruh file dikirim (boleh menurut RFC 9110)
+MAX_RANGES = 16
+
+AUDIO_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.ogg': 'audio/ogg',
+    '.oga': 'audio/ogg',
+    '.opus': 'audio/ogg',
+    '.m4a': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.flac': 'audio/flac',
+    '.wav': 'audio/wav',
+    '.webm': 'audio/webm',
+}
+
+# file_wrapper dari server ini mengirim sebanyak Content-Length mulai dari posisi file
+# saat ini; server lain (misal wsgiref) membaca sampai EOF, jadi hanya aman untuk range
+# yang berakhir di ujung file. Dikenali dari modul class-nya (Server/ident bisa diganti).
+_LENGTH_AWARE_FILE_WRAPPERS = ('waitress.', 'gunicorn.')
+
+
+class MediaFile:
+    """File audio hasil resolve: path, ukuran, waktu ubah, Content-Type dan ETag."""
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.content_type = AUDIO_TYPES[os.path.splitext(path)[1].lower()]
+        # ETag kuat (If-Range mensyaratkan validator kuat): ukuran + mtime dalam nanodetik,
+        # tanpa tanda kutip (sama seperti response.etag di webob)
+        self.etag = f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+    @property
+    def last_modified(self):
+        return formatdate(self.mtime, usegmt=True)
+
+
+class MediaLibrary:
+    def __init__(self, media_dir=DEFAULT_MEDIA_DIR, max_age=DEFAULT_MAX_AGE, token_ttl=DEFAULT_TOKEN_TTL):
+        self.media_dir = os.path.realpath(media_dir)
+        self.max_age = max_age
+        self.token_ttl = token_ttl
+
+    def _candidate(self, relative_path):
+        """Path absolut di dalam media_dir, atau None jika keluar dari direktori."""
+        path = os.path.realpath(os.path.join(self.media_dir, relative_path))
+        if os.path.commonpath((path, self.media_dir)) != self.media_dir:
+            return None
+        return path
+
+    def find(self, song):
+        """MediaFile untuk lagu, atau None jika tidak ada file lokalnya."""
+        candidates = []
+        url = song.get('url')
+        if isinstance(url, str) and url and '://' not in url and not os.path.isabs(url):
+            candidates.append(url)
+        candidates.extend(f"{song['id']}{ext}" for ext in AUDIO_TYPES)
+        for relative_path in candidates:
+            path = self._candidate(relative_path)
+            if path is None or os.path.splitext(path)[1].lower() not in AUDIO_TYPES:
+                continue
+            try:
+                stat = os.stat(path)
+            except (OSError, ValueError):
+                continue
+            if stat_module.S_ISREG(stat.st_mode):
+                return MediaFile(path, stat)
+        return None
+
+
+def _is_number(text):
+    # Kosong boleh (diperiksa terpisah); isdigit() saja juga menerima '²' yang ditolak int()
+    return not text or (text.isascii() and text.isdigit())
+
+
+def parse_range_header(value, size):
+    """
+    Range (start, end) inklusif dari header Range, terurut dan range yang bertumpuk
+    digabung. None jika header tidak dikenal/tidak valid atau terlalu banyak range
+    (header diabaikan, kirim 200). List kosong jika tidak ada range yang bisa dipenuhi (416).
+    """
+    unit, sep, specs = value.partition('=')
+    if not sep or unit.strip().lower() != 'bytes':
+        return None
+    specs = [spec.strip() for spec in specs.split(',') if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+    ranges = []
+    for spec in specs:
+        first, sep, last = spec.partition('-')
+        first, last = first.strip(), last.strip()
+        if not sep or not (first or last) or not _is_number(first) or not _is_number(last):
+            return None
+        if not first:
+            # Suffix range: N byte terakhir
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = size - 1 if not last else min(int(last), size - 1)
+            if last and int(last) < start:
+                return None
+        if start < size:
+            ranges.append((start, end))
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def if_range_matches(value, media_file):
+    """If-Range: ETag kuat yang sama, atau tanggal yang persis sama dengan Last-Modified."""
+    value = value.strip()
+    if value.startswith('"') or value.startswith('W/'):
+        return value == f'"{media_file.etag}"'
+    try:
+        return int(parsedate_to_datetime(value).timestamp()) == media_file.mtime
+    except (TypeError, ValueError):
+        return False
+
+
+def iter_file_range(path, start, length, chunk_size=FILE_CHUNK_SIZE):
+    """Isi file [start, start+length) per potongan; file ditutup walau client putus di tengah."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                # File terpotong sejak di-stat: Content-Length tidak bisa dipenuhi lagi
+                log.warning('File media berubah saat dikirim', extra={'path': path})
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def file_body(environ, media_file, start, length):
+    """app_iter untuk satu range; memakai wsgi.file_wrapper jika server bisa memakainya."""
+    file_wrapper = environ.get('wsgi.file_wrapper')
+    length_aware = getattr(file_wrapper, '__module__', '').startswith(_LENGTH_AWARE_FILE_WRAPPERS)
+    if file_wrapper is not None and length > 0 and (length_aware or start + length == media_file.size):
+        f = open(media_file.path, 'rb')
+        f.seek(start)
+        return file_wrapper(f, FILE_CHUNK_SIZE)
+    return iter_file_range(media_file.path, start, length)
+
+
+def multipart_body(media_file, ranges):
+    """
+    (boundary, panjang body, app_iter) untuk multipart/byteranges. Panjang dihitung di
+    depan agar Content-Length bisa dikirim tanpa membaca file.
+    """
+    boundary = secrets.token_hex(16)
+    heads = [(f'--{boundary}\r\nContent-Type: {media_file.content_type}\r\n'
+              f'Content-Range: bytes {start}-{end}/{media_file.size}\r\n\r\n').encode('ascii')
+             for start, end in ranges]
+    tail = f'--{boundary}--\r\n'.encode('ascii')
+    length = sum(len(head) + (end - start + 1) + 2 for head, (start, end) in zip(heads, ranges)) + len(tail)
+
+    def body():
+        for head, (start, end) in zip(heads, ranges):
+            yield head
+            yield from iter_file_range(media_file.path, start, end - start + 1)
+            yield b'\r\n'
+        yield tail
+
+    return boundary, length, body()
+
+
+_media_library = None
+
+
+def get_media_library():
+    global _media_library
+    if _media_library is None:
+        _media_library = MediaLibrary()
+    return _media_library
+
+
+def includeme(config):
+    global _media_library
+    settings = config.get_settings()
+    _media_library = MediaLibrary(
+        settings.get('myapp.media.dir', DEFAULT_MEDIA_DIR),
+        max_age=int(settings.get('myapp.media.max_age', DEFAULT_MAX_AGE)),
+        token_ttl=int(settings.get('myapp.media.token_ttl', DEFAULT_TOKEN_TTL)),
+    )
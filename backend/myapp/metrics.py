@@ -0,0 +1,240 @@
+# file: backend/myapp/metrics.py
+#
+# Metrik per request, diekspos di GET /metrics dalam format teks Prometheus.
+# - Tween metrics_tween_factory mencatat latensi per route (histogram), jumlah
+#   response per status, dan ukuran payload response.
+# - Waktu yang dihabiskan di storage, serialisasi JSON, dan bcrypt dicatat lewat
+#   `with timed('storage'):` dan seterusnya. Totalnya per request juga ikut di
+#   log akses (level DEBUG) sehingga request lambat bisa dilihat penyebabnya.
+#
+# Setting di development.ini:
+#   myapp.metrics.enabled = true   (false: tween & /metrics tidak dipasang)
+#   myapp.metrics.allow = 127.0.0.1 ::1   (IP/jaringan yang boleh mengambil /metrics)
+#   myapp.metrics.token =                 (opsional: scraper mengirim Authorization: Bearer <token>)
+# Keduanya kosong = /metrics ditolak untuk semua (403). Metrik memuat nama route,
+# jumlah request dan waktu bcrypt, jadi tidak boleh terbuka untuk publik.
+# IP diambil dari alamat koneksi (REMOTE_ADDR), bukan X-Forwarded-For.
+
+import contextvars
+import hmac
+import ipaddress
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from pyramid.response import Response
+
+log = logging.getLogger(__name__)
+
+# Batas bucket histogram (detik / byte), mengikuti default client Prometheus
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# {phase: detik} milik request yang sedang berjalan di thread/context ini
+_current_phases = contextvars.ContextVar('myapp_request_phases', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+class MetricsRegistry:
+    """Counter, gauge & histogram sederhana berlabel. Satu lock untuk semua update (operasinya sangat singkat)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # {(nama, labels): nilai}
+        self._gauges = {}      # {(nama, labels): nilai terakhir}
+        self._histograms = {}  # {(nama, labels): Histogram}
+        self._help = {}        # {nama: (tipe, teks help)}
+
+    def describe(self, name, metric_type, help_text):
+        self._help[name] = (metric_type, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, labels=()):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self):
+        """Teks exposition format Prometheus (versi 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(
+                ((key, (list(h.counts), h.sum, h.count, h.buckets)) for key, h in self._histograms.items()),
+                key=lambda item: item[0])
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described and name in self._help:
+                metric_type, help_text = self._help[name]
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+            described.add(name)
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+        for (name, labels), value in gauges:
+            header(name)
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+registry.describe('http_requests_total', 'counter', 'Jumlah request HTTP per route, method, dan status.')
+registry.describe('http_request_duration_seconds', 'histogram', 'Latensi request HTTP per route.')
+registry.describe('http_response_size_bytes', 'histogram', 'Ukuran body response HTTP per route.')
+registry.describe('myapp_phase_duration_seconds', 'histogram', 'Waktu di storage, serialisasi, dan bcrypt per pemanggilan.')
+
+
+@contextmanager
+def timed(phase):
+    """Mencatat durasi blok ke histogram phase dan ke total phase request saat ini."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe('myapp_phase_duration_seconds', elapsed, (('phase', phase),))
+        phases = _current_phases.get()
+        if phases is not None:
+            phases[phase] = phases.get(phase, 0.0) + elapsed
+
+
+class InstrumentedProxy:
+    """Membungkus objek (misal backend storage): setiap pemanggilan method dicatat sebagai `phase`."""
+
+    def __init__(self, target, phase):
+        self._target = target
+        self._phase = phase
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        def call(*args, **kwargs):
+            with timed(self._phase):
+                return attribute(*args, **kwargs)
+        call.__name__ = name
+        return call
+
+
+def metrics_tween_factory(handler, registry_):
+    def metrics_tween(request):
+        phases = {}
+        token = _current_phases.set(phases)
+        start = time.perf_counter()
+        status = 500
+        response = None
+        try:
+            response = handler(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_phases.reset(token)
+            matched_route = getattr(request, 'matched_route', None)
+            route = matched_route.name if matched_route is not None else 'unmatched'
+            registry.inc('http_requests_total', (('route', route), ('method', request.method), ('status', status)))
+            registry.observe('http_request_duration_seconds', elapsed, (('route', route),))
+            size = response.content_length if response is not None else None
+            if size is not None:
+                registry.observe('http_response_size_bytes', size, (('route', route),), buckets=SIZE_BUCKETS)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('request selesai', extra={
+                    'route': route, 'method': request.method, 'status': status,
+                    'duration_ms': round(elapsed * 1000, 2), 'bytes': size,
+                    **{f'{phase}_ms': round(seconds * 1000, 2) for phase, seconds in phases.items()},
+                })
+    return metrics_tween
+
+
+class MetricsAccess:
+    """Daftar jaringan yang diizinkan + token bearer opsional untuk GET /metrics."""
+
+    def __init__(self, networks=(), token=None):
+        self.networks = tuple(networks)
+        self.token = token or None
+
+    @classmethod
+    def from_settings(cls, settings):
+        networks = [ipaddress.ip_network(value, strict=False)
+                    for value in settings.get('myapp.metrics.allow', '').replace(',', ' ').split()]
+        return cls(networks, settings.get('myapp.metrics.token', '').strip())
+
+    def permits(self, request):
+        if self.token is not None:
+            auth_header = request.headers.get('Authorization', '')
+            if auth_header.startswith('Bearer ') and hmac.compare_digest(
+                    auth_header[len('Bearer '):].strip().encode(), self.token.encode()):
+                return True
+        try:
+            address = ipaddress.ip_address(request.remote_addr or '')
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
+
+
+def metrics_view(request):
+    if not request.registry.metrics_access.permits(request):
+        return Response('Forbidden\n', status=403, content_type='text/plain')
+    response = Response(registry.render(), content_type='text/plain')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if settings.get('myapp.metrics.enabled', 'true').strip().lower() not in ('true', '1', 'yes', 'on'):
+        return
+    config.registry.metrics_access = MetricsAccess.from_settings(settings)
+    config.add_tween('myapp.metrics.metrics_tween_factory')
+    config.add_route('metrics', '/metrics', request_method='GET')
+    config.add_view(metrics_view, route_name='metrics')
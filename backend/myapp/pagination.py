@@ -0,0 +1,107 @@
+# file: backend/myapp/pagination.py
+#
+# Helper pagination berbasis cursor + projection field untuk endpoint GET.
+#
+#   ?limit=50              ukuran halaman (maks MAX_PAGE_LIMIT)
+#   ?cursor=<opaque>       lanjutkan dari halaman sebelumnya (nilai 'next_cursor')
+#   ?fields=id,name        hanya kirim field tertentu
+#
+# Cursor bersifat opaque bagi client: base64 dari {"o": offset, "k": key terakhir}.
+# Saat dipakai, posisi dicari lagi lewat key terakhir sehingga halaman tetap stabil
+# walaupun ada item yang ditambah/dihapus sebelum posisi tersebut; offset hanya
+# dipakai sebagai petunjuk cepat dan cadangan jika key terakhir sudah dihapus.
+
+import base64
+import json
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class PaginationError(ValueError):
+    """Parameter limit/cursor/fields tidak valid (dibalas 400 oleh view)."""
+
+
+def encode_cursor(offset, last_key):
+    raw = json.dumps({'o': offset, 'k': last_key}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset = int(data['o'])
+        if offset < 0:
+            raise ValueError
+        return offset, data['k']
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('Parameter "cursor" tidak valid.')
+
+
+def parse_page_params(request):
+    """
+    Mengembalikan (paginated, limit, cursor). paginated False jika client tidak
+    mengirim limit maupun cursor (respons lama berupa list penuh dipertahankan).
+    """
+    raw_limit = request.params.get('limit')
+    raw_cursor = request.params.get('cursor')
+    if raw_limit is None and raw_cursor is None:
+        return False, None, None
+
+    limit = DEFAULT_PAGE_LIMIT
+    if raw_limit is not None:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise PaginationError('Parameter "limit" harus berupa angka.')
+        if limit < 1:
+            raise PaginationError('Parameter "limit" minimal 1.')
+        limit = min(limit, MAX_PAGE_LIMIT)
+
+    cursor = decode_cursor(raw_cursor) if raw_cursor else None
+    return True, limit, cursor
+
+
+def parse_fields(request, allowed_fields):
+    """Mengembalikan tuple field yang diminta, atau None jika semua field."""
+    raw_fields = request.params.get('fields')
+    if not raw_fields:
+        return None
+    fields = tuple(field.strip() for field in raw_fields.split(',') if field.strip())
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        raise PaginationError(
+            f"Field tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(allowed_fields)}.")
+    return fields
+
+
+def page_bounds(keys, limit, cursor):
+    """
+    Menghitung (start, end) halaman di dalam sequence keys.
+    keys harus mendukung len() dan indexing (list song_ids, list ID playlist).
+    """
+    start = 0
+    if cursor is not None:
+        offset, last_key = cursor
+        if 0 < offset <= len(keys) and keys[offset - 1] == last_key:
+            start = offset
+        else:
+            # Ada perubahan sebelum posisi cursor: cari key terakhir, atau pakai offset
+            try:
+                start = keys.index(last_key) + 1
+            except ValueError:
+                start = min(offset, len(keys))
+    return start, min(start + limit, len(keys))
+
+
+def page_result(items, keys, start, end):
+    """Bentuk respons halaman: {'items': [...], 'next_cursor': ... atau None}."""
+    next_cursor = encode_cursor(end, keys[end - 1]) if end < len(keys) and end > start else None
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+def project(item, fields):
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
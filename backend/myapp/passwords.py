@@ -0,0 +1,142 @@
+# file: backend/myapp/passwords.py
+#
+# Hashing & verifikasi password (bcrypt) di process pool terpisah.
+# bcrypt sengaja lambat (~250ms per operasi pada cost 12). Jika dijalankan langsung
+# di thread waitress, burst login bisa memakan semua worker thread dan request
+# ringan (GET playlist) ikut antre. Di sini pekerjaan bcrypt dikirim ke
+# ProcessPoolExecutor berukuran tetap, dengan batas antrean: jika penuh, view
+# langsung membalas 503 + Retry-After alih-alih mengantre tanpa batas.
+# Thread request tetap tertahan selama menunggu hasil dari pool, jadi jumlah pekerjaan
+# yang sedang berjalan + menunggu dibatasi max_in_flight, yang harus lebih kecil dari
+# jumlah thread waitress: sisa thread selalu bebas untuk request lain.
+#
+# Setting di development.ini:
+#   myapp.bcrypt.rounds = 12         (cost factor bcrypt)
+#   myapp.bcrypt.pool_size = 2       (jumlah proses; 0 = jalankan di thread request)
+#   myapp.bcrypt.max_pending = 8     (maksimal pekerjaan yang boleh menunggu di antrean)
+#   myapp.bcrypt.max_in_flight = 4   (maksimal thread request yang menunggu bcrypt; harus < threads
+#                                     di [server:main], default setengah thread default waitress)
+#   myapp.bcrypt.retry_after = 1     (detik, nilai header Retry-After saat pool penuh)
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+from waitress.adjustments import Adjustments
+
+from .metrics import timed
+
+DEFAULT_BCRYPT_ROUNDS = 12
+# Jika myapp.bcrypt.max_in_flight tidak diset: separuh thread waitress (default 4) untuk bcrypt
+DEFAULT_MAX_IN_FLIGHT = max(1, Adjustments.threads // 2)
+
+# Cache CryptContext per cost factor, di proses worker maupun proses utama
+_contexts = {}
+
+
+def get_crypt_context(rounds):
+    """
+    CryptContext bcrypt. min_rounds = rounds, sehingga hash lama dengan cost lebih
+    kecil ditandai perlu di-update (rehash) saat login berikutnya.
+    """
+    context = _contexts.get(rounds)
+    if context is None:
+        context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto",
+            bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+        _contexts[rounds] = context
+    return context
+
+
+# --- Fungsi yang dijalankan di proses worker (harus top-level agar bisa di-pickle) ---
+def _hash_in_worker(password, rounds):
+    return get_crypt_context(rounds).hash(password)
+
+
+def _verify_in_worker(password, password_hash, rounds):
+    """Mengembalikan (valid, new_hash). new_hash tidak None jika hash perlu di-rehash."""
+    return get_crypt_context(rounds).verify_and_update(password, password_hash)
+
+
+class PasswordPoolBusy(Exception):
+    """Antrean pool bcrypt penuh. View sebaiknya membalas 503 dengan header Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Pool bcrypt penuh, coba lagi dalam {retry_after} detik.')
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    def __init__(self, rounds=DEFAULT_BCRYPT_ROUNDS, pool_size=None, max_pending=None, retry_after=1,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.rounds = rounds
+        self.pool_size = (os.cpu_count() or 1) if pool_size is None else pool_size
+        self.max_pending = self.pool_size * 4 if max_pending is None else max_pending
+        self.retry_after = retry_after
+        # Slot = pekerjaan yang sedang berjalan + yang menunggu = thread request yang tertahan
+        self.max_in_flight = max(1, min(self.pool_size + self.max_pending, max_in_flight))
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # 'spawn' agar proses worker tidak mewarisi lock dari thread-thread waitress
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _run(self, func, *args):
+        if self.pool_size <= 0:
+            with timed('bcrypt'):
+                return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy(self.retry_after)
+        try:
+            with timed('bcrypt'):
+                return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash_in_worker, password, self.rounds)
+
+    def verify_and_update(self, password, password_hash):
+        """Mengembalikan (valid, new_hash); new_hash tidak None jika hash lama perlu diganti."""
+        return self._run(_verify_in_worker, password, password_hash, self.rounds)
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_hasher = None
+
+
+def get_password_hasher():
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher()
+    return _hasher
+
+
+def includeme(config):
+    global _hasher
+    settings = config.get_settings()
+    pool_size = settings.get('myapp.bcrypt.pool_size')
+    max_pending = settings.get('myapp.bcrypt.max_pending')
+    max_in_flight = settings.get('myapp.bcrypt.max_in_flight')
+    if _hasher is not None:
+        _hasher.shutdown()
+    _hasher = PasswordHasher(
+        rounds=int(settings.get('myapp.bcrypt.rounds', DEFAULT_BCRYPT_ROUNDS)),
+        pool_size=int(pool_size) if pool_size is not None else None,
+        max_pending=int(max_pending) if max_pending is not None else None,
+        retry_after=int(settings.get('myapp.bcrypt.retry_after', 1)),
+        max_in_flight=int(max_in_flight) if max_in_flight is not None else DEFAULT_MAX_IN_FLIGHT,
+    )
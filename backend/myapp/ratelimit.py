@@ -0,0 +1,267 @@
+# file: backend/myapp/ratelimit.py
+#
+# Rate limiting (token bucket) sebagai tween Pyramid, dijalankan SEBELUM router
+# memanggil view. Request yang melewati batas langsung dibalas 429 + Retry-After,
+# tanpa sempat menjalankan bcrypt, menulis ke storage, dan sebagainya.
+#
+# Aturan ditulis per nama route (lihat myapp/routes.py), satu aturan per baris:
+#   <route_name> <kunci> <jumlah>/<detik> [burst]
+# Kunci:
+#   ip       alamat IP client
+#   account  field "email" di body JSON (login/signup), membatasi tebakan password
+#            ke satu akun walau datang dari banyak IP
+#   user     email user yang login (token Bearer); jika belum login dipakai IP
+# Jumlah/detik menentukan kecepatan isi ulang token, burst = kapasitas bucket
+# (default sama dengan jumlah).
+#
+# Store bucket:
+#   memory   dict LRU di memori proses, dibatasi max_keys (default)
+#   sqlite   satu file SQLite (mode WAL) yang dipakai bersama beberapa proses waitress
+#
+# Setting di development.ini:
+#   myapp.ratelimit.enabled = true
+#   myapp.ratelimit.backend = memory            (atau sqlite)
+#   myapp.ratelimit.sqlite_path = %(here)s/data/ratelimit.sqlite3
+#   myapp.ratelimit.max_keys = 100000
+#   myapp.ratelimit.trust_forwarded = false     (true: IP dari X-Forwarded-For, hanya di belakang proxy)
+#   myapp.ratelimit.rules =
+#       api_login ip 20/60
+#       api_login account 5/60
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.response import Response
+from pyramid.tweens import INGRESS
+
+from .fastjson import dumps
+from .json_utils import DATA_DIR
+from .metrics import registry
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_KEYS = ('ip', 'account', 'user')
+DEFAULT_MAX_KEYS = 100000
+DEFAULT_SQLITE_PATH = os.path.join(DATA_DIR, 'ratelimit.sqlite3')
+
+registry.describe('ratelimit_rejected_total', 'counter', 'Request yang ditolak rate limiter (429) per route dan kunci.')
+
+RateLimitRule = namedtuple('RateLimitRule', 'route_name key rate burst')
+
+
+class RateLimitConfigError(ValueError):
+    pass
+
+
+def parse_rules(text):
+    """
+    Mengubah teks setting myapp.ratelimit.rules menjadi {route_name: [RateLimitRule, ...]}.
+    Melempar RateLimitConfigError jika ada baris yang tidak valid.
+    """
+    rules = {}
+    for line in (text or '').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) not in (3, 4):
+            raise RateLimitConfigError(f'Aturan rate limit tidak valid: "{line}"')
+        route_name, key, limit = parts[:3]
+        if key not in RATE_LIMIT_KEYS:
+            raise RateLimitConfigError(f"Kunci rate limit '{key}' tidak dikenal. Pilihan: {', '.join(RATE_LIMIT_KEYS)}")
+        try:
+            count, seconds = (float(value) for value in limit.split('/'))
+            burst = float(parts[3]) if len(parts) == 4 else count
+        except ValueError:
+            raise RateLimitConfigError(f'Batas rate limit tidak valid: "{line}" (format <jumlah>/<detik> [burst])')
+        if count <= 0 or seconds <= 0 or burst < 1:
+            raise RateLimitConfigError(f'Batas rate limit harus positif: "{line}"')
+        rules.setdefault(route_name, []).append(RateLimitRule(route_name, key, count / seconds, burst))
+    return rules
+
+
+def _refill(tokens, updated_at, now, rate, burst):
+    return min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+
+class MemoryBucketStore:
+    """
+    {kunci: (token, waktu update)} dengan urutan LRU. Jika penuh, bucket yang paling
+    lama tidak dipakai dibuang (bucket tersebut kembali penuh, jadi lebih longgar, bukan lebih ketat).
+    """
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, rate, burst, cost=1.0):
+        """Mengambil cost token. Mengembalikan (allowed, retry_after_detik)."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._buckets.get(key)
+            tokens = burst if state is None else _refill(state[0], state[1], now, rate, burst)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Bucket di tabel SQLite, dipakai bersama oleh beberapa proses. Setiap take() satu
+    transaksi BEGIN IMMEDIATE (baca + tulis satu baris lewat primary key).
+    Bucket yang sudah terisi penuh kembali dihapus berkala agar tabel tidak terus membesar.
+    """
+
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, db_path=DEFAULT_SQLITE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._takes = 0
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            ' key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_buckets_full_at ON buckets (full_at)')
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, rate, burst, cost=1.0):
+        """Mengambil cost token. Mengembalikan (allowed, retry_after_detik)."""
+        now = time.time()  # jam dinding, karena dibagi antar proses
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = burst if row is None else _refill(row[0], row[1], now, rate, burst)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (burst - tokens) / rate))
+            self._takes += 1
+            if self._takes % self.CLEANUP_EVERY == 0:
+                conn.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+class RateLimiter:
+    def __init__(self, rules, store, trust_forwarded=False):
+        self.rules = rules
+        self.store = store
+        self.trust_forwarded = trust_forwarded
+
+    def client_ip(self, request):
+        # request.client_addr membaca X-Forwarded-For yang bisa dipalsukan client; hanya dipakai di belakang proxy
+        return (request.client_addr if self.trust_forwarded else request.remote_addr) or 'unknown'
+
+    def _key_value(self, request, rule):
+        if rule.key == 'ip':
+            return self.client_ip(request)
+        if rule.key == 'account':
+            try:
+                data = request.json_body
+            except ValueError:
+                return None  # body tidak valid: dibiarkan, view membalas 400
+            email = data.get('email') if isinstance(data, dict) else None
+            return email.strip().lower() if isinstance(email, str) and email.strip() else None
+        user = request.user
+        return user['email'] if user is not None else 'ip:' + self.client_ip(request)
+
+    def check(self, request, route_name):
+        """Mengembalikan None jika request boleh lanjut, atau (rule, retry_after) untuk aturan yang terlampaui."""
+        for rule in self.rules.get(route_name, ()):
+            value = self._key_value(request, rule)
+            if value is None:
+                continue
+            allowed, retry_after = self.store.take(f'{route_name}:{rule.key}:{value}', rule.rate, rule.burst)
+            if not allowed:
+                return rule, retry_after
+        return None
+
+
+def too_many_requests(retry_after):
+    response = Response(dumps({'error': 'Terlalu banyak request, silakan coba lagi nanti.'}),
+                        status=429, content_type='application/json')
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def ratelimit_tween_factory(handler, registry_):
+    limiter = registry_.ratelimiter
+    mapper = registry_.queryUtility(IRoutesMapper)
+    if mapper is not None:
+        known_routes = {route.name for route in mapper.get_routes()}
+        for route_name in limiter.rules:
+            if route_name not in known_routes:
+                log.warning('Aturan rate limit untuk route yang tidak ada', extra={'route': route_name})
+
+    def ratelimit_tween(request):
+        # Router belum berjalan, jadi route dicocokkan sendiri (pola URL + predicate method)
+        route = mapper(request)['route'] if mapper is not None else None
+        if route is None or route.name not in limiter.rules:
+            return handler(request)
+        rejected = limiter.check(request, route.name)
+        if rejected is None:
+            return handler(request)
+        rule, retry_after = rejected
+        request.matched_route = route  # label route di metrik http_requests_total
+        registry.inc('ratelimit_rejected_total', (('route', route.name), ('key', rule.key)))
+        log.warning('Request ditolak rate limiter', extra={
+            'route': route.name, 'key': rule.key, 'ip': limiter.client_ip(request),
+            'retry_after': round(retry_after, 2)})
+        return too_many_requests(retry_after)
+    return ratelimit_tween
+
+
+def create_store(settings):
+    backend = settings.get('myapp.ratelimit.backend', 'memory').strip().lower()
+    if backend == 'memory':
+        return MemoryBucketStore(int(settings.get('myapp.ratelimit.max_keys', DEFAULT_MAX_KEYS)))
+    if backend == 'sqlite':
+        return SQLiteBucketStore(settings.get('myapp.ratelimit.sqlite_path', DEFAULT_SQLITE_PATH))
+    raise RateLimitConfigError(f"Backend rate limit '{backend}' tidak dikenal. Pilihan: memory, sqlite")
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if settings.get('myapp.ratelimit.enabled', 'true').strip().lower() not in ('true', '1', 'yes', 'on'):
+        return
+    rules = parse_rules(settings.get('myapp.ratelimit.rules', ''))
+    if not rules:
+        return
+    config.registry.ratelimiter = RateLimiter(
+        rules, create_store(settings),
+        trust_forwarded=settings.get('myapp.ratelimit.trust_forwarded', 'false').strip().lower() in ('true', '1', 'yes', 'on'))
+    # Di bawah tween metrik (jika aktif), agar respons 429 ikut tercatat di http_requests_total
+    config.add_tween('myapp.ratelimit.ratelimit_tween_factory', under=('myapp.metrics.metrics_tween_factory', INGRESS))
@@ -0,0 +1,112 @@
+# file: backend/myapp/renderers.py
+#
+# Renderer 'json' pengganti bawaan Pyramid (didaftarkan di myapp.main):
+# - Serialisasi lewat myapp.fastjson (orjson jika terpasang), hasilnya langsung bytes.
+# - View boleh mengembalikan RawJSON (bytes JSON yang sudah jadi), atau dict yang
+#   nilai-nilainya berisi RawJSON; bagian tersebut disalin apa adanya tanpa encode ulang.
+# - song_fragment(song) menyimpan hasil encode setiap lagu per song_id. Isi lagu dengan
+#   ID tertentu tidak berubah selama server berjalan (lagu hanya ditambahkan; dedupe
+#   hanya menghapus, dan ID tidak dipakai ulang), jadi respons daftar lagu playlist cukup
+#   menggabungkan bytes dari cache tanpa membandingkan dict lagu. Cache hanya menyimpan
+#   bytes, bukan dict lagu, agar tidak menahan objek yang dimaterialisasi SongTable.
+#   Storage memanggil invalidate_song_fragments() jika lagu yang sudah ada diganti/dihapus.
+#
+# Setting di development.ini:
+#   myapp.json.song_fragment_cache_size = 100000   (jumlah lagu yang disimpan encode-nya; 0 = nonaktif)
+
+from .fastjson import dumps
+from .metrics import timed
+
+DEFAULT_SONG_FRAGMENT_CACHE_SIZE = 100000
+
+
+class RawJSON:
+    """Bytes JSON yang sudah di-encode; dikirim apa adanya oleh renderer."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+def json_array(fragments):
+    """RawJSON berupa array dari list bytes JSON."""
+    return RawJSON(b'[' + b','.join(fragments) + b']')
+
+
+def encode(value):
+    if isinstance(value, RawJSON):
+        return value.data
+    if isinstance(value, dict) and any(isinstance(item, RawJSON) for item in value.values()):
+        # Satu level saja (misal {'items': RawJSON, 'next_cursor': ...}), cukup untuk respons halaman
+        parts = [dumps(key) + b':' + (item.data if isinstance(item, RawJSON) else dumps(item))
+                 for key, item in value.items()]
+        return b'{' + b','.join(parts) + b'}'
+    return dumps(value)
+
+
+class SongFragmentCache:
+    """
+    {song_id: bytes JSON}. Tanpa lock: get/set dict atomik di CPython, dan paling
+    buruk dua thread meng-encode lagu yang sama.
+    Jika penuh, entri paling lama dimasukkan yang dibuang (FIFO).
+    """
+
+    def __init__(self, max_entries=DEFAULT_SONG_FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._fragments = {}
+
+    def fragment(self, song):
+        song_id = song.get('id')
+        encoded = self._fragments.get(song_id)
+        if encoded is not None:
+            return encoded
+        encoded = dumps(song)
+        if self.max_entries > 0 and song_id is not None:
+            if len(self._fragments) >= self.max_entries:
+                try:
+                    del self._fragments[next(iter(self._fragments))]
+                except (KeyError, RuntimeError, StopIteration):
+                    pass
+            self._fragments[song_id] = encoded
+        return encoded
+
+    def clear(self):
+        # Dict baru, bukan clear(): thread lain yang sedang iterasi tidak terganggu
+        self._fragments = {}
+
+    def __len__(self):
+        return len(self._fragments)
+
+
+_song_fragments = SongFragmentCache()
+
+
+def song_fragment(song):
+    """Bytes JSON satu lagu, dari cache jika sudah pernah di-encode."""
+    return _song_fragments.fragment(song)
+
+
+def invalidate_song_fragments():
+    """Dipanggil storage setelah lagu yang sudah ada diganti atau dihapus."""
+    _song_fragments.clear()
+
+
+def fast_json_renderer_factory(info):
+    def _render(value, system):
+        request = system.get('request')
+        if request is not None:
+            response = request.response
+            if response.content_type == response.default_content_type:
+                response.content_type = 'application/json'
+        with timed('serialization'):
+            return encode(value)
+    return _render
+
+
+def includeme(config):
+    global _song_fragments
+    settings = config.get_settings()
+    _song_fragments = SongFragmentCache(
+        max_entries=int(settings.get('myapp.json.song_fragment_cache_size', DEFAULT_SONG_FRAGMENT_CACHE_SIZE)))
+    config.add_renderer('json', fast_json_renderer_factory)
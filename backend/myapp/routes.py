@@ -9,6 +9,7 @@ def includeme(config):
     config.add_route('api_get_playlists', '/api/playlists', request_method='GET')
     config.add_route('api_create_playlist', '/api/playlists', request_method='POST')
     config.add_route('api_delete_playlist', '/api/playlists/{playlist_id}', request_method='DELETE')
+    config.add_route('api_update_playlist', '/api/playlists/{playlist_id}', request_method='PATCH') # nama / flag publik
     config.add_route('api_get_playlist_songs', '/api/playlists/{playlist_id}/songs', request_method='GET')
     config.add_route('api_add_song_to_playlist', '/api/playlists/{playlist_id}/songs', request_method='POST') # Sudah ada
 
@@ -17,4 +18,29 @@ def includeme(config):
     # URL: '/api/playlists/{playlist_id}/songs/{song_id}' (menggunakan ID playlist dan ID lagu di path)
     # Method: DELETE
     config.add_route('api_remove_song_from_playlist', '/api/playlists/{playlist_id}/songs/{song_id}', request_method='DELETE')
-    # ----------------------------------------------------
\ No newline at end of file
+    # ----------------------------------------------------
+
+    # --- PERUBAHAN MASSAL LAGU DI PLAYLIST (add/remove/move/order dalam satu request) ---
+    config.add_route('api_batch_update_playlist_songs', '/api/playlists/{playlist_id}/songs', request_method='PATCH')
+
+    # --- PENCARIAN LAGU DI KOLEKSI LOKAL ---
+    # GET /api/songs/search?q=kata+kunci&limit=20
+    config.add_route('api_search_songs', '/api/songs/search', request_method='GET')
+
+    # --- EKSPOR SELURUH KOLEKSI LAGU (streaming, JSON array atau NDJSON) ---
+    # GET /api/songs/export?format=ndjson&fields=id,title
+    config.add_route('api_export_songs', '/api/songs/export', request_method='GET')
+
+    # --- FILE AUDIO LOKAL (Range / multi-range, lihat myapp/media.py) ---
+    # POST /api/songs/{song_id}/stream-token -> URL stream dengan token berumur pendek
+    # GET /api/songs/{song_id}/stream?token=...
+    config.add_route('api_song_stream_token', '/api/songs/{song_id}/stream-token', request_method='POST')
+    config.add_route('api_stream_song', '/api/songs/{song_id}/stream', request_method='GET')
+
+    # --- TOKEN URL UNTUK CHANGE FEED SSE (GET /api/events dilayani sidecar, lihat myapp/events.py) ---
+    # Sengaja bukan di bawah /api/events: prefix itu diteruskan proxy ke sidecar
+    config.add_route('api_event_token', '/api/event-token', request_method='POST')
+
+    # --- PENCARIAN LAGU DI JAMENDO LEWAT BACKEND (proxy + cache) ---
+    # GET /api/external/search?q=kata+kunci&limit=20
+    config.add_route('api_external_search', '/api/external/search', request_method='GET')
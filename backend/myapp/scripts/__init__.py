@@ -0,0 +1,2 @@
+# file: backend/myapp/scripts/__init__.py
+# Perintah command-line (console_scripts) untuk maintenance data.
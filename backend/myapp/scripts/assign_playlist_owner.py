@@ -0,0 +1,53 @@
+# file: backend/myapp/scripts/assign_playlist_owner.py
+#
+# Migrasi satu kali: playlist yang dibuat sebelum ada kepemilikan (owner kosong)
+# diberikan ke satu user. Sampai dimigrasi, playlist tersebut bisa dilihat dan
+# diubah oleh semua user yang login.
+#
+# Pemakaian (dari folder backend/):
+#   assign_playlist_owner development.ini --owner user@example.com
+#   assign_playlist_owner development.ini --owner user@example.com pl1 pl3
+#   assign_playlist_owner development.ini --owner user@example.com --force   (timpa pemilik yang sudah ada)
+#
+# Untuk backend json, jalankan saat server sedang berhenti (server menyimpan
+# data di memori dan akan menimpa hasil perubahan ini).
+
+import argparse
+import sys
+
+from pyramid.paster import get_appsettings, setup_logging
+
+from ..storage import create_storage
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Tetapkan pemilik playlist yang belum punya pemilik.')
+    parser.add_argument('config_uri', help='File konfigurasi, misal development.ini')
+    parser.add_argument('--owner', required=True, help='Email user pemilik baru (harus sudah terdaftar)')
+    parser.add_argument('--force', action='store_true', help='Ganti juga pemilik playlist yang sudah punya pemilik')
+    parser.add_argument('playlist_ids', nargs='*', help='ID playlist (default: semua playlist)')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    storage = create_storage(settings)
+    if storage.get_user(args.owner) is None:
+        print(f'User {args.owner} tidak ditemukan.', file=sys.stderr)
+        return 1
+    changed = storage.assign_playlist_owner(
+        args.owner, playlist_ids=args.playlist_ids or None, only_unowned=not args.force)
+    if not changed:
+        print('Tidak ada playlist yang diubah.')
+        return 0
+    for playlist_id in changed:
+        print(f'{playlist_id} -> {args.owner}')
+    print(f'{len(changed)} playlist diberikan ke {args.owner} (backend {storage.name}).')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# file: backend/myapp/scripts/dedupe_songs.py
+#
+# Perintah maintenance satu kali: menggabungkan lagu duplikat di koleksi
+# (source + original_id sama, atau URL ternormalisasi sama) dan mengarahkan
+# song_ids di semua playlist ke lagu yang dipertahankan.
+#
+# Pemakaian (dari folder backend/):
+#   dedupe_songs development.ini
+#
+# Untuk backend json, jalankan saat server sedang berhenti (server menyimpan
+# data di memori dan akan menimpa hasil perubahan ini).
+
+import argparse
+import sys
+
+from pyramid.paster import get_appsettings, setup_logging
+
+from ..storage import create_storage
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Gabungkan lagu duplikat di koleksi lagu.')
+    parser.add_argument('config_uri', help='File konfigurasi, misal development.ini')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    storage = create_storage(settings)
+    replacements = storage.dedupe_songs()
+    if not replacements:
+        print('Tidak ada lagu duplikat.')
+        return 0
+    for duplicate_id, survivor_id in sorted(replacements.items()):
+        print(f'{duplicate_id} -> {survivor_id}')
+    print(f'{len(replacements)} lagu duplikat digabungkan (backend {storage.name}).')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
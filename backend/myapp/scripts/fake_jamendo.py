@@ -0,0 +1,95 @@
+# file: backend/myapp/scripts/fake_jamendo.py
+#
+# Server palsu pengganti API Jamendo untuk development/testing tanpa internet
+# (dan tanpa menghabiskan kuota client ID). Membalas GET /v3.0/tracks/ dengan
+# format yang sama seperti Jamendo; hasil dibuat dari kata kunci pencarian.
+#
+# Pemakaian (dari folder backend/):
+#   fake_jamendo --port 8765 --delay 0.2
+# lalu di development.ini:
+#   myapp.external_search.base_url = http://127.0.0.1:8765/v3.0
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def fake_tracks(query, limit, base_url):
+    tracks = []
+    for number in range(1, limit + 1):
+        track_id = str(int(hashlib.sha1(f'{query}:{number}'.encode('utf-8')).hexdigest()[:8], 16))
+        tracks.append({
+            'id': track_id,
+            'name': f'{query.title()} #{number}',
+            'duration': 180 + number,
+            'artist_name': f'Artis {query.title()}',
+            'album_name': f'Album {query.title()}',
+            'image': f'{base_url}/images/{track_id}.jpg',
+            'audio': f'{base_url}/audio/{track_id}.mp3',
+            'audiodownload': f'{base_url}/audio/{track_id}.mp3?download=1',
+        })
+    return tracks
+
+
+def make_handler(delay):
+    class FakeJamendoHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 agar koneksi keep-alive dari pool backend bisa dipakai ulang
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path.rstrip('/') != '/v3.0/tracks':
+                self._send_json(404, {'headers': {'status': 'failed', 'error_message': 'Not found'}})
+                return
+            params = parse_qs(parts.query)
+            query = params.get('search', [''])[0]
+            try:
+                limit = min(int(params.get('limit', ['10'])[0]), 200)
+            except ValueError:
+                limit = 10
+            if delay:
+                time.sleep(delay)
+            results = fake_tracks(query, limit, f'http://{self.headers.get("Host", "localhost")}') if query else []
+            self._send_json(200, {
+                'headers': {'status': 'success', 'code': 0, 'error_message': '', 'results_count': len(results)},
+                'results': results,
+            })
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeJamendoHandler
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Server palsu API Jamendo (GET /v3.0/tracks/).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Jeda (detik) sebelum membalas, meniru latensi upstream')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay))
+    print(f'Fake Jamendo berjalan di http://{args.host}:{args.port}/v3.0 (Ctrl+C untuk berhenti)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
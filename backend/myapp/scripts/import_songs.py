@@ -0,0 +1,298 @@
+# file: backend/myapp/scripts/import_songs.py
+#
+# Import massal katalog lagu dari dump NDJSON atau CSV (boleh .gz) ke storage yang
+# dikonfigurasi (myapp.storage di development.ini).
+# - File dibaca bertahap per baris; memori yang dipakai hanya sebesar satu batch.
+# - Setiap baris divalidasi (title, artist, url wajib); baris yang tidak valid dihitung
+#   dan bisa ditulis ke file --rejects (NDJSON).
+# - Per batch: duplikat (source + original_id atau URL sama, dengan koleksi maupun di
+#   dalam batch) dilewati, ID dialokasikan sekaligus, dan batch ditulis dalam satu
+#   transaksi SQLite / satu flush log JSON (storage.import_songs).
+# - Setelah batch tersimpan, posisi byte di dump dicatat ke file state
+#   (<dump>.import-state.json). Import yang terhenti dilanjutkan dari batch terakhir
+#   yang tersimpan cukup dengan menjalankan perintah yang sama. Jika proses mati di
+#   antara commit batch dan penulisan state, batch itu dibaca ulang dan semua lagunya
+#   dilewati sebagai duplikat.
+#
+# Pemakaian (dari folder backend/):
+#   import_songs development.ini katalog.ndjson
+#   import_songs development.ini katalog.csv.gz --batch-size 20000 --rejects ditolak.ndjson
+#   import_songs development.ini katalog.ndjson --restart      (abaikan state, mulai dari awal)
+#
+# CSV harus punya baris header; kolom yang dikenali: title, artist, url, album, source,
+# original_id (kolom lain diabaikan). NDJSON: satu objek JSON per baris dengan field yang sama.
+#
+# Untuk backend json, jalankan saat server sedang berhenti (server menyimpan
+# data di memori dan akan menimpa hasil perubahan ini). Untuk backend sqlite dengan
+# myapp.shared_state, versi katalog dinaikkan setiap batch sehingga worker yang
+# sedang berjalan ikut memperbarui index pencarian.
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+
+from pyramid.paster import get_appsettings, setup_logging
+
+from .. import json_utils
+from ..fastjson import loads
+from ..storage import create_storage
+from ..storage.json_backend import ALL_SONGS_DB_FILE
+from ..versions import SONG_CATALOG_RESOURCE
+
+FORMATS = ('ndjson', 'csv')
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_SOURCE = 'import'
+PROGRESS_INTERVAL = 2.0  # detik
+STATE_SUFFIX = '.import-state.json'
+
+SONG_FIELDS = ('title', 'artist', 'url', 'album', 'source', 'original_id')
+REQUIRED_FIELDS = ('title', 'artist', 'url')
+
+
+class InvalidRow(ValueError):
+    """Satu baris dump tidak valid: dihitung/ditulis ke --rejects, import jalan terus."""
+
+
+class ImportAborted(Exception):
+    """Import tidak bisa dimulai/dilanjutkan (dump berubah, header CSV tidak ada)."""
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Import massal katalog lagu dari dump NDJSON/CSV.')
+    parser.add_argument('config_uri', help='File konfigurasi, misal development.ini')
+    parser.add_argument('dump', help='File dump (.ndjson, .jsonl, .csv, boleh diakhiri .gz)')
+    parser.add_argument('--format', choices=FORMATS, help='Format dump (default: dari ekstensi file)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Jumlah baris per transaksi (default {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help=f'Nilai "source" untuk baris tanpa source (default "{DEFAULT_SOURCE}")')
+    parser.add_argument('--state', help=f'File state untuk melanjutkan import (default <dump>{STATE_SUFFIX})')
+    parser.add_argument('--restart', action='store_true', help='Abaikan state yang ada dan mulai dari awal')
+    parser.add_argument('--rejects', help='Tulis baris yang tidak valid ke file NDJSON ini')
+    args = parser.parse_args(argv[1:])
+    if args.batch_size < 1:
+        parser.error('--batch-size minimal 1')
+    if args.format is None:
+        name = args.dump[:-3] if args.dump.endswith('.gz') else args.dump
+        args.format = 'csv' if name.lower().endswith('.csv') else 'ndjson'
+    return args
+
+
+def open_dump(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def iter_ndjson_records(f):
+    """(posisi byte setelah baris, dict) per baris; baris kosong dilewati."""
+    offset = f.tell()
+    for line in f:
+        offset += len(line)
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:  # JSONDecodeError, juga UnicodeDecodeError untuk byte non-UTF-8
+            yield offset, InvalidRow('JSON tidak valid')
+            continue
+        if not isinstance(record, dict):
+            yield offset, InvalidRow('baris bukan objek JSON')
+            continue
+        yield offset, record
+
+
+def read_csv_header(f):
+    """Nama kolom (huruf kecil) dan posisi byte setelah header."""
+    header = f.readline()
+    if not header.strip():
+        raise ImportAborted('File CSV tidak punya baris header.')
+    fieldnames = [name.strip().lower() for name in next(csv.reader([header.decode('utf-8-sig')]))]
+    return fieldnames, len(header)
+
+
+def iter_csv_records(f, fieldnames):
+    """
+    (posisi byte setelah record, dict) per record CSV. csv.reader meminta baris satu per
+    satu dari generator, jadi posisi saat record selesai adalah akhir record tersebut
+    (termasuk record dengan newline di dalam tanda kutip).
+    """
+    offset = f.tell()
+
+    def lines():
+        nonlocal offset
+        for line in f:
+            offset += len(line)
+            yield line.decode('utf-8', 'replace')
+
+    for values in csv.reader(lines()):
+        if not values or values == ['']:
+            continue
+        yield offset, dict(zip(fieldnames, values))
+
+
+def song_fields_from_record(record, default_source):
+    """Field lagu (bentuk sama dengan song_object di add_song_to_playlist_view) atau InvalidRow."""
+    fields = {}
+    for name in SONG_FIELDS:
+        value = record.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            raise InvalidRow(f'field "{name}" harus berupa teks')
+        value = value.strip() if value else None
+        fields[name] = value or None
+    missing = [name for name in REQUIRED_FIELDS if not fields[name]]
+    if missing:
+        raise InvalidRow(f"field wajib kosong: {', '.join(missing)}")
+    fields['album'] = fields['album'] or 'N/A'
+    fields['source'] = fields['source'] or default_source
+    return fields
+
+
+def dump_identity(path, dump_format):
+    stat = os.stat(path)
+    return {'dump': os.path.abspath(path), 'format': dump_format, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_state(state_path, identity):
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if any(state.get(key) != value for key, value in identity.items()):
+        raise ImportAborted(f'Dump berubah sejak import sebelumnya ({state_path}); jalankan dengan --restart.')
+    return state
+
+
+def save_state(state_path, state):
+    tmp_path = f'{state_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, state_path)
+
+
+def _version_store(settings):
+    """Store versi bersama jika mode multi-proses aktif, agar worker melihat lagu baru."""
+    if settings.get('myapp.shared_state', 'false').strip().lower() not in ('true', '1', 'yes', 'on'):
+        return None
+    from ..shared_state import DEFAULT_SQLITE_PATH, SharedStateDB, SQLiteVersionStore
+    return SQLiteVersionStore(SharedStateDB(settings.get('myapp.shared_state.sqlite_path', DEFAULT_SQLITE_PATH)))
+
+
+class Progress:
+    def __init__(self, state):
+        self.state = state
+        self.started = time.monotonic()
+        self.rows_at_start = state['rows']
+        self.last_report = 0.0
+
+    def report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        state = self.state
+        elapsed = max(now - self.started, 1e-9)
+        rate = (state['rows'] - self.rows_at_start) / elapsed
+        print(f"{state['rows']} baris dibaca, {state['created']} lagu baru, {state['duplicates']} duplikat, "
+              f"{state['invalid']} tidak valid, {rate:,.0f} baris/detik", flush=True)
+
+
+def run_import(storage, args, state, state_path, version_store=None):
+    rejects = open(args.rejects, 'a', encoding='utf-8') if args.rejects else None
+    progress = Progress(state)
+    batch = []
+
+    def commit(offset, final=False):
+        if batch:
+            created = storage.import_songs(batch)
+            state['created'] += created
+            state['duplicates'] += len(batch) - created
+            if created and version_store is not None:
+                version_store.bump([SONG_CATALOG_RESOURCE])
+            batch.clear()
+        state['offset'] = offset
+        save_state(state_path, state)
+        progress.report(force=final)
+
+    try:
+        with open_dump(args.dump) as f:
+            if args.format == 'csv':
+                fieldnames, header_end = read_csv_header(f)
+                f.seek(max(state['offset'], header_end))
+                records = iter_csv_records(f, fieldnames)
+            else:
+                f.seek(state['offset'])
+                records = iter_ndjson_records(f)
+
+            offset = state['offset']
+            for offset, record in records:
+                state['rows'] += 1
+                try:
+                    if isinstance(record, InvalidRow):
+                        raise record
+                    batch.append(song_fields_from_record(record, args.source))
+                except InvalidRow as e:
+                    state['invalid'] += 1
+                    if rejects is not None:
+                        rejects.write(json.dumps({'row': state['rows'], 'error': str(e),
+                                                  'record': None if isinstance(record, InvalidRow) else record},
+                                                 ensure_ascii=False) + '\n')
+                if len(batch) >= args.batch_size:
+                    commit(offset)
+            state['done'] = True
+            commit(offset, final=True)
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    state_path = args.state or args.dump + STATE_SUFFIX
+    identity = dump_identity(args.dump, args.format)
+    try:
+        state = None if args.restart else load_state(state_path, identity)
+    except ImportAborted as e:
+        print(e, file=sys.stderr)
+        return 1
+    if state is not None and state.get('done'):
+        print(f'Dump ini sudah selesai di-import ({state_path}); jalankan dengan --restart untuk mengulang.')
+        return 0
+    if state is None:
+        state = {**identity, 'offset': 0, 'rows': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'done': False}
+    else:
+        print(f"Melanjutkan import dari baris {state['rows'] + 1} (byte {state['offset']}).")
+
+    storage = create_storage(settings)
+    if storage.name == 'json':
+        # Compaction otomatis menserialisasi seluruh koleksi setiap log melewati 1 MB, yang
+        # untuk import jutaan baris terjadi terus-menerus; cukup sekali di akhir
+        json_utils.WAL_COMPACT_THRESHOLD_BYTES = float('inf')
+    try:
+        run_import(storage, args, state, state_path, version_store=_version_store(settings))
+    except ImportAborted as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print('\nDihentikan. Jalankan perintah yang sama untuk melanjutkan dari batch terakhir yang tersimpan.',
+              file=sys.stderr)
+        return 130
+    if storage.name == 'json':
+        json_utils.compact_json_log(ALL_SONGS_DB_FILE)
+    print(f"Selesai: {state['created']} lagu baru, {state['duplicates']} duplikat, "
+          f"{state['invalid']} tidak valid (backend {storage.name}).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
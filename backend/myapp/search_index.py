@@ -0,0 +1,259 @@
+# file: backend/myapp/search_index.py
+#
+# Inverted index di memori untuk mencari lagu berdasarkan title, artist, dan album.
+# - Teks dinormalisasi: aksen dibuang (NFKD) dan huruf dikecilkan (casefold),
+#   jadi "Beyoncé" cocok dengan "beyonce".
+# - Semua kata di query harus cocok (AND). Kata terakhir boleh berupa awalan
+#   (prefix), cocok untuk pencarian sambil mengetik: "mau dib" -> "Mau Dibawa Kemana".
+# - Ranking: bobot field (title > artist > album), kecocokan kata utuh > prefix.
+# - Index dibangun sekali dari storage saat pencarian pertama, lalu di-update
+#   per lagu lewat add_song(); tidak pernah dibangun ulang per request.
+# - Mode multi-proses (lihat myapp/shared_state.py): lagu bisa ditambahkan worker lain.
+#   Versi koleksi lagu dicek paling sering sekali per interval; jika berubah, lagu
+#   yang ditambahkan sejak sinkron terakhir (storage.songs_added_since) di-index.
+#
+# Agar tetap cepat di katalog besar (jutaan lagu), ekspansi prefix kata terakhir dibatasi:
+# prefix minimal MIN_PREFIX_LENGTH huruf, maksimal MAX_PREFIX_EXPANSIONS kata, dan
+# berhenti menambah kata jika total postings hasil ekspansi melewati MAX_PREFIX_POSTINGS.
+
+import bisect
+import heapq
+from operator import itemgetter
+import re
+import threading
+import time
+import unicodedata
+
+from .versions import SONG_CATALOG_RESOURCE, get_version
+
+FIELD_WEIGHTS = {'title': 3, 'artist': 2, 'album': 1}
+PREFIX_MATCH_FACTOR = 0.5
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 64
+MAX_PREFIX_POSTINGS = 2000
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    if text.isascii():
+        # Jalur cepat: teks ASCII tidak punya aksen
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(normalize_text(str(text)))
+
+
+class SongSearchIndex:
+    """
+    Postings disimpan per bobot: token -> {bobot: set(song_id)}. Dengan begitu
+    gabungan/irisan kandidat memakai operasi set (berjalan di C), dan pencarian
+    satu kata bisa berhenti setelah `limit` hasil karena bucket sudah terurut
+    dari skor tertinggi.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}     # token -> {bobot: set(song_id)}
+        self._sizes = {}        # token -> jumlah lagu yang mengandung token
+        self._vocabulary = []   # token terurut, untuk pencarian prefix dengan bisect
+        self._song_tokens = {}  # song_id -> {token: bobot} (untuk update/hapus)
+        self.built = False
+
+    def build(self, songs):
+        """Membangun index dari iterable dict lagu (dipanggil sekali)."""
+        with self._lock:
+            self._postings = {}
+            self._sizes = {}
+            self._song_tokens = {}
+            for song in songs:
+                self._index_song(song, update_vocabulary=False)
+            self._vocabulary = sorted(self._postings)
+            self.built = True
+
+    def _index_song(self, song, update_vocabulary=True):
+        song_id = song['id']
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(song.get(field)):
+                weights[token] = weights.get(token, 0) + field_weight
+        for token, weight in weights.items():
+            buckets = self._postings.get(token)
+            if buckets is None:
+                buckets = self._postings[token] = {}
+                self._sizes[token] = 0
+                if update_vocabulary:
+                    bisect.insort(self._vocabulary, token)
+            bucket = buckets.get(weight)
+            if bucket is None:
+                bucket = buckets[weight] = set()
+            bucket.add(song_id)
+            self._sizes[token] += 1
+        self._song_tokens[song_id] = weights
+
+    def add_song(self, song):
+        """Menambahkan/memperbarui satu lagu. Diabaikan jika index belum dibangun."""
+        with self._lock:
+            if not self.built:
+                return
+            self.remove_song(song['id'])
+            self._index_song(song)
+
+    def remove_song(self, song_id):
+        with self._lock:
+            for token, weight in self._song_tokens.pop(song_id, {}).items():
+                buckets = self._postings.get(token)
+                if buckets is None or song_id not in buckets.get(weight, ()):
+                    continue
+                buckets[weight].discard(song_id)
+                if not buckets[weight]:
+                    del buckets[weight]
+                self._sizes[token] -= 1
+                if not buckets:
+                    del self._postings[token]
+                    del self._sizes[token]
+                    index = bisect.bisect_left(self._vocabulary, token)
+                    if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                        del self._vocabulary[index]
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not token.startswith(prefix):
+                break
+            if token != prefix:
+                terms.append(token)
+        return terms[:MAX_PREFIX_EXPANSIONS]
+
+    def _scored_sets(self, query_token, allow_prefix):
+        """
+        Mengembalikan (jumlah_kandidat, [(skor, set song_id), ...]) untuk satu kata
+        query, terurut dari skor tertinggi. Set tidak disalin.
+        """
+        scored = []
+        size = 0
+        exact = self._postings.get(query_token)
+        if exact:
+            scored.extend((weight, songs) for weight, songs in exact.items())
+            size += self._sizes[query_token]
+        if allow_prefix and len(query_token) >= MIN_PREFIX_LENGTH:
+            budget = MAX_PREFIX_POSTINGS
+            for term in self._prefix_terms(query_token):
+                scored.extend((weight * PREFIX_MATCH_FACTOR, songs) for weight, songs in self._postings[term].items())
+                size += self._sizes[term]
+                budget -= self._sizes[term]
+                if budget <= 0:
+                    break
+        scored.sort(key=itemgetter(0), reverse=True)
+        return size, scored
+
+    def search(self, query, limit=20):
+        """Mengembalikan list (song_id, skor) terurut dari yang paling relevan."""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        last = len(query_tokens) - 1
+        with self._lock:
+            per_token = []
+            for position, token in enumerate(query_tokens):
+                size, scored = self._scored_sets(token, allow_prefix=(position == last))
+                if not scored:
+                    return []
+                per_token.append((size, scored))
+
+            if len(per_token) == 1:
+                # Satu kata: ambil dari bucket skor tertinggi sampai dapat `limit` hasil
+                results = []
+                seen = set()
+                for score, songs in per_token[0][1]:
+                    for song_id in songs:
+                        if song_id not in seen:
+                            seen.add(song_id)
+                            results.append((song_id, score))
+                            if len(results) >= limit:
+                                return results
+                return results
+
+            # Beberapa kata: irisan kandidat dengan operasi set, mulai dari kata paling jarang
+            per_token.sort(key=itemgetter(0))
+            candidates = None
+            for _, scored in per_token:
+                token_songs = set().union(*(songs for _, songs in scored))
+                candidates = token_songs if candidates is None else candidates & token_songs
+                if not candidates:
+                    return []
+
+            totals = dict.fromkeys(candidates, 0)
+            for _, scored in per_token:
+                remaining = set(candidates)
+                for score, songs in scored:
+                    matched = remaining & songs
+                    for song_id in matched:
+                        totals[song_id] += score
+                    remaining -= matched
+                    if not remaining:
+                        break
+        return heapq.nlargest(limit, totals.items(), key=itemgetter(1))
+
+
+_search_index = SongSearchIndex()
+_build_lock = threading.Lock()
+
+# Sinkronisasi dengan worker lain (None = satu proses, tidak perlu dicek)
+_refresh_interval = None
+_last_refresh_check = 0.0
+_synced_version = None  # versi koleksi lagu saat index terakhir sinkron
+_song_marker = None     # posisi storage.song_marker() saat index terakhir sinkron
+
+
+def enable_refresh(interval):
+    """Dipanggil myapp.shared_state: cek perubahan koleksi lagu paling sering setiap `interval` detik."""
+    global _refresh_interval
+    _refresh_interval = interval
+
+
+def _refresh(storage):
+    global _last_refresh_check, _synced_version, _song_marker
+    now = time.monotonic()
+    if now - _last_refresh_check < _refresh_interval:
+        return
+    _last_refresh_check = now
+    version = get_version(SONG_CATALOG_RESOURCE)[0]
+    if version == _synced_version:
+        return
+    with _build_lock:
+        if version == _synced_version:
+            return
+        # add_song idempoten, jadi lagu yang sudah di-index lewat index_song() aman terbaca lagi
+        songs, _song_marker = storage.songs_added_since(_song_marker)
+        for song in songs:
+            _search_index.add_song(song)
+        _synced_version = version
+
+
+def get_search_index(storage):
+    """Index global; dibangun dari storage.iter_songs() saat pertama kali dibutuhkan."""
+    global _last_refresh_check, _synced_version, _song_marker
+    if not _search_index.built:
+        with _build_lock:
+            if not _search_index.built:
+                if _refresh_interval is not None:
+                    # Dicatat sebelum membaca lagu: lagu yang masuk di tengah build ikut terbaca saat refresh
+                    _last_refresh_check = time.monotonic()
+                    _synced_version = get_version(SONG_CATALOG_RESOURCE)[0]
+                    _song_marker = storage.song_marker()
+                _search_index.build(storage.iter_songs())
+    elif _refresh_interval is not None:
+        _refresh(storage)
+    return _search_index
+
+
+def index_song(song):
+    """Dipanggil setelah lagu baru disimpan ke storage."""
+    _search_index.add_song(song)
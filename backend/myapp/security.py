@@ -0,0 +1,67 @@
+# file: backend/myapp/security.py
+#
+# Security policy Pyramid: header Authorization hanya di-parse SEKALI per request,
+# lalu token dicek ke session store (lookup O(1)). Hasilnya tersedia di view
+# sebagai request.user ({'email': ...} atau None), sehingga view tidak perlu lagi
+# menyalin blok pengecekan token masing-masing.
+
+from pyramid.request import RequestLocalCache
+from pyramid.security import Allowed, Denied
+
+from .sessions import get_session_store, includeme as _sessions_includeme
+
+
+def get_bearer_token(request):
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[-1] # Ambil token setelah 'Bearer '
+
+
+class TokenSecurityPolicy:
+    def __init__(self):
+        self.identity_cache = RequestLocalCache(self.load_identity)
+
+    def load_identity(self, request):
+        token = get_bearer_token(request)
+        if not token:
+            return None
+        email = get_session_store().get(token)
+        if email is None:
+            return None
+        return {'email': email, 'token': token}
+
+    def identity(self, request):
+        return self.identity_cache.get_or_create(request)
+
+    def authenticated_userid(self, request):
+        identity = self.identity(request)
+        return identity['email'] if identity else None
+
+    def permits(self, request, context, permission):
+        if self.identity(request) is not None:
+            return Allowed('Token valid.')
+        return Denied('Token tidak ada atau tidak valid.')
+
+    def remember(self, request, userid, **kw):
+        return []
+
+    def forget(self, request, **kw):
+        identity = self.identity(request)
+        if identity is not None:
+            get_session_store().delete(identity['token'])
+        return []
+
+
+def unauthorized(request):
+    """Response 401 standar untuk view yang membutuhkan login."""
+    request.response.status_code = 401 # Unauthorized
+    if get_bearer_token(request) is None:
+        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
+    return {'error': 'Token tidak valid atau sesi telah berakhir.'}
+
+
+def includeme(config):
+    _sessions_includeme(config)
+    config.set_security_policy(TokenSecurityPolicy())
+    config.add_request_method(lambda request: request.identity, 'user', reify=True)
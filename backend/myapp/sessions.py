@@ -0,0 +1,192 @@
+# file: backend/myapp/sessions.py
+#
+# Session store untuk token login (pengganti dict sessions_db yang tidak pernah
+# kedaluwarsa dan hilang saat restart).
+# - Setiap token punya waktu kedaluwarsa (TTL absolut sejak login).
+# - Jumlah sesi dibatasi max_entries; jika penuh, sesi yang paling lama tidak
+#   dipakai (LRU) dibuang. Jadi memori tidak tumbuh tanpa batas.
+# - Opsional: sesi disimpan ke data/sessions.json lewat write-ahead log json_utils,
+#   sehingga user tidak perlu login ulang setelah server restart.
+# - Yang disimpan (di memori, file, maupun tabel SQLite) hanya SHA-256 dari token, bukan
+#   token itu sendiri: siapa pun yang bisa membaca folder data tidak bisa memakai isinya
+#   untuk login sebagai user lain. Token acak 256 bit, jadi hash tanpa salt sudah cukup.
+#
+# Setting di development.ini:
+#   myapp.session.ttl = 86400          (detik)
+#   myapp.session.max_entries = 10000
+#   myapp.session.persist = true
+#
+# Pada mode multi-proses (myapp.shared_state, lihat myapp/shared_state.py) dipakai
+# SQLiteSessionStore: token yang dibuat satu worker langsung berlaku di worker lain.
+
+import hashlib
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from .json_utils import load_data_from_json, save_data_to_json
+
+SESSIONS_DB_FILE = 'sessions.json'
+
+DEFAULT_SESSION_TTL = 24 * 60 * 60
+DEFAULT_SESSION_MAX_ENTRIES = 10000
+
+_TOKEN_HASH_RE = re.compile(r'[0-9a-f]{64}')
+
+
+def hash_token(token):
+    """Key sesi untuk token login: SHA-256 (hex) dari token."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def is_token_hash(value):
+    """True jika value sudah berupa hash_token(); key lama di sessions.json berisi token mentah."""
+    return _TOKEN_HASH_RE.fullmatch(value) is not None
+
+
+class SessionStore:
+    def __init__(self, ttl=DEFAULT_SESSION_TTL, max_entries=DEFAULT_SESSION_MAX_ENTRIES, persist=False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist = persist
+        self._lock = threading.Lock()
+        # {hash_token(token): {'email': ..., 'expires_at': ...}}, urutan = LRU (paling lama dipakai di depan)
+        self._sessions = OrderedDict()
+        if persist:
+            self._load()
+
+    def _load(self):
+        now = time.time()
+        stored = load_data_from_json(SESSIONS_DB_FILE, {})
+        # File dari versi lama berisi token mentah sebagai key: di-hash saat dimuat
+        live = sorted(
+            ((key if is_token_hash(key) else hash_token(key), entry)
+             for key, entry in stored.items() if entry.get('expires_at', 0) > now),
+            key=lambda item: item[1]['expires_at'])
+        self._sessions = OrderedDict(live[-self.max_entries:] if self.max_entries else live)
+        # Tulis ulang snapshot tanpa sesi yang sudah kedaluwarsa (dan tanpa token mentah)
+        save_data_to_json(self._sessions, SESSIONS_DB_FILE)
+
+    def _persist(self, changed_keys):
+        if self.persist and changed_keys:
+            save_data_to_json(self._sessions, SESSIONS_DB_FILE, changed_keys=changed_keys, wait=False)
+
+    def create(self, email):
+        """Membuat sesi baru dan mengembalikan tokennya (hanya hash-nya yang disimpan)."""
+        token = secrets.token_urlsafe(32)
+        key = hash_token(token)
+        changed = [key]
+        with self._lock:
+            self._sessions[key] = {'email': email, 'expires_at': time.time() + self.ttl}
+            while self.max_entries and len(self._sessions) > self.max_entries:
+                evicted_key, _ = self._sessions.popitem(last=False)
+                changed.append(evicted_key)
+            self._persist(changed)
+        return token
+
+    def get(self, token):
+        """Mengembalikan email pemilik token, atau None jika tidak ada/kedaluwarsa. O(1)."""
+        key = hash_token(token)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= time.time():
+                del self._sessions[key]
+                self._persist([key])
+                return None
+            self._sessions.move_to_end(key)
+            return entry['email']
+
+    def delete(self, token):
+        key = hash_token(token)
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self._persist([key])
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """
+    Sesi di tabel sessions database bersama (lihat SharedStateDB). Interface sama dengan
+    SessionStore. Lookup hash token lewat primary key; sesi kedaluwarsa dan kelebihan
+    max_entries dibersihkan berkala saat login, bukan di setiap request.
+    """
+
+    CLEANUP_EVERY = 100
+
+    def __init__(self, db, ttl=DEFAULT_SESSION_TTL, max_entries=DEFAULT_SESSION_MAX_ENTRIES):
+        self.db = db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._creates = 0
+
+    def create(self, email):
+        """Membuat sesi baru dan mengembalikan tokennya."""
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        with self.db.write() as conn:
+            conn.execute('INSERT INTO sessions (token_hash, email, expires_at, last_used_at) VALUES (?, ?, ?, ?)',
+                         (hash_token(token), email, now + self.ttl, now))
+            self._creates += 1
+            if self._creates % self.CLEANUP_EVERY == 0:
+                self._cleanup(conn, now)
+        return token
+
+    def _cleanup(self, conn, now):
+        conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,))
+        if self.max_entries:
+            # Sesi yang paling lama tidak dipakai dibuang (LRU)
+            conn.execute(
+                'DELETE FROM sessions WHERE token_hash IN (SELECT token_hash FROM sessions ORDER BY last_used_at DESC '
+                'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def get(self, token):
+        """Mengembalikan email pemilik token, atau None jika tidak ada/kedaluwarsa."""
+        now = time.time()
+        key = hash_token(token)
+        row = self.db.conn.execute('SELECT email, expires_at, last_used_at FROM sessions WHERE token_hash = ?',
+                                   (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        if now - row[2] > 60:
+            # last_used_at (untuk LRU) cukup diperbarui paling sering sekali per menit per token
+            with self.db.write() as conn:
+                conn.execute('UPDATE sessions SET last_used_at = ? WHERE token_hash = ?', (now, key))
+        return row[0]
+
+    def delete(self, token):
+        with self.db.write() as conn:
+            conn.execute('DELETE FROM sessions WHERE token_hash = ?', (hash_token(token),))
+
+    def __len__(self):
+        return self.db.conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+_session_store = None
+
+
+def set_session_store(store):
+    global _session_store
+    _session_store = store
+
+
+def get_session_store():
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore()
+    return _session_store
+
+
+def includeme(config):
+    global _session_store
+    settings = config.get_settings()
+    _session_store = SessionStore(
+        ttl=int(settings.get('myapp.session.ttl', DEFAULT_SESSION_TTL)),
+        max_entries=int(settings.get('myapp.session.max_entries', DEFAULT_SESSION_MAX_ENTRIES)),
+        persist=settings.get('myapp.session.persist', 'false').strip().lower() in ('true', '1', 'yes', 'on'),
+    )
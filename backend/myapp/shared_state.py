@@ -0,0 +1,241 @@
+# file: backend/myapp/shared_state.py
+#
+# Mode multi-proses: beberapa worker (misal `gunicorn --paste development.ini -w 4`,
+# atau beberapa proses waitress di belakang reverse proxy) melayani data yang sama.
+# State yang tadinya hanya hidup di memori satu proses dipindah ke satu file SQLite
+# bersama (mode WAL):
+# - sesi login (SQLiteSessionStore di myapp/sessions.py): token dari satu worker
+#   berlaku di semua worker
+# - counter versi ETag (SQLiteVersionStore): perubahan di satu worker mengubah ETag
+#   di worker lain, jadi tidak ada 304 untuk data yang sebenarnya sudah berubah
+# - event change feed (SQLiteEventLog, jika myapp.events.enabled): sidecar SSE di satu
+#   worker mengirim perubahan yang dibuat di worker mana pun
+# - secret token URL (jika myapp.url_token.secret kosong): token stream/event yang
+#   dibuat satu worker bisa diverifikasi worker lain
+# Cache di memori setiap proses diinvalidasi lewat counter versi tersebut: index
+# pencarian mengecek versi koleksi lagu paling sering sekali per poll_interval, dan
+# jika berubah hanya lagu yang ditambahkan sejak terakhir sinkron yang di-index.
+#
+# Data (user, lagu, playlist) harus memakai myapp.storage = sqlite; backend json
+# memegang seluruh data di memori proses sehingga tidak bisa dipakai bersama.
+#
+# Setting di development.ini:
+#   myapp.shared_state = false          (true: aktifkan mode multi-proses)
+#   myapp.shared_state.sqlite_path = %(here)s/data/shared_state.sqlite3
+#   myapp.shared_state.poll_interval = 1    (detik)
+
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .events import Event, get_event_log, set_event_log
+from .fastjson import dumps
+from .json_utils import DATA_DIR
+from .search_index import enable_refresh
+from .sessions import SQLiteSessionStore, get_session_store, hash_token, set_session_store
+from .url_tokens import UrlTokenSigner, set_url_token_signer
+from .versions import set_version_store
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = os.path.join(DATA_DIR, 'shared_state.sqlite3')
+DEFAULT_POLL_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    resource TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    modified_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    token_hash TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_used ON sessions (last_used_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    data BLOB NOT NULL,
+    owner TEXT,
+    public INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class SharedStateDB:
+    """
+    Satu koneksi per thread, dibuat ulang jika proses di-fork setelah koneksi dibuka
+    (misal gunicorn --preload), karena koneksi SQLite tidak boleh dipakai lintas proses.
+    """
+
+    def __init__(self, db_path=DEFAULT_SQLITE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        with self.write() as conn:
+            legacy_sessions = self._take_legacy_sessions(conn)
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            # Epoch & waktu dibuat disimpan sekali, dipakai semua worker untuk ETag yang sama
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (secrets.token_hex(6),))
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created_at', ?)", (repr(time.time()),))
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('url_token_secret', ?)",
+                         (secrets.token_hex(32),))
+            meta = dict(conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('epoch', 'created_at', 'url_token_secret')"))
+            if legacy_sessions:
+                conn.executemany('INSERT OR IGNORE INTO sessions (token_hash, email, expires_at, last_used_at) '
+                                 'VALUES (?, ?, ?, ?)',
+                                 [(hash_token(row[0]),) + tuple(row[1:]) for row in legacy_sessions])
+        self.epoch = meta['epoch']
+        self.created_at = float(meta['created_at'])
+        self.url_token_secret = meta['url_token_secret']
+
+    @staticmethod
+    def _take_legacy_sessions(conn):
+        """Tabel sessions versi lama (kolom token berisi token mentah): isinya diambil lalu tabelnya dihapus."""
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(sessions)')]
+        if 'token' not in columns:
+            return []
+        rows = conn.execute('SELECT token, email, expires_at, last_used_at FROM sessions').fetchall()
+        conn.execute('DROP TABLE sessions')
+        log.info('Tabel sessions dimigrasi ke hash token', extra={'sessions': len(rows)})
+        return rows
+
+    @property
+    def conn(self):
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    @contextmanager
+    def write(self):
+        """Transaksi tulis (BEGIN IMMEDIATE, sama seperti SQLiteStorage._write)."""
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+
+class SQLiteVersionStore:
+    """Counter versi resource di tabel versions (interface sama dengan versions.MemoryVersionStore)."""
+
+    def __init__(self, db):
+        self.db = db
+        self.epoch = db.epoch
+
+    def bump(self, resources):
+        now = time.time()
+        with self.db.write() as conn:
+            conn.executemany(
+                'INSERT INTO versions (resource, version, modified_at) VALUES (?, 1, ?) '
+                'ON CONFLICT(resource) DO UPDATE SET version = version + 1, modified_at = excluded.modified_at',
+                [(resource, now) for resource in resources])
+
+    def get(self, resource):
+        row = self.db.conn.execute(
+            'SELECT version, modified_at FROM versions WHERE resource = ?', (resource,)).fetchone()
+        return (row[0], row[1]) if row is not None else (0, self.db.created_at)
+
+
+class SQLiteEventLog:
+    """
+    Event log di tabel events (interface sama dengan events.MemoryEventLog). id AUTOINCREMENT
+    menjadi seq, sehingga urutannya sama di semua worker. Listener hanya dipanggil untuk
+    event dari proses ini; event dari worker lain terlihat lewat polling sidecar.
+    """
+
+    # Baris lama dipangkas setiap sekian append, bukan di setiap append
+    PRUNE_EVERY = 100
+
+    def __init__(self, db, buffer_size, poll_interval):
+        self.db = db
+        self.epoch = db.epoch
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self._listeners = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def append(self, event_type, data, owner, public):
+        with self.db.write() as conn:
+            seq = conn.execute(
+                'INSERT INTO events (type, data, owner, public, created_at) VALUES (?, ?, ?, ?, ?)',
+                (event_type, dumps(data), owner, int(bool(public)), time.time())).lastrowid
+            if seq % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM events WHERE id <= ?', (seq - self.buffer_size,))
+        for listener in self._listeners:
+            listener()
+
+    def last_seq(self):
+        # sqlite_sequence tetap menyimpan id terakhir walaupun barisnya sudah dipangkas
+        row = self.db.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+        return row[0] if row is not None else 0
+
+    def read_since(self, seq):
+        """Event dengan id > seq, atau None jika sebagian sudah dipangkas."""
+        conn = self.db.conn
+        last = self.last_seq()
+        if seq > last:
+            return None
+        oldest = conn.execute('SELECT MIN(id) FROM events').fetchone()[0]
+        if seq < (last + 1 if oldest is None else oldest) - 1:
+            return None
+        rows = conn.execute(
+            'SELECT id, type, data, owner, public FROM events WHERE id > ? ORDER BY id', (seq,)).fetchall()
+        return [Event(row[0], row[1], bytes(row[2]), row[3], bool(row[4])) for row in rows]
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if settings.get('myapp.shared_state', 'false').strip().lower() not in ('true', '1', 'yes', 'on'):
+        return
+    if settings.get('myapp.storage', 'json').strip().lower() != 'sqlite':
+        raise ValueError('myapp.shared_state = true membutuhkan myapp.storage = sqlite '
+                         '(backend json menyimpan data di memori masing-masing proses).')
+
+    db = SharedStateDB(settings.get('myapp.shared_state.sqlite_path', DEFAULT_SQLITE_PATH))
+    set_version_store(SQLiteVersionStore(db))
+    # TTL & batas jumlah sesi mengikuti setting myapp.session.* (store dari myapp.security)
+    sessions = get_session_store()
+    set_session_store(SQLiteSessionStore(db, ttl=sessions.ttl, max_entries=sessions.max_entries))
+    if not settings.get('myapp.url_token.secret', '').strip():
+        set_url_token_signer(UrlTokenSigner(db.url_token_secret))
+    poll_interval = float(settings.get('myapp.shared_state.poll_interval', DEFAULT_POLL_INTERVAL))
+    enable_refresh(poll_interval)
+    # Change feed aktif (myapp.events di-include lebih dulu): buffer mengikuti setting-nya
+    event_log = get_event_log()
+    if event_log is not None:
+        set_event_log(SQLiteEventLog(db, event_log.buffer_size, poll_interval))
+
+    if (settings.get('myapp.ratelimit.enabled', 'true').strip().lower() in ('true', '1', 'yes', 'on')
+            and settings.get('myapp.ratelimit.backend', 'memory').strip().lower() == 'memory'):
+        log.warning('Rate limit memakai store memory: batasnya berlaku per worker, '
+                    'pakai myapp.ratelimit.backend = sqlite untuk batas bersama')
+    log.info('Mode multi-proses aktif', extra={'path': db.db_path, 'pid': os.getpid()})
@@ -0,0 +1,106 @@
+# file: backend/myapp/storage/__init__.py
+#
+# Abstraksi storage yang dipanggil oleh views.
+# Backend dipilih dari development.ini:
+#
+#   myapp.storage = json             (default, file JSON di backend/data/)
+#   myapp.storage = sqlite           (SQLite mode WAL, bisa dipakai beberapa proses)
+#   myapp.storage.sqlite_path = %(here)s/data/asyikin.sqlite3
+#
+# Semua backend menyediakan method yang sama:
+#   users     : get_user(email), add_user(email, user_data), update_password_hash(email, password_hash)
+#   songs     : get_song(song_id), get_songs(song_ids), iter_songs(),
+#               song_marker(), songs_added_since(marker) -> (songs, marker),
+#               find_song_by_keys(song_fields), add_song(song_fields) -> (song, created),
+#               add_songs(songs_fields) -> [(song, created), ...], dedupe_songs(),
+#               import_songs(songs_fields) -> jumlah lagu baru (import massal per batch)
+#   playlists : list_playlists(), list_playlists_by_owner(owners), list_public_playlists(),
+#               get_playlist(playlist_id), create_playlist(name, owner, public),
+#               update_playlist(playlist_id, name, public), assign_playlist_owner(owner, playlist_ids, only_unowned),
+#               delete_playlist(playlist_id), add_song_to_playlist(playlist_id, song_id),
+#               remove_song_from_playlist(playlist_id, song_id),
+#               update_playlist_songs(playlist_id, add, remove, moves, order) -> (playlist, summary)
+#   Playlist berisi 'owner' (email pemilik, None = playlist lama tanpa pemilik) dan 'public' (bool).
+#
+# Di aplikasi, backend dibungkus LazyStorage: file JSON / database baru dibuka saat
+# method storage pertama kali dipanggil (atau saat warm-up, lihat myapp/lifecycle.py).
+
+import os
+import threading
+
+from ..json_utils import DATA_DIR
+from ..metrics import InstrumentedProxy
+
+STORAGE_BACKENDS = ('json', 'sqlite')
+DEFAULT_SQLITE_PATH = os.path.join(DATA_DIR, 'asyikin.sqlite3')
+
+_storage = None
+
+
+def create_storage(settings):
+    """
+    Membuat instance backend storage sesuai settings (dict dari development.ini).
+    """
+    backend = settings.get('myapp.storage', 'json').strip().lower()
+    if backend == 'json':
+        from .json_backend import JsonStorage
+        return JsonStorage()
+    if backend == 'sqlite':
+        from .sqlite_backend import SQLiteStorage
+        return SQLiteStorage(settings.get('myapp.storage.sqlite_path', DEFAULT_SQLITE_PATH))
+    raise ValueError(f"Backend storage '{backend}' tidak dikenal. Pilihan: {', '.join(STORAGE_BACKENDS)}")
+
+
+class LazyStorage:
+    """
+    Membuat backend lewat factory saat pertama kali dibutuhkan. Thread yang datang
+    bersamaan menunggu satu pemuatan yang sama.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._backend is not None
+
+    def load(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    from ..lifecycle import startup_phase
+                    with startup_phase('storage'):
+                        self._backend = self._factory()
+        return self._backend
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            # Atribut dunder (misal dicek venusian saat config.scan()) tidak boleh memicu pemuatan
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+def set_storage(storage):
+    global _storage
+    _storage = storage
+
+
+def get_storage():
+    """
+    Mengembalikan backend storage aktif.
+    Jika belum dikonfigurasi lewat includeme (misal dipanggil dari script), pakai backend JSON.
+    """
+    global _storage
+    if _storage is None:
+        _storage = create_storage({})
+    return _storage
+
+
+def includeme(config):
+    settings = config.get_settings()
+    # Setiap pemanggilan method storage dicatat di metrik phase 'storage' (lihat myapp/metrics.py)
+    storage = InstrumentedProxy(LazyStorage(lambda: create_storage(settings)), 'storage')
+    set_storage(storage)
+    config.registry.storage = storage
@@ -0,0 +1,20 @@
+# file: backend/myapp/storage/defaults.py
+# Data awal (seed) yang dipakai semua backend storage jika data belum ada.
+
+DEFAULT_ALL_SONGS_DB = {
+    's1': {'id': 's1', 'title': 'Mau Dibawa Kemana', 'artist': 'Armada', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3'},
+    's2': {'id': 's2', 'title': 'Senyumlah', 'artist': 'Andmesh', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3'},
+    's3': {'id': 's3', 'title': 'Lemon', 'artist': 'Kenzhi Yonezu', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3'},
+    's4': {'id': 's4', 'title': 'Wind', 'artist': 'Akeboshi', 'url': 'URL_MUSIK_DUMMY_4.mp3'},
+    's5': {'id': 's5', 'title': 'Sparkle', 'artist': 'RADWIMPS', 'url': 'URL_MUSIK_DUMMY_5.mp3'},
+    's6': {'id': 's6', 'title': 'Blur', 'artist': 'Yorushika', 'url': 'URL_MUSIK_DUMMY_6.mp3'},
+    's7': {'id': 's7', 'title': 'Halu', 'artist': 'Feby Putri', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-4.mp3'},
+    's8': {'id': 's8', 'title': 'To The Bone', 'artist': 'Pamungkas', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-5.mp3'},
+    's9': {'id': 's9', 'title': 'Secukupnya', 'artist': 'Hindia', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-6.mp3'},
+    's10': {'id': 's10', 'title': 'Monokrom', 'artist': 'Tulus', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-7.mp3'}
+}
+DEFAULT_PLAYLISTS_DB = {
+    'pl1': {'id': 'pl1', 'name': 'Playlist Pop Indonesia Hits', 'song_ids': ['s1', 's2', 's9', 's10']},
+    'pl2': {'id': 'pl2', 'name': 'Santai Sore OST Anime', 'song_ids': ['s3', 's4', 's5', 's6']},
+    'pl3': {'id': 'pl3', 'name': 'Indie Favorit', 'song_ids': ['s7', 's8']},
+}
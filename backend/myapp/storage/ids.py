@@ -0,0 +1,47 @@
+# file: backend/myapp/storage/ids.py
+#
+# Pembuat ID bebas tabrakan, pengganti skema len(DB)+1 / uuid4()[:4].
+# len()+1 bisa menghasilkan ID yang sama untuk dua request paralel (dan setelah
+# ada yang dihapus), jadi kita pakai counter monotonik yang di-seed dari
+# angka terbesar pada ID yang sudah ada.
+
+import itertools
+import re
+import threading
+
+
+def max_numeric_suffix(ids, prefix):
+    """Angka terbesar dari ID berbentuk <prefix><digit>, misal 's045' -> 45."""
+    pattern = re.compile(re.escape(prefix) + r'(\d+)$')
+    highest = 0
+    for existing_id in ids:
+        match = pattern.match(existing_id)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def format_id(prefix, number, width):
+    return prefix + str(number).zfill(width)
+
+
+class IdAllocator:
+    """
+    Counter ID thread-safe dalam satu proses.
+    Contoh: IdAllocator('pl', 2, existing_ids) -> 'pl06', 'pl07', ...
+    """
+
+    def __init__(self, prefix, width, existing_ids=()):
+        self.prefix = prefix
+        self.width = width
+        self._lock = threading.Lock()
+        self._counter = itertools.count(max_numeric_suffix(existing_ids, prefix) + 1)
+
+    def next_id(self):
+        with self._lock:
+            return format_id(self.prefix, next(self._counter), self.width)
+
+    def next_ids(self, count):
+        """Mengalokasikan beberapa ID sekaligus (untuk import massal)."""
+        with self._lock:
+            return [format_id(self.prefix, next(self._counter), self.width) for _ in range(count)]
@@ -0,0 +1,391 @@
+# file: backend/myapp/storage/json_backend.py
+#
+# Backend storage berbasis file JSON (users.json, songs.json, playlists.json)
+# dengan write-ahead log dari json_utils. Semua data dipegang di memori.
+#
+# Aturan konkurensi (waitress melayani request dari banyak thread):
+# - Nilai di dalam dict TIDAK PERNAH diubah di tempat (copy-on-write). Mutasi membuat
+#   objek playlist baru lalu mengganti entri dict-nya, sehingga pembaca dan thread
+#   flusher json_utils selalu melihat snapshot yang konsisten tanpa lock.
+# - Mutasi pada satu playlist diserialkan oleh lock per playlist, jadi request ke
+#   playlist yang berbeda tidak saling menunggu.
+# - Lock dilepas sebelum menunggu fsync, sehingga mutasi lain bisa ikut di flush yang sama.
+# - Index pemilik -> ID playlist (dan himpunan playlist publik) dijaga di memori, jadi
+#   daftar playlist milik satu user tidak perlu memindai seluruh PLAYLISTS_DB.
+# - Koleksi lagu disimpan sebagai SongTable (tabel kolom, lihat song_table.py), bukan
+#   satu dict per lagu; get_song() dkk. tetap mengembalikan dict lagu.
+
+import threading
+
+from ..json_utils import load_data_from_json, save_data_to_json, wait_for_json_flush
+from ..renderers import invalidate_song_fragments
+from .defaults import DEFAULT_ALL_SONGS_DB, DEFAULT_PLAYLISTS_DB
+from .ids import IdAllocator
+from .playlist_batch import apply_playlist_batch
+from .song_keys import group_duplicates, remap_song_ids, song_keys
+from .song_table import SongTable
+
+# Nama file untuk database (akan disimpan di backend/data/)
+USERS_DB_FILE = 'users.json'
+PLAYLISTS_DB_FILE = 'playlists.json'
+ALL_SONGS_DB_FILE = 'songs.json'
+
+
+def _with_access_fields(playlist):
+    """Entri playlists.json lama belum punya owner/public: dianggap tanpa pemilik dan privat."""
+    if 'owner' in playlist and 'public' in playlist:
+        return playlist
+    return {**playlist, 'owner': playlist.get('owner'), 'public': bool(playlist.get('public', False))}
+
+
+class JsonStorage:
+    name = 'json'
+
+    def __init__(self):
+        # Muat data dari file JSON, gunakan data default jika file tidak ada/kosong
+        self.users_db = load_data_from_json(USERS_DB_FILE, {})
+        self.ALL_SONGS_DB = load_data_from_json(ALL_SONGS_DB_FILE, DEFAULT_ALL_SONGS_DB, factory=SongTable.from_dict)
+        self.PLAYLISTS_DB = {
+            playlist_id: _with_access_fields(playlist)
+            for playlist_id, playlist in load_data_from_json(PLAYLISTS_DB_FILE, DEFAULT_PLAYLISTS_DB).items()}
+
+        self._users_lock = threading.Lock()
+        self._songs_lock = threading.Lock()
+        self._playlist_locks = {}
+        self._playlist_locks_guard = threading.Lock()
+        self._playlist_index_lock = threading.Lock()
+
+        # Contoh ID: s011, s012 dan pl06, pl07
+        self._song_ids = IdAllocator('s', 3, self.ALL_SONGS_DB.keys())
+        self._playlist_ids = IdAllocator('pl', 2, self.PLAYLISTS_DB.keys())
+
+        # Index sekunder (source, original_id) dan URL ternormalisasi -> song_id
+        self._song_id_by_key = {}
+        self._index_song_keys(self.ALL_SONGS_DB.iter_rows())
+
+        # Index pemilik (email, None = playlist lama tanpa pemilik) -> {playlist_id: None}
+        # (dict sebagai set berurutan) dan {playlist_id: None} untuk playlist publik
+        self._playlist_ids_by_owner = {}
+        self._public_playlist_ids = {}
+        for playlist in self.PLAYLISTS_DB.values():
+            self._index_playlist(None, playlist)
+
+    def _index_playlist(self, old, new):
+        """Memperbarui index pemilik/publik dari versi lama ke versi baru playlist (None = tidak ada)."""
+        with self._playlist_index_lock:
+            if old is not None:
+                owned = self._playlist_ids_by_owner.get(old['owner'])
+                if owned is not None:
+                    owned.pop(old['id'], None)
+                    if not owned:
+                        del self._playlist_ids_by_owner[old['owner']]
+                self._public_playlist_ids.pop(old['id'], None)
+            if new is not None:
+                self._playlist_ids_by_owner.setdefault(new['owner'], {})[new['id']] = None
+                if new['public']:
+                    self._public_playlist_ids[new['id']] = None
+
+    def _index_song_keys(self, songs):
+        for song in songs:
+            for key in song_keys(song):
+                # Jika sudah ada duplikat lama, lagu yang paling awal yang dipakai
+                self._song_id_by_key.setdefault(key, song['id'])
+
+    def _playlist_lock(self, playlist_id):
+        with self._playlist_locks_guard:
+            lock = self._playlist_locks.get(playlist_id)
+            if lock is None:
+                lock = self._playlist_locks[playlist_id] = threading.Lock()
+            return lock
+
+    # --- Users ---
+    def get_user(self, email):
+        return self.users_db.get(email)
+
+    def add_user(self, email, user_data):
+        """Mengembalikan False jika email sudah terdaftar."""
+        with self._users_lock:
+            if email in self.users_db:
+                return False
+            self.users_db[email] = dict(user_data)
+            ticket = save_data_to_json(self.users_db, USERS_DB_FILE, changed_keys=[email], wait=False)
+        wait_for_json_flush(USERS_DB_FILE, ticket)
+        return True
+
+    def update_password_hash(self, email, password_hash):
+        with self._users_lock:
+            user_data = self.users_db.get(email)
+            if user_data is None:
+                return False
+            self.users_db[email] = {**user_data, 'password_hash': password_hash}
+            ticket = save_data_to_json(self.users_db, USERS_DB_FILE, changed_keys=[email], wait=False)
+        wait_for_json_flush(USERS_DB_FILE, ticket)
+        return True
+
+    # --- Songs ---
+    def get_song(self, song_id):
+        return self.ALL_SONGS_DB.get(song_id)
+
+    def get_songs(self, song_ids):
+        """Mengembalikan {song_id: song} untuk ID yang ditemukan saja."""
+        songs_db = self.ALL_SONGS_DB
+        found = {}
+        for song_id in song_ids:
+            song = songs_db.get(song_id)
+            if song is not None:
+                found[song_id] = song
+        return found
+
+    def iter_songs(self):
+        """Iterasi semua lagu (baris yang ada saat iterasi dimulai, aman walau ada insert paralel)."""
+        return self.ALL_SONGS_DB.iter_rows(0, self.ALL_SONGS_DB.row_count)
+
+    def song_marker(self):
+        """Posisi akhir koleksi lagu saat ini (jumlah baris SongTable), untuk songs_added_since."""
+        return self.ALL_SONGS_DB.row_count
+
+    def songs_added_since(self, marker):
+        """Lagu yang disimpan setelah song_marker() == marker. Mengembalikan (songs, marker_baru)."""
+        row_count = self.ALL_SONGS_DB.row_count
+        return list(self.ALL_SONGS_DB.iter_rows(marker or 0, row_count)), row_count
+
+    def find_song_by_keys(self, song_fields):
+        for key in song_keys(song_fields):
+            song_id = self._song_id_by_key.get(key)
+            if song_id is not None:
+                song = self.ALL_SONGS_DB.get(song_id)
+                if song is not None:
+                    return song
+        return None
+
+    def add_song(self, song_fields):
+        """
+        Menyimpan lagu baru, atau mengembalikan lagu yang sudah ada jika
+        (source, original_id) atau URL-nya sama. Mengembalikan (song, created).
+        """
+        return self.add_songs([song_fields])[0]
+
+    def add_songs(self, songs_fields):
+        """
+        Versi massal add_song: semua lagu disimpan dengan satu flush.
+        Mengembalikan list (song, created) dengan urutan yang sama dengan input.
+        """
+        results = []
+        new_song_ids = []
+        with self._songs_lock:
+            for song_fields in songs_fields:
+                existing = self.find_song_by_keys(song_fields)
+                if existing is not None:
+                    results.append((existing, False))
+                    continue
+                local_song_id = self._song_ids.next_id()
+                song = {'id': local_song_id, **song_fields}
+                self.ALL_SONGS_DB[local_song_id] = song
+                self._index_song_keys([song])
+                new_song_ids.append(local_song_id)
+                results.append((song, True))
+            if not new_song_ids:
+                return results
+            ticket = save_data_to_json(self.ALL_SONGS_DB, ALL_SONGS_DB_FILE, changed_keys=new_song_ids, wait=False)
+        wait_for_json_flush(ALL_SONGS_DB_FILE, ticket)
+        return results
+
+    def import_songs(self, songs_fields):
+        """
+        Import massal (lihat myapp/scripts/import_songs.py): lagu yang kuncinya sudah ada
+        di koleksi atau muncul lebih dulu di batch yang sama dilewati, ID dialokasikan
+        sekaligus, dan seluruh batch disimpan dengan satu flush. Mengembalikan jumlah lagu baru.
+        """
+        with self._songs_lock:
+            new_songs = []
+            batch_keys = set()
+            for song_fields in songs_fields:
+                keys = song_keys(song_fields)
+                if any(key in batch_keys or key in self._song_id_by_key for key in keys):
+                    continue
+                batch_keys.update(keys)
+                new_songs.append(song_fields)
+            if not new_songs:
+                return 0
+            new_song_ids = self._song_ids.next_ids(len(new_songs))
+            new_songs = [{'id': song_id, **song_fields} for song_id, song_fields in zip(new_song_ids, new_songs)]
+            for song in new_songs:
+                self.ALL_SONGS_DB[song['id']] = song
+            self._index_song_keys(new_songs)
+            ticket = save_data_to_json(self.ALL_SONGS_DB, ALL_SONGS_DB_FILE, changed_keys=new_song_ids, wait=False)
+        wait_for_json_flush(ALL_SONGS_DB_FILE, ticket)
+        return len(new_songs)
+
+    def dedupe_songs(self):
+        """
+        Menggabungkan lagu duplikat yang sudah tersimpan: song_ids di semua playlist
+        diarahkan ke lagu yang dipertahankan, lalu duplikatnya dihapus.
+        Mengembalikan {song_id_duplikat: song_id_yang_dipertahankan}.
+        """
+        with self._songs_lock:
+            replacements = group_duplicates(list(self.ALL_SONGS_DB.iter_rows()))
+            if not replacements:
+                return {}
+            changed_playlists = []
+            for playlist_id, playlist in list(self.PLAYLISTS_DB.items()):
+                if not any(song_id in replacements for song_id in playlist['song_ids']):
+                    continue
+                with self._playlist_lock(playlist_id):
+                    playlist = self.PLAYLISTS_DB.get(playlist_id)
+                    if playlist is None:
+                        continue
+                    self.PLAYLISTS_DB[playlist_id] = {
+                        **playlist, 'song_ids': remap_song_ids(playlist['song_ids'], replacements)}
+                    changed_playlists.append(playlist_id)
+            save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=changed_playlists)
+
+            for duplicate_id in replacements:
+                self.ALL_SONGS_DB.pop(duplicate_id, None)
+            invalidate_song_fragments()
+            self._song_id_by_key = {}
+            self._index_song_keys(self.ALL_SONGS_DB.iter_rows())
+            save_data_to_json(self.ALL_SONGS_DB, ALL_SONGS_DB_FILE, changed_keys=list(replacements))
+        return replacements
+
+    # --- Playlists ---
+    def list_playlists(self):
+        return list(self.PLAYLISTS_DB.values())
+
+    def _playlists_by_ids(self, playlist_ids):
+        playlists_db = self.PLAYLISTS_DB
+        return [playlists_db[playlist_id] for playlist_id in playlist_ids if playlist_id in playlists_db]
+
+    def list_playlists_by_owner(self, owners):
+        """Playlist milik owners (list email; None = playlist tanpa pemilik), lewat index pemilik."""
+        with self._playlist_index_lock:
+            playlist_ids = [playlist_id for owner in owners
+                            for playlist_id in self._playlist_ids_by_owner.get(owner, ())]
+        return self._playlists_by_ids(playlist_ids)
+
+    def list_public_playlists(self):
+        with self._playlist_index_lock:
+            playlist_ids = list(self._public_playlist_ids)
+        return self._playlists_by_ids(playlist_ids)
+
+    def get_playlist(self, playlist_id):
+        return self.PLAYLISTS_DB.get(playlist_id)
+
+    def create_playlist(self, name, owner=None, public=False):
+        new_playlist_id = self._playlist_ids.next_id()
+        new_playlist = {'id': new_playlist_id, 'name': name, 'song_ids': [], 'owner': owner, 'public': bool(public)}
+        self.PLAYLISTS_DB[new_playlist_id] = new_playlist
+        self._index_playlist(None, new_playlist)
+        save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=[new_playlist_id])
+        return new_playlist
+
+    def delete_playlist(self, playlist_id):
+        """Mengembalikan playlist yang dihapus, atau None jika tidak ada."""
+        with self._playlist_lock(playlist_id):
+            deleted = self.PLAYLISTS_DB.pop(playlist_id, None)
+            if deleted is None:
+                return None
+            self._index_playlist(deleted, None)
+            ticket = save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=[playlist_id], wait=False) # record 'del'
+        with self._playlist_locks_guard:
+            self._playlist_locks.pop(playlist_id, None)
+        wait_for_json_flush(PLAYLISTS_DB_FILE, ticket)
+        return deleted
+
+    def _update_playlist(self, playlist_id, mutate):
+        """
+        Menjalankan mutate(song_ids) -> (song_ids_baru, changed) di bawah lock playlist.
+        Mengembalikan (playlist, changed); (None, False) jika playlist tidak ditemukan.
+        """
+        with self._playlist_lock(playlist_id):
+            playlist = self.PLAYLISTS_DB.get(playlist_id)
+            if playlist is None:
+                return None, False
+            new_song_ids, changed = mutate(playlist['song_ids'])
+            if not changed:
+                return playlist, False
+            playlist = {**playlist, 'song_ids': new_song_ids}
+            self.PLAYLISTS_DB[playlist_id] = playlist
+            ticket = save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=[playlist_id], wait=False)
+        wait_for_json_flush(PLAYLISTS_DB_FILE, ticket)
+        return playlist, True
+
+    def update_playlist(self, playlist_id, name=None, public=None):
+        """Mengubah nama dan/atau flag publik. Mengembalikan playlist baru, atau None jika tidak ada."""
+        with self._playlist_lock(playlist_id):
+            playlist = self.PLAYLISTS_DB.get(playlist_id)
+            if playlist is None:
+                return None
+            changes = {}
+            if name is not None and name != playlist['name']:
+                changes['name'] = name
+            if public is not None and bool(public) != playlist['public']:
+                changes['public'] = bool(public)
+            if not changes:
+                return playlist
+            updated = {**playlist, **changes}
+            self.PLAYLISTS_DB[playlist_id] = updated
+            self._index_playlist(playlist, updated)
+            ticket = save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=[playlist_id], wait=False)
+        wait_for_json_flush(PLAYLISTS_DB_FILE, ticket)
+        return updated
+
+    def assign_playlist_owner(self, owner, playlist_ids=None, only_unowned=True):
+        """
+        Migrasi: menetapkan pemilik playlist (semua playlist, atau playlist_ids saja).
+        only_unowned=True melewati playlist yang sudah punya pemilik.
+        Mengembalikan list ID playlist yang diubah.
+        """
+        if playlist_ids is None:
+            playlist_ids = list(self.PLAYLISTS_DB)
+        changed = []
+        for playlist_id in playlist_ids:
+            with self._playlist_lock(playlist_id):
+                playlist = self.PLAYLISTS_DB.get(playlist_id)
+                if playlist is None or playlist['owner'] == owner:
+                    continue
+                if only_unowned and playlist['owner'] is not None:
+                    continue
+                updated = {**playlist, 'owner': owner}
+                self.PLAYLISTS_DB[playlist_id] = updated
+                self._index_playlist(playlist, updated)
+                changed.append(playlist_id)
+        if changed:
+            save_data_to_json(self.PLAYLISTS_DB, PLAYLISTS_DB_FILE, changed_keys=changed)
+        return changed
+
+    def add_song_to_playlist(self, playlist_id, song_id):
+        """
+        Mengembalikan (playlist, added). added False jika lagu sudah ada di playlist.
+        Mengembalikan (None, False) jika playlist tidak ditemukan.
+        """
+        def mutate(song_ids):
+            if song_id in song_ids:
+                return song_ids, False
+            return song_ids + [song_id], True
+        return self._update_playlist(playlist_id, mutate)
+
+    def remove_song_from_playlist(self, playlist_id, song_id):
+        """
+        Mengembalikan (playlist, removed). removed False jika lagu tidak ada di playlist.
+        Mengembalikan (None, False) jika playlist tidak ditemukan.
+        """
+        def mutate(song_ids):
+            if song_id not in song_ids:
+                return song_ids, False
+            return [existing for existing in song_ids if existing != song_id], True
+        return self._update_playlist(playlist_id, mutate)
+
+    def update_playlist_songs(self, playlist_id, add=(), remove=(), moves=(), order=None):
+        """
+        Menerapkan batch add/remove/move/order (lihat playlist_batch.py) dengan satu flush.
+        Mengembalikan (playlist, summary); (None, None) jika playlist tidak ditemukan.
+        Melempar PlaylistBatchError jika batch tidak valid (tidak ada yang disimpan).
+        """
+        summary = None
+
+        def mutate(song_ids):
+            nonlocal summary
+            new_song_ids, summary = apply_playlist_batch(song_ids, add, remove, moves, order)
+            return new_song_ids, new_song_ids != song_ids
+        playlist, _ = self._update_playlist(playlist_id, mutate)
+        return playlist, summary
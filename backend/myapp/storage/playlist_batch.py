@@ -0,0 +1,59 @@
+# file: backend/myapp/storage/playlist_batch.py
+#
+# Perubahan massal pada urutan lagu sebuah playlist (dipakai semua backend).
+# Urutan operasi dalam satu batch:
+#   1. remove : hapus song_id yang disebut
+#   2. add    : tambahkan di akhir, song_id yang sudah ada di playlist dilewati
+#   3. move   : [(song_id, position), ...] dijalankan berurutan
+#   4. order  : urutan lengkap; harus berisi tepat semua lagu playlist setelah langkah 1-3
+# Jika ada operasi yang tidak valid, PlaylistBatchError dilempar sebelum apa pun
+# disimpan, jadi batch selalu diterapkan seluruhnya atau tidak sama sekali.
+
+
+class PlaylistBatchError(ValueError):
+    """Operasi batch tidak valid (dibalas 400 oleh view)."""
+
+
+def apply_playlist_batch(song_ids, add=(), remove=(), moves=(), order=None):
+    """
+    Mengembalikan (song_ids_baru, summary). song_ids tidak diubah.
+    summary: {'added': [...], 'removed': [...], 'moved': [...]}.
+    """
+    present = set(song_ids)
+
+    remove_set = set(remove) & present
+    removed = [song_id for song_id in song_ids if song_id in remove_set]
+    new_song_ids = [song_id for song_id in song_ids if song_id not in remove_set] if remove_set else list(song_ids)
+    present -= remove_set
+
+    added = []
+    for song_id in add:
+        if song_id not in present:
+            present.add(song_id)
+            new_song_ids.append(song_id)
+            added.append(song_id)
+
+    moved = []
+    for song_id, position in moves:
+        if song_id not in present:
+            raise PlaylistBatchError(f'Lagu ID {song_id} tidak ada di playlist, tidak bisa dipindah.')
+        if not isinstance(position, int) or isinstance(position, bool) or position < 0:
+            raise PlaylistBatchError(f'Posisi untuk lagu ID {song_id} harus berupa angka >= 0.')
+        current = new_song_ids.index(song_id)
+        position = min(position, len(new_song_ids) - 1)
+        if current != position:
+            del new_song_ids[current]
+            new_song_ids.insert(position, song_id)
+            moved.append(song_id)
+
+    if order is not None:
+        order = list(order)
+        if len(order) != len(new_song_ids) or set(order) != present:
+            raise PlaylistBatchError(
+                'Field "order" harus berisi tepat semua lagu di playlist (setelah add/remove), tanpa duplikat.')
+        already_moved = set(moved)
+        moved.extend(song_id for song_id, before in zip(order, new_song_ids)
+                     if song_id != before and song_id not in already_moved)
+        new_song_ids = order
+
+    return new_song_ids, {'added': added, 'removed': removed, 'moved': moved}
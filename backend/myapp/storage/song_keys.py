@@ -0,0 +1,101 @@
+# file: backend/myapp/storage/song_keys.py
+#
+# Kunci identitas lagu untuk mencegah duplikat di koleksi:
+# - source_key: (source, original_id), misal ('jamendo', '1234567')
+# - url_key: URL yang dinormalisasi (scheme/host huruf kecil, tanpa port default,
+#   tanpa fragment, tanpa '/' di akhir, parameter query diurutkan)
+# Dua lagu dianggap sama jika salah satu kunci tersebut sama.
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    if not url:
+        return None
+    url = str(url).strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        # Bukan URL absolut (misal 'URL_MUSIK_DUMMY_4.mp3'): bandingkan apa adanya
+        return url
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def source_key(source, original_id):
+    """Mengembalikan 'source:original_id', atau None jika original_id tidak ada."""
+    if original_id is None or original_id == '' or not source:
+        return None
+    return f'{str(source).strip().lower()}:{str(original_id).strip()}'
+
+
+def song_keys(song):
+    """Semua kunci identitas sebuah lagu (dict)."""
+    keys = []
+    key = source_key(song.get('source'), song.get('original_id'))
+    if key:
+        keys.append(('source', key))
+    key = normalize_url(song.get('url'))
+    if key:
+        keys.append(('url', key))
+    return keys
+
+
+def group_duplicates(songs):
+    """
+    Mengelompokkan lagu duplikat (union-find atas kedua kunci).
+    Mengembalikan {song_id_duplikat: song_id_yang_dipertahankan}; lagu pertama
+    (urutan iterasi, yaitu yang paling lama disimpan) di tiap kelompok dipertahankan.
+    """
+    parent = {}
+
+    def find(song_id):
+        root = song_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[song_id] != root:
+            parent[song_id], song_id = root, parent[song_id]
+        return root
+
+    owner_of_key = {}
+    order = {}
+    for song in songs:
+        song_id = song['id']
+        parent[song_id] = song_id
+        order[song_id] = len(order)
+        for key in song_keys(song):
+            owner = owner_of_key.get(key)
+            if owner is None:
+                owner_of_key[key] = song_id
+                continue
+            root_a, root_b = find(owner), find(song_id)
+            if root_a != root_b:
+                # Akar kelompok selalu lagu yang paling awal
+                if order[root_a] < order[root_b]:
+                    parent[root_b] = root_a
+                else:
+                    parent[root_a] = root_b
+
+    return {song_id: find(song_id) for song_id in parent if find(song_id) != song_id}
+
+
+def remap_song_ids(song_ids, replacements):
+    """Mengganti ID duplikat dengan ID yang dipertahankan, tanpa duplikat, urutan tetap."""
+    seen = set()
+    result = []
+    for song_id in song_ids:
+        song_id = replacements.get(song_id, song_id)
+        if song_id not in seen:
+            seen.add(song_id)
+            result.append(song_id)
+    return result
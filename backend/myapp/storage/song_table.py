@@ -0,0 +1,218 @@
+# file: backend/myapp/storage/song_table.py
+#
+# Koleksi lagu ringkas untuk backend json (pengganti dict {song_id: dict lagu}).
+# Satu dict per lagu memakan ratusan byte: tabel hash-nya sendiri, satu objek str per
+# nilai, dan string artist/album/source yang sama disimpan berkali-kali. Di sini lagu
+# disimpan per kolom dengan nomor baris (integer) sebagai ID internal:
+# - title, url, original_id: satu record UTF-8 per baris ("title\0url\0original_id")
+#   yang disambung dalam satu bytearray, dengan offset/panjang di array('Q')/array('I')
+#   dan bitmask None per baris; tidak ada objek str per nilai
+# - artist, album, source: dictionary encoding, kolom berupa array('I') berisi kode
+#   ke StringPool, jadi setiap nilai unik hanya disimpan sekali
+# - id: list str (objek yang sama dipakai sebagai key index id -> nomor baris)
+# Lagu yang bentuknya lain (field kurang/lebih, nilai bukan str/None, teks berisi '\0')
+# disimpan apa adanya sebagai dict di _irregular; di data normal jumlahnya sedikit.
+#
+# Interface-nya MutableMapping: song_table[song_id] mengembalikan dict lagu baru
+# (dibuat saat diakses), jadi view, renderer, index pencarian dan write-ahead log
+# json_utils tetap bekerja tanpa perubahan. Baris hanya ditambahkan di akhir; lagu
+# yang dihapus meninggalkan baris kosong, sehingga nomor baris bisa dipakai sebagai
+# posisi untuk songs_added_since().
+#
+# Konkurensi sama dengan dict sebelumnya: penulis diserialkan oleh JsonStorage._songs_lock,
+# pembaca tanpa lock. Isi kolom per baris disimpan di "slot" yang tidak pernah diubah
+# setelah ditulis; _slots[row] menunjuk slot yang berlaku. Baris baru baru terlihat
+# setelah slot-nya terisi, dan menulis ulang baris yang sudah ada membuat slot baru lalu
+# mengganti _slots[row] dengan satu assignment, sehingga pembaca paralel selalu melihat
+# isi lama atau isi baru secara utuh (tidak pernah campuran offset lama dan panjang baru).
+
+from array import array
+from collections.abc import MutableMapping
+
+# Urutan kolom = urutan key di dict lagu hasil materialisasi (setelah 'id')
+SONG_COLUMNS = ('title', 'artist', 'url', 'album', 'source', 'original_id')
+TEXT_COLUMNS = ('title', 'url', 'original_id')
+_COLUMN_KEYS = frozenset(('id',) + SONG_COLUMNS)
+
+_SEPARATOR = '\0'
+
+
+class StringPool:
+    """Dictionary encoding nilai (str atau None) -> kode int."""
+
+    def __init__(self):
+        self._codes = {}
+        self.values = []
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _fits_columns(song):
+    """True jika lagu persis berisi id + SONG_COLUMNS dengan nilai str/None (teks tanpa '\0')."""
+    if song.keys() != _COLUMN_KEYS:
+        return False
+    for name in SONG_COLUMNS:
+        value = song[name]
+        if value is None:
+            continue
+        if type(value) is not str or (name in TEXT_COLUMNS and _SEPARATOR in value):
+            return False
+    return True
+
+
+class SongTable(MutableMapping):
+    """Tabel kolom lagu dengan interface {song_id: dict lagu}."""
+
+    def __init__(self, songs=None):
+        self._row_by_id = {}
+        self._ids = []
+        self._slots = array('I')      # per baris: nomor slot yang berlaku
+        # Kolom per slot (hanya ditambah, tidak pernah diubah)
+        self._text = bytearray()      # record "title\0url\0original_id" semua slot
+        self._text_starts = array('Q')
+        self._text_lengths = array('I')
+        self._text_nulls = bytearray()  # per slot: bit i = TEXT_COLUMNS[i] bernilai None
+        self._artist = array('I')
+        self._album = array('I')
+        self._source = array('I')
+        self._artists = StringPool()
+        self._albums = StringPool()
+        self._sources = StringPool()
+        self._irregular = {}  # nomor baris -> dict lagu yang tidak cocok dengan kolom
+        if songs:
+            self.update(songs)
+
+    @classmethod
+    def from_dict(cls, songs):
+        """
+        Membangun tabel dari dict hasil load JSON. Entri dikeluarkan dari dict
+        sumber satu per satu, jadi dict lagu lama bisa dibebaskan selama konversi.
+        """
+        table = cls()
+        while songs:
+            song_id, song = songs.popitem()
+            table[song_id] = song
+        # popitem() mengambil dari belakang: balik urutannya agar sama dengan urutan insert
+        table._reverse_rows()
+        return table
+
+    def _reverse_rows(self):
+        # Hanya dipanggil dari from_dict: setiap baris ditulis sekali sehingga slot-nya sama
+        # dengan nomor barisnya, jadi cukup kolom slot yang dibalik (_slots tetap 0..n-1)
+        last = len(self._ids) - 1
+        self._ids.reverse()
+        for column in (self._text_starts, self._text_lengths, self._text_nulls,
+                       self._artist, self._album, self._source):
+            column.reverse()
+        self._row_by_id = {song_id: row for row, song_id in enumerate(self._ids) if song_id is not None}
+        self._irregular = {last - row: song for row, song in self._irregular.items()}
+
+    def _song(self, row):
+        song = self._irregular.get(row)
+        if song is not None:
+            return song
+        slot = self._slots[row]
+        start = self._text_starts[slot]
+        title, url, original_id = self._text[start:start + self._text_lengths[slot]].decode(
+            'utf-8', 'surrogatepass').split(_SEPARATOR)
+        nulls = self._text_nulls[slot]
+        if nulls:
+            title, url, original_id = (None if nulls & (1 << i) else value
+                                       for i, value in enumerate((title, url, original_id)))
+        return {
+            'id': self._ids[row],
+            'title': title,
+            'artist': self._artists.values[self._artist[slot]],
+            'url': url,
+            'album': self._albums.values[self._album[slot]],
+            'source': self._sources.values[self._source[slot]],
+            'original_id': original_id,
+        }
+
+    def _append_slot(self, song):
+        """Menulis kolom lagu ke slot baru di akhir dan mengembalikan nomor slotnya."""
+        if song is None:
+            song = dict.fromkeys(SONG_COLUMNS)
+        values = [song[name] for name in TEXT_COLUMNS]
+        encoded = _SEPARATOR.join(value or '' for value in values).encode('utf-8', 'surrogatepass')
+        self._text_starts.append(len(self._text))
+        self._text += encoded
+        self._text_lengths.append(len(encoded))
+        self._text_nulls.append(sum(1 << i for i, value in enumerate(values) if value is None))
+        self._artist.append(self._artists.encode(song['artist']))
+        self._album.append(self._albums.encode(song['album']))
+        self._source.append(self._sources.encode(song['source']))
+        return len(self._text_starts) - 1
+
+    def _write_row(self, row, song):
+        """Menulis ulang baris yang sudah ada; slot lama tidak disentuh (lihat catatan konkurensi)."""
+        if not _fits_columns(song):
+            self._irregular[row] = song
+            return
+        self._slots[row] = self._append_slot(song)
+        self._irregular.pop(row, None)
+
+    def __getitem__(self, song_id):
+        return self._song(self._row_by_id[song_id])
+
+    def get(self, song_id, default=None):
+        row = self._row_by_id.get(song_id)
+        return default if row is None else self._song(row)
+
+    def __contains__(self, song_id):
+        return song_id in self._row_by_id
+
+    def __setitem__(self, song_id, song):
+        row = self._row_by_id.get(song_id)
+        if row is not None:
+            # Mengganti lagu yang sudah ada (misal saat replay log): tulis ulang barisnya
+            self._write_row(row, song)
+            return
+        row = len(self._ids)
+        if _fits_columns(song):
+            self._slots.append(self._append_slot(song))
+        else:
+            # Slot kosong (tidak dibaca selama baris ada di _irregular), agar baris baru
+            # selalu mendapat slot dengan nomor yang sama seperti barisnya
+            self._irregular[row] = song
+            self._slots.append(self._append_slot(None))
+        self._ids.append(song_id)
+        self._row_by_id[song_id] = row
+
+    def __delitem__(self, song_id):
+        # Isi kolom baris tidak dikosongkan agar pembaca paralel tidak melihat lagu setengah
+        # terhapus; ruangnya baru kembali saat snapshot berikutnya dimuat ulang.
+        row = self._row_by_id.pop(song_id)
+        self._ids[row] = None
+
+    def __iter__(self):
+        return iter(list(self._row_by_id))
+
+    def __len__(self):
+        return len(self._row_by_id)
+
+    @property
+    def row_count(self):
+        """Jumlah baris (termasuk baris lagu yang sudah dihapus); hanya bertambah."""
+        return len(self._ids)
+
+    def iter_rows(self, start=0, stop=None):
+        """Dict lagu untuk baris start..stop (baris yang dihapus dilewati)."""
+        stop = len(self._ids) if stop is None else stop
+        ids = self._ids
+        for row in range(start, stop):
+            if ids[row] is not None:
+                yield self._song(row)
+
+    def __json__(self, request):
+        # Untuk snapshot json_utils: seluruh koleksi dimaterialisasi sementara selama serialisasi
+        ids = self._ids
+        return {ids[row]: self._song(row) for row in range(len(ids)) if ids[row] is not None}
@@ -0,0 +1,511 @@
+# file: backend/myapp/storage/sqlite_backend.py
+#
+# Backend storage SQLite (journal_mode=WAL).
+# - Tabel songs, playlists, users dengan primary key (index) sehingga lookup
+#   cukup satu index probe, data tidak perlu dimuat semua ke memori.
+# - playlist_songs adalah tabel relasi berurutan (kolom position).
+# - Satu koneksi per worker thread (threading.local), dipakai ulang antar request.
+# - Karena mode WAL, beberapa proses waitress bisa memakai file database yang sama.
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from ..json_utils import load_data_from_json
+from ..renderers import invalidate_song_fragments
+from .defaults import DEFAULT_ALL_SONGS_DB, DEFAULT_PLAYLISTS_DB
+from .ids import format_id, max_numeric_suffix
+from .playlist_batch import apply_playlist_batch
+from .song_keys import group_duplicates, normalize_url, source_key
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+
+SONG_COLUMNS = ('id', 'title', 'artist', 'url', 'album', 'source', 'original_id')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    password_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS songs (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    url TEXT NOT NULL,
+    album TEXT,
+    source TEXT,
+    original_id TEXT
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_songs (
+    playlist_id TEXT NOT NULL REFERENCES playlists(id) ON DELETE CASCADE,
+    song_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, song_id)
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_songs_order ON playlist_songs (playlist_id, position);
+"""
+
+# Migrasi per versi skema (dijalankan berurutan untuk database lama maupun baru)
+MIGRATIONS = {
+    # v2: kunci dedupe lagu, (source, original_id) dan URL ternormalisasi
+    2: [
+        'ALTER TABLE songs ADD COLUMN source_key TEXT',
+        'ALTER TABLE songs ADD COLUMN url_key TEXT',
+        'CREATE INDEX IF NOT EXISTS idx_songs_source_key ON songs (source_key)',
+        'CREATE INDEX IF NOT EXISTS idx_songs_url_key ON songs (url_key)',
+    ],
+    # v3: pemilik playlist (email, NULL = playlist lama tanpa pemilik) dan flag publik
+    3: [
+        'ALTER TABLE playlists ADD COLUMN owner TEXT',
+        'ALTER TABLE playlists ADD COLUMN public INTEGER NOT NULL DEFAULT 0',
+        'CREATE INDEX IF NOT EXISTS idx_playlists_owner ON playlists (owner)',
+        'CREATE INDEX IF NOT EXISTS idx_playlists_public ON playlists (public) WHERE public = 1',
+    ],
+}
+
+
+def _row_to_song(row):
+    # Kolom NULL tidak ikut dikirim, sama seperti entri songs.json yang tidak punya album/source
+    return {column: row[column] for column in SONG_COLUMNS if row[column] is not None}
+
+
+def _row_to_playlist(row, song_ids):
+    return {'id': row['id'], 'name': row['name'], 'song_ids': song_ids,
+            'owner': row['owner'], 'public': bool(row['public'])}
+
+
+class SQLiteStorage:
+    name = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._init_schema()
+
+    # --- Koneksi ---
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    @property
+    def conn(self):
+        """Koneksi milik thread saat ini (dibuat sekali per worker thread)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Transaksi tulis. BEGIN IMMEDIATE mengambil write lock di awal agar tidak deadlock antar proses."""
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def _init_schema(self):
+        with self._write() as conn:
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            seeded_playlists = None
+            if row is None:
+                seeded_playlists = self._seed(conn)
+                current_version = 1
+            else:
+                current_version = int(row[0])
+            for version in range(current_version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS.get(version, []):
+                    conn.execute(statement)
+                if version == 2:
+                    self._backfill_song_keys(conn)
+            if seeded_playlists:
+                # Kolom owner/public baru ada setelah migrasi v3
+                conn.executemany(
+                    'UPDATE playlists SET owner = ?, public = ? WHERE id = ?',
+                    [(playlist.get('owner'), int(bool(playlist.get('public'))), playlist['id'])
+                     for playlist in seeded_playlists.values()])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def _backfill_song_keys(self, conn):
+        rows = conn.execute('SELECT id, url, source, original_id FROM songs').fetchall()
+        conn.executemany(
+            'UPDATE songs SET source_key = ?, url_key = ? WHERE id = ?',
+            [(source_key(row['source'], row['original_id']), normalize_url(row['url']), row['id']) for row in rows])
+
+    def _seed(self, conn):
+        """
+        Database baru: isi dari file JSON yang sudah ada (migrasi dari backend json),
+        atau dari data default jika file belum ada. Mengembalikan dict playlist yang dipakai.
+        """
+        users = load_data_from_json('users.json', {})
+        songs = load_data_from_json('songs.json', DEFAULT_ALL_SONGS_DB)
+        playlists = load_data_from_json('playlists.json', DEFAULT_PLAYLISTS_DB)
+
+        conn.executemany(
+            'INSERT OR IGNORE INTO users (email, name, password_hash) VALUES (?, ?, ?)',
+            [(email, u['name'], u['password_hash']) for email, u in users.items()])
+        conn.executemany(
+            'INSERT OR IGNORE INTO songs (id, title, artist, url, album, source, original_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [tuple(song.get(column) for column in SONG_COLUMNS) for song in songs.values()])
+        for playlist in playlists.values():
+            conn.execute('INSERT OR IGNORE INTO playlists (id, name) VALUES (?, ?)', (playlist['id'], playlist['name']))
+            conn.executemany(
+                'INSERT OR IGNORE INTO playlist_songs (playlist_id, song_id, position) VALUES (?, ?, ?)',
+                [(playlist['id'], song_id, position) for position, song_id in enumerate(playlist.get('song_ids', []))])
+        log.info('Database SQLite diisi dari file JSON', extra={
+            'path': self.db_path, 'users': len(users), 'songs': len(songs), 'playlists': len(playlists)})
+        return playlists
+
+    def _next_ids(self, conn, table, prefix, width, count=1):
+        """
+        Mengalokasikan ID dari counter di tabel meta ('seq:<table>').
+        Dipanggil di dalam transaksi tulis (BEGIN IMMEDIATE), jadi aman juga antar proses.
+        """
+        key = f'seq:{table}'
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            # Seed sekali dari ID terbesar yang sudah ada
+            existing_ids = (r[0] for r in conn.execute(f'SELECT id FROM {table}'))
+            last = max_numeric_suffix(existing_ids, prefix)
+        else:
+            last = int(row[0])
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(last + count)))
+        return [format_id(prefix, number, width) for number in range(last + 1, last + count + 1)]
+
+    # --- Users ---
+    def get_user(self, email):
+        row = self.conn.execute('SELECT name, password_hash FROM users WHERE email = ?', (email,)).fetchone()
+        if row is None:
+            return None
+        return {'name': row['name'], 'password_hash': row['password_hash']}
+
+    def add_user(self, email, user_data):
+        """Mengembalikan False jika email sudah terdaftar."""
+        with self._write() as conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO users (email, name, password_hash) VALUES (?, ?, ?)',
+                (email, user_data['name'], user_data['password_hash']))
+            return cursor.rowcount == 1
+
+    def update_password_hash(self, email, password_hash):
+        with self._write() as conn:
+            cursor = conn.execute('UPDATE users SET password_hash = ? WHERE email = ?', (password_hash, email))
+            return cursor.rowcount == 1
+
+    # --- Songs ---
+    def get_song(self, song_id):
+        row = self.conn.execute('SELECT * FROM songs WHERE id = ?', (song_id,)).fetchone()
+        return _row_to_song(row) if row is not None else None
+
+    def get_songs(self, song_ids):
+        """Mengembalikan {song_id: song} untuk ID yang ditemukan saja."""
+        song_ids = list(song_ids)
+        found = {}
+        # Batasi jumlah parameter per query (SQLITE_MAX_VARIABLE_NUMBER)
+        for start in range(0, len(song_ids), 500):
+            chunk = song_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in self.conn.execute(f'SELECT * FROM songs WHERE id IN ({placeholders})', chunk):
+                found[row['id']] = _row_to_song(row)
+        return found
+
+    def iter_songs(self):
+        """Iterasi semua lagu secara streaming dari tabel songs (koneksi tersendiri)."""
+        conn = self._connect()
+        try:
+            for row in conn.execute('SELECT * FROM songs ORDER BY rowid'):
+                yield _row_to_song(row)
+        finally:
+            conn.close()
+
+    def song_marker(self):
+        """Posisi akhir koleksi lagu saat ini (rowid terbesar), untuk songs_added_since."""
+        return self.conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM songs').fetchone()[0]
+
+    def songs_added_since(self, marker):
+        """Lagu yang disimpan setelah song_marker() == marker. Mengembalikan (songs, marker_baru)."""
+        songs = []
+        for row in self.conn.execute('SELECT rowid, * FROM songs WHERE rowid > ? ORDER BY rowid', (marker or 0,)):
+            songs.append(_row_to_song(row))
+            marker = row['rowid']
+        return songs, marker
+
+    def _find_song_by_keys(self, conn, song_fields):
+        lookups = (
+            ('source_key', source_key(song_fields.get('source'), song_fields.get('original_id'))),
+            ('url_key', normalize_url(song_fields.get('url'))),
+        )
+        for column, key in lookups:
+            if key is None:
+                continue
+            row = conn.execute(f'SELECT * FROM songs WHERE {column} = ? ORDER BY rowid LIMIT 1', (key,)).fetchone()
+            if row is not None:
+                return _row_to_song(row)
+        return None
+
+    def find_song_by_keys(self, song_fields):
+        return self._find_song_by_keys(self.conn, song_fields)
+
+    def add_song(self, song_fields):
+        """
+        Menyimpan lagu baru, atau mengembalikan lagu yang sudah ada jika
+        (source, original_id) atau URL-nya sama. Mengembalikan (song, created).
+        """
+        return self.add_songs([song_fields])[0]
+
+    def add_songs(self, songs_fields):
+        """
+        Versi massal add_song dalam satu transaksi.
+        Mengembalikan list (song, created) dengan urutan yang sama dengan input.
+        """
+        results = []
+        with self._write() as conn:
+            for song_fields in songs_fields:
+                existing = self._find_song_by_keys(conn, song_fields)
+                if existing is not None:
+                    results.append((existing, False))
+                    continue
+                local_song_id = self._next_ids(conn, 'songs', 's', 3)[0]
+                song = {'id': local_song_id, **song_fields}
+                conn.execute(
+                    'INSERT INTO songs (id, title, artist, url, album, source, original_id, source_key, url_key) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    tuple(song.get(column) for column in SONG_COLUMNS) + (
+                        source_key(song.get('source'), song.get('original_id')), normalize_url(song.get('url'))))
+                results.append((song, True))
+        return results
+
+    def _existing_song_keys(self, conn, column, keys):
+        """Subset keys yang sudah ada di kolom source_key/url_key (query per potongan, lewat index)."""
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(row[0] for row in conn.execute(
+                f'SELECT {column} FROM songs WHERE {column} IN ({placeholders})', chunk))
+        return found
+
+    def import_songs(self, songs_fields):
+        """
+        Import massal (lihat myapp/scripts/import_songs.py): lagu yang kuncinya sudah ada
+        di koleksi atau muncul lebih dulu di batch yang sama dilewati, ID dialokasikan
+        sekaligus, dan seluruh batch ditulis dalam satu transaksi. Mengembalikan jumlah lagu baru.
+        """
+        rows = [(song_fields, source_key(song_fields.get('source'), song_fields.get('original_id')),
+                 normalize_url(song_fields.get('url'))) for song_fields in songs_fields]
+        with self._write() as conn:
+            seen_source_keys = self._existing_song_keys(conn, 'source_key', {row[1] for row in rows if row[1]})
+            seen_url_keys = self._existing_song_keys(conn, 'url_key', {row[2] for row in rows if row[2]})
+            new_rows = []
+            for song_fields, song_source_key, song_url_key in rows:
+                if song_source_key in seen_source_keys or song_url_key in seen_url_keys:
+                    continue
+                if song_source_key:
+                    seen_source_keys.add(song_source_key)
+                if song_url_key:
+                    seen_url_keys.add(song_url_key)
+                new_rows.append((song_fields, song_source_key, song_url_key))
+            if not new_rows:
+                return 0
+            new_song_ids = self._next_ids(conn, 'songs', 's', 3, count=len(new_rows))
+            conn.executemany(
+                'INSERT INTO songs (id, title, artist, url, album, source, original_id, source_key, url_key) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(song_id, *(song_fields.get(column) for column in SONG_COLUMNS[1:]), song_source_key, song_url_key)
+                 for song_id, (song_fields, song_source_key, song_url_key) in zip(new_song_ids, new_rows)])
+        return len(new_rows)
+
+    def dedupe_songs(self):
+        """
+        Menggabungkan lagu duplikat yang sudah tersimpan: playlist_songs diarahkan ke
+        lagu yang dipertahankan, lalu duplikatnya dihapus.
+        Mengembalikan {song_id_duplikat: song_id_yang_dipertahankan}.
+        """
+        with self._write() as conn:
+            songs = [_row_to_song(row) for row in conn.execute('SELECT * FROM songs ORDER BY rowid')]
+            replacements = group_duplicates(songs)
+            for duplicate_id, survivor_id in replacements.items():
+                # OR IGNORE: jika lagu yang dipertahankan sudah ada di playlist yang sama, baris duplikat dibiarkan lalu dihapus
+                conn.execute('UPDATE OR IGNORE playlist_songs SET song_id = ? WHERE song_id = ?', (survivor_id, duplicate_id))
+                conn.execute('DELETE FROM playlist_songs WHERE song_id = ?', (duplicate_id,))
+                conn.execute('DELETE FROM songs WHERE id = ?', (duplicate_id,))
+        if replacements:
+            invalidate_song_fragments()
+        return replacements
+
+    # --- Playlists ---
+    def _song_ids(self, conn, playlist_id):
+        rows = conn.execute(
+            'SELECT song_id FROM playlist_songs WHERE playlist_id = ? ORDER BY position', (playlist_id,))
+        return [row['song_id'] for row in rows]
+
+    def _playlist(self, conn, playlist_id):
+        row = conn.execute('SELECT id, name, owner, public FROM playlists WHERE id = ?', (playlist_id,)).fetchone()
+        if row is None:
+            return None
+        return _row_to_playlist(row, self._song_ids(conn, playlist_id))
+
+    def _playlists_with_songs(self, conn, rows):
+        """Melengkapi baris playlists dengan song_ids-nya (query per potongan ID, lewat index)."""
+        playlists = {row['id']: _row_to_playlist(row, []) for row in rows}
+        playlist_ids = list(playlists)
+        for start in range(0, len(playlist_ids), 500):
+            chunk = playlist_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in conn.execute(
+                    f'SELECT playlist_id, song_id FROM playlist_songs WHERE playlist_id IN ({placeholders}) '
+                    'ORDER BY playlist_id, position', chunk):
+                playlists[row['playlist_id']]['song_ids'].append(row['song_id'])
+        return list(playlists.values())
+
+    def list_playlists(self):
+        conn = self.conn
+        playlists = {}
+        for row in conn.execute('SELECT id, name, owner, public FROM playlists ORDER BY rowid'):
+            playlists[row['id']] = _row_to_playlist(row, [])
+        for row in conn.execute('SELECT playlist_id, song_id FROM playlist_songs ORDER BY playlist_id, position'):
+            playlist = playlists.get(row['playlist_id'])
+            if playlist is not None:
+                playlist['song_ids'].append(row['song_id'])
+        return list(playlists.values())
+
+    def list_playlists_by_owner(self, owners):
+        """Playlist milik owners (list email; None = playlist tanpa pemilik), lewat idx_playlists_owner."""
+        conn = self.conn
+        rows = []
+        for owner in owners:
+            if owner is None:
+                rows.extend(conn.execute(
+                    'SELECT id, name, owner, public FROM playlists WHERE owner IS NULL ORDER BY rowid'))
+            else:
+                rows.extend(conn.execute(
+                    'SELECT id, name, owner, public FROM playlists WHERE owner = ? ORDER BY rowid', (owner,)))
+        return self._playlists_with_songs(conn, rows)
+
+    def list_public_playlists(self):
+        conn = self.conn
+        rows = conn.execute('SELECT id, name, owner, public FROM playlists WHERE public = 1 ORDER BY rowid').fetchall()
+        return self._playlists_with_songs(conn, rows)
+
+    def get_playlist(self, playlist_id):
+        return self._playlist(self.conn, playlist_id)
+
+    def create_playlist(self, name, owner=None, public=False):
+        with self._write() as conn:
+            new_playlist_id = self._next_ids(conn, 'playlists', 'pl', 2)[0]
+            conn.execute('INSERT INTO playlists (id, name, owner, public) VALUES (?, ?, ?, ?)',
+                         (new_playlist_id, name, owner, int(bool(public))))
+        return {'id': new_playlist_id, 'name': name, 'song_ids': [], 'owner': owner, 'public': bool(public)}
+
+    def delete_playlist(self, playlist_id):
+        """Mengembalikan playlist yang dihapus, atau None jika tidak ada."""
+        with self._write() as conn:
+            playlist = self._playlist(conn, playlist_id)
+            if playlist is not None:
+                conn.execute('DELETE FROM playlists WHERE id = ?', (playlist_id,))
+        return playlist
+
+    def update_playlist(self, playlist_id, name=None, public=None):
+        """Mengubah nama dan/atau flag publik. Mengembalikan playlist baru, atau None jika tidak ada."""
+        with self._write() as conn:
+            if name is not None:
+                conn.execute('UPDATE playlists SET name = ? WHERE id = ?', (name, playlist_id))
+            if public is not None:
+                conn.execute('UPDATE playlists SET public = ? WHERE id = ?', (int(bool(public)), playlist_id))
+            return self._playlist(conn, playlist_id)
+
+    def assign_playlist_owner(self, owner, playlist_ids=None, only_unowned=True):
+        """
+        Migrasi: menetapkan pemilik playlist (semua playlist, atau playlist_ids saja).
+        only_unowned=True melewati playlist yang sudah punya pemilik.
+        Mengembalikan list ID playlist yang diubah.
+        """
+        condition = 'owner IS NULL' if only_unowned else '(owner IS NULL OR owner != ?)'
+        params = () if only_unowned else (owner,)
+        with self._write() as conn:
+            if playlist_ids is None:
+                rows = conn.execute(f'SELECT id FROM playlists WHERE {condition} ORDER BY rowid', params)
+                changed = [row['id'] for row in rows]
+            else:
+                changed = [playlist_id for playlist_id in playlist_ids if conn.execute(
+                    f'SELECT 1 FROM playlists WHERE id = ? AND {condition}', (playlist_id,) + params).fetchone()]
+            conn.executemany('UPDATE playlists SET owner = ? WHERE id = ?',
+                             [(owner, playlist_id) for playlist_id in changed])
+        return changed
+
+    def add_song_to_playlist(self, playlist_id, song_id):
+        """
+        Mengembalikan (playlist, added). added False jika lagu sudah ada di playlist.
+        Mengembalikan (None, False) jika playlist tidak ditemukan.
+        """
+        with self._write() as conn:
+            if conn.execute('SELECT 1 FROM playlists WHERE id = ?', (playlist_id,)).fetchone() is None:
+                return None, False
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO playlist_songs (playlist_id, song_id, position) '
+                'SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM playlist_songs WHERE playlist_id = ?',
+                (playlist_id, song_id, playlist_id))
+            added = cursor.rowcount == 1
+            return self._playlist(conn, playlist_id), added
+
+    def remove_song_from_playlist(self, playlist_id, song_id):
+        """
+        Mengembalikan (playlist, removed). removed False jika lagu tidak ada di playlist.
+        Mengembalikan (None, False) jika playlist tidak ditemukan.
+        """
+        with self._write() as conn:
+            if conn.execute('SELECT 1 FROM playlists WHERE id = ?', (playlist_id,)).fetchone() is None:
+                return None, False
+            cursor = conn.execute(
+                'DELETE FROM playlist_songs WHERE playlist_id = ? AND song_id = ?', (playlist_id, song_id))
+            removed = cursor.rowcount == 1
+            return self._playlist(conn, playlist_id), removed
+
+    def update_playlist_songs(self, playlist_id, add=(), remove=(), moves=(), order=None):
+        """
+        Menerapkan batch add/remove/move/order (lihat playlist_batch.py) dalam satu transaksi.
+        Mengembalikan (playlist, summary); (None, None) jika playlist tidak ditemukan.
+        Melempar PlaylistBatchError jika batch tidak valid (transaksi di-rollback).
+        """
+        with self._write() as conn:
+            playlist = self._playlist(conn, playlist_id)
+            if playlist is None:
+                return None, None
+            song_ids = playlist['song_ids']
+            new_song_ids, summary = apply_playlist_batch(song_ids, add, remove, moves, order)
+            if new_song_ids != song_ids:
+                conn.execute('DELETE FROM playlist_songs WHERE playlist_id = ?', (playlist_id,))
+                conn.executemany(
+                    'INSERT INTO playlist_songs (playlist_id, song_id, position) VALUES (?, ?, ?)',
+                    [(playlist_id, song_id, position) for position, song_id in enumerate(new_song_ids)])
+                playlist['song_ids'] = new_song_ids
+            return playlist, summary
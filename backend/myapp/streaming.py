@@ -0,0 +1,97 @@
+# file: backend/myapp/streaming.py
+#
+# Respons streaming untuk daftar lagu yang sangat besar (playlist panjang, ekspor
+# seluruh koleksi). Body dikirim lewat app_iter berupa generator:
+# - ID lagu di-resolve per potongan (STREAM_CHUNK_SIZE lagu per get_songs), jadi
+#   memori per request tetap kecil berapa pun jumlah lagunya.
+# - Byte pertama ('[' atau baris NDJSON pertama) langsung terkirim ke client,
+#   tidak menunggu seluruh respons selesai dirakit.
+#
+# Format:
+#   json    array JSON biasa: [{...},{...}]
+#   ndjson  satu objek JSON per baris (application/x-ndjson)
+
+import logging
+
+from .fastjson import dumps
+
+log = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 500
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def parse_stream_format(request, default='json'):
+    """
+    Format dari ?format= (bukan dari header Accept, karena ETag hanya
+    membedakan query string). ValueError jika tidak dikenal.
+    """
+    stream_format = request.params.get('format')
+    if stream_format is None:
+        return default
+    stream_format = stream_format.strip().lower()
+    if stream_format not in STREAM_FORMATS:
+        raise ValueError(f"Parameter \"format\" tidak dikenal. Pilihan: {', '.join(STREAM_FORMATS)}.")
+    return stream_format
+
+
+def iter_songs_by_ids(storage, song_ids, chunk_size=STREAM_CHUNK_SIZE, context=None):
+    """Mengambil lagu per potongan ID, urutan mengikuti song_ids. ID yang tidak ada dilewati."""
+    for start in range(0, len(song_ids), chunk_size):
+        chunk = song_ids[start:start + chunk_size]
+        songs_by_id = storage.get_songs(chunk)
+        for song_id in chunk:
+            song = songs_by_id.get(song_id)
+            if song is not None:
+                yield song
+            else:
+                log.warning('Lagu tidak ditemukan di koleksi lagu saat streaming',
+                            extra={'song_id': song_id, **(context or {})})
+
+
+def encode_stream(items, encode_item=dumps, stream_format='json', batch_size=STREAM_CHUNK_SIZE):
+    """
+    Generator bytes dari iterable item. Item digabung per batch_size agar tidak
+    menulis ke socket untuk setiap lagu.
+    """
+    if stream_format == 'ndjson':
+        batch = []
+        for item in items:
+            batch.append(encode_item(item))
+            if len(batch) >= batch_size:
+                yield b'\n'.join(batch) + b'\n'
+                batch = []
+        if batch:
+            yield b'\n'.join(batch) + b'\n'
+        return
+
+    yield b'['
+    first = True
+    batch = []
+    for item in items:
+        batch.append(encode_item(item))
+        if len(batch) >= batch_size:
+            yield (b'' if first else b',') + b','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b'' if first else b',') + b','.join(batch)
+    yield b']'
+
+
+def streaming_response(request, body_iter, stream_format='json', filename=None):
+    """
+    Memakai request.response (header ETag/Cache-Control dari not_modified_response
+    ikut terkirim) dengan body dari generator body_iter.
+    """
+    response = request.response
+    response.content_type = STREAM_FORMATS[stream_format]
+    response.app_iter = body_iter
+    response.content_length = None
+    if filename:
+        response.content_disposition = f'attachment; filename="{filename}"'
+    return response
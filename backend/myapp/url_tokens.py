@@ -0,0 +1,88 @@
+# file: backend/myapp/url_tokens.py
+#
+# Token URL berumur pendek (HMAC-SHA256) untuk URL yang dibuka browser tanpa header
+# Authorization: src elemen <audio> (GET /api/songs/{song_id}/stream) dan EventSource
+# (GET /api/events). Token login tidak pernah dimasukkan ke URL, karena URL tercatat
+# di log akses, log proxy dan riwayat browser.
+# - Token = base64url("<expires_at>:<email>") + "." + base64url(HMAC(secret, scope + payload)).
+# - scope mengikat token ke satu pemakaian, misal 'song:s001' atau 'events': token untuk
+#   satu lagu tidak bisa dipakai untuk lagu lain maupun untuk change feed.
+# - Tidak disimpan di server; berlaku sampai kedaluwarsa (logout tidak mencabutnya,
+#   karena itu umurnya dibuat pendek).
+#
+# Setting di development.ini:
+#   myapp.url_token.secret =      (kosong: acak per proses; pada mode multi-proses diambil
+#                                  dari database bersama agar sama di semua worker)
+# Umur token diatur oleh pemakainya: myapp.media.token_ttl dan myapp.events.token_ttl.
+
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class UrlTokenSigner:
+    def __init__(self, secret=None):
+        self.secret = secret.encode('utf-8') if secret else secrets.token_bytes(32)
+
+    def _signature(self, scope, payload):
+        return hmac.new(self.secret, scope.encode('utf-8') + b'\n' + payload, hashlib.sha256).digest()
+
+    def sign(self, scope, email, ttl):
+        """Token untuk email yang berlaku ttl detik, hanya untuk scope ini."""
+        payload = f'{int(time.time() + ttl)}:{email}'.encode('utf-8')
+        return f'{_b64encode(payload)}.{_b64encode(self._signature(scope, payload))}'
+
+    def verify(self, token, scope):
+        """Email pemilik token, atau None jika token rusak, scope-nya lain, atau kedaluwarsa."""
+        payload_text, sep, signature_text = token.partition('.')
+        if not sep:
+            return None
+        try:
+            payload = _b64decode(payload_text)
+            signature = _b64decode(signature_text)
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._signature(scope, payload)):
+            return None
+        expires_at, _, email = payload.decode('utf-8').partition(':')
+        if not expires_at.isdigit() or int(expires_at) <= time.time():
+            return None
+        return email
+
+
+_signer = None
+
+
+def set_url_token_signer(signer):
+    global _signer
+    _signer = signer
+
+
+def get_url_token_signer():
+    global _signer
+    if _signer is None:
+        _signer = UrlTokenSigner()
+    return _signer
+
+
+def song_stream_scope(song_id):
+    return f'song:{song_id}'
+
+
+EVENTS_SCOPE = 'events'
+
+
+def includeme(config):
+    global _signer
+    settings = config.get_settings()
+    _signer = UrlTokenSigner(settings.get('myapp.url_token.secret', '').strip() or None)
@@ -0,0 +1,112 @@
+# file: backend/myapp/versions.py
+#
+# Counter versi per resource untuk ETag / conditional GET.
+# View yang mengubah data memanggil bump_versions(...); view GET memanggil
+# not_modified_response(...) sebelum membangun respons. Jika ETag di header
+# If-None-Match masih sama, view langsung membalas 304 tanpa merender body.
+#
+# Nama resource:
+#   PLAYLISTS_RESOURCE         daftar playlist (GET /api/playlists)
+#   playlist_resource(id)      satu playlist beserta urutan lagunya
+#   SONG_CATALOG_RESOURCE      koleksi lagu (ALL_SONGS_DB / tabel songs)
+#
+# Counter disimpan di MemoryVersionStore (per proses). Pada mode multi-proses
+# (myapp.shared_state, lihat myapp/shared_state.py) store diganti dengan tabel
+# SQLite bersama, sehingga perubahan di satu worker ikut mengubah ETag di worker lain.
+
+import threading
+import time
+import zlib
+
+from pyramid.httpexceptions import HTTPNotModified
+
+PLAYLISTS_RESOURCE = 'playlists'
+SONG_CATALOG_RESOURCE = 'songs'
+
+# Counter hanya hidup di memori proses, jadi ETag diberi prefix epoch proses:
+# versi '3' setelah restart tidak akan tertukar dengan versi '3' sebelum restart.
+PROCESS_EPOCH = format(int(time.time() * 1000), 'x')
+_PROCESS_START = time.time()
+
+
+
+class MemoryVersionStore:
+    """Counter versi di memori proses ini."""
+
+    epoch = PROCESS_EPOCH
+
+    def __init__(self):
+        self._versions = {}  # {resource: (version, modified_at)}
+        self._lock = threading.Lock()
+
+    def bump(self, resources):
+        now = time.time()
+        with self._lock:
+            for resource in resources:
+                version, _ = self._versions.get(resource, (0, _PROCESS_START))
+                self._versions[resource] = (version + 1, now)
+
+    def get(self, resource):
+        return self._versions.get(resource, (0, _PROCESS_START))
+
+
+_store = MemoryVersionStore()
+
+
+def set_version_store(store):
+    global _store
+    _store = store
+
+
+def playlist_resource(playlist_id):
+    return f'playlist:{playlist_id}'
+
+
+def bump_versions(*resources):
+    _store.bump(resources)
+
+
+def get_version(resource):
+    """Mengembalikan (version, modified_at) resource."""
+    return _store.get(resource)
+
+
+def _etag(request, versions):
+    parts = [str(version) for version, _ in versions]
+    query_hash = format(zlib.crc32(request.query_string.encode('utf-8')), 'x')
+    return f"{_store.epoch}-{'.'.join(parts)}-{query_hash}"
+
+
+def compute_etag(request, *resources):
+    """
+    ETag = epoch store + versi semua resource yang dipakai respons + hash query string
+    (karena ?limit/?cursor/?fields menghasilkan body yang berbeda).
+    """
+    return _etag(request, [get_version(resource) for resource in resources])
+
+
+def not_modified_response(request, *resources):
+    """
+    Memasang ETag & Last-Modified di request.response. Mengembalikan HTTPNotModified
+    jika If-None-Match cocok (view cukup me-return-nya), atau None jika body perlu dirender.
+    """
+    # Versi dibaca sekali (pada mode multi-proses setiap pembacaan adalah query SQLite)
+    versions = [get_version(resource) for resource in resources]
+    etag = _etag(request, versions)
+    last_modified = max(modified_at for _, modified_at in versions)
+
+    response = request.response
+    response.etag = etag
+    response.last_modified = last_modified
+    # Client boleh menyimpan, tapi wajib revalidasi ke server setiap kali
+    response.cache_control = 'private, no-cache'
+    response.vary = ('Authorization',)
+
+    if etag in request.if_none_match:
+        return HTTPNotModified(headers={
+            'ETag': response.headers['ETag'],
+            'Last-Modified': response.headers['Last-Modified'],
+            'Cache-Control': response.headers['Cache-Control'],
+            'Vary': 'Authorization',
+        })
+    return None
@@ -1,26 +1,19 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import HTTPBadRequest, HTTPOk, HTTPUnauthorized, HTTPConflict
 import json # Masih dipakai untuk json.JSONDecodeError
-import uuid
+import logging
 
 
-# Import fungsi CryptContext dari passlib.context
-from passlib.context import CryptContext
+# Hashing password (bcrypt) dijalankan di process pool terpisah, lihat myapp/passwords.py
+from ..passwords import get_password_hasher, PasswordPoolBusy
 
-# Import fungsi utilitas dari json_utils.py yang ada di paket myapp
-from ..json_utils import load_data_from_json, save_data_to_json
+# Backend storage (json/sqlite) dipilih dari development.ini, lihat myapp/storage
+from ..storage import get_storage
 
-# Konfigurasi untuk hashing password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Sesi login (token -> email) dengan TTL & LRU, lihat myapp/sessions.py
+from ..sessions import get_session_store
 
-# Nama file untuk database pengguna (akan disimpan di backend/data/users.json)
-USERS_DB_FILE = 'users.json'
-
-# (Simulasi) Database pengguna sekarang dimuat dari file JSON
-users_db = load_data_from_json(USERS_DB_FILE, {}) # Default ke {} jika file tidak ada/kosong
-
-# sessions_db tetap di memori, tidak perlu disimpan ke file
-sessions_db = {} 
+log = logging.getLogger(__name__)
 
 @view_config(route_name='api_signup', request_method='POST', renderer='json')
 def signup_view(request):
@@ -37,20 +30,19 @@ def signup_view(request):
             return {'error': 'Nama, email, dan password dibutuhkan.'}
 
 
-        if email in users_db:
+        storage = get_storage()
+        if storage.get_user(email) is not None:
             request.response.status_code = 409 # Conflict
             return {'error': f'Email {email} sudah terdaftar.'}
 
-        print(f"TODO: HASH PASSWORD INI (dari signup_view): {password}")
-        password_hash = pwd_context.hash(password) # Hash password menggunakan passlib
-        print(f"Password asli: {password}, Hash yang akan disimpan: {password_hash[:20]}...")
+        password_hash = get_password_hasher().hash(password) # Hash password di pool bcrypt
 
-        users_db[email] = {'name': name, 'password_hash': password_hash}
-        
-        # Simpan perubahan ke file JSON
-        save_data_to_json(users_db, USERS_DB_FILE)
+        # Simpan ke storage; add_user mengembalikan False jika email keburu didaftarkan request lain
+        if not storage.add_user(email, {'name': name, 'password_hash': password_hash}):
+            request.response.status_code = 409 # Conflict
+            return {'error': f'Email {email} sudah terdaftar.'}
         
-        print(f"Pengguna baru '{email}' didaftarkan dengan password hash.")
+        log.info('Pengguna baru didaftarkan', extra={'email': email})
 
         request.response.status_code = 201 # Created
         return {'message': f'Pengguna {name} berhasil didaftarkan dengan email {email}.'}
@@ -58,9 +50,13 @@ def signup_view(request):
     except json.JSONDecodeError:
         request.response.status_code = 400
         return {'error': 'Format JSON tidak valid.'}
+    except PasswordPoolBusy as e:
+        request.response.status_code = 503 # Service Unavailable
+        request.response.headers['Retry-After'] = str(e.retry_after)
+        return {'error': 'Server sedang sibuk, silakan coba lagi sebentar.'}
     # HTTPBadRequest dan HTTPConflict sudah ditangani dengan set status_code dan return dict
-    except Exception as e:
-        print(f"Error tak terduga di signup_view: {e}")
+    except Exception:
+        log.exception('Error tak terduga di signup_view')
         request.response.status_code = 500
         return {'error': 'Terjadi kesalahan pada server.'}
 
@@ -76,36 +72,42 @@ def login_view(request):
             request.response.status_code = 400
             return {'error': 'Email dan password dibutuhkan.'}
 
-        user_data = users_db.get(email)
-        
-        print(f"TODO: VERIFIKASI PASSWORD INI (dari login_view): {password} VS {user_data.get('password_hash') if user_data else 'USER NOT FOUND'}")
+        user_data = get_storage().get_user(email)
 
-        if user_data and pwd_context.verify(password, user_data['password_hash']): # <-- PERUBAHAN DI SINI
-            
-            # session_token = str(uuid.uuid4()) # Kita masih pakai token dummy
-            # sessions_db[session_token] = email 
+        password_valid, new_password_hash = (False, None)
+        if user_data:
+            password_valid, new_password_hash = get_password_hasher().verify_and_update(password, user_data['password_hash'])
+
+        if password_valid:
+            if new_password_hash:
+                # Hash lama memakai cost/skema yang sudah deprecated: ganti secara transparan
+                get_storage().update_password_hash(email, new_password_hash)
             
-            session_token_dummy = "dummy-token-for-" + email 
-            sessions_db[session_token_dummy] = email # Simpan sesi dummy jika diperlukan nanti
+            # Token acak yang tidak bisa ditebak, berlaku sampai TTL sesi habis
+            session_token = get_session_store().create(email)
 
-            print(f"User {email} logged in successfully.")
+            log.info('Login berhasil', extra={'email': email})
 
             return { 
                 'message': 'Login berhasil!',
-                'token': session_token_dummy, # Kirim token dummy
+                'token': session_token,
                 'user': {'name': user_data['name'], 'email': email}
             }
         else:
             # User tidak ditemukan atau password salah
-            print(f"Login gagal untuk email: {email}")
+            log.info('Login gagal', extra={'email': email})
             request.response.status_code = 401 # Unauthorized
             return {'error': 'Email atau password salah.'}
 
     except json.JSONDecodeError:
         request.response.status_code = 400
         return {'error': 'Format JSON tidak valid.'}
-    except Exception as e:
-        print(f"Error tak terduga di login_view: {e}")
+    except PasswordPoolBusy as e:
+        request.response.status_code = 503 # Service Unavailable
+        request.response.headers['Retry-After'] = str(e.retry_after)
+        return {'error': 'Server sedang sibuk, silakan coba lagi sebentar.'}
+    except Exception:
+        log.exception('Error tak terduga di login_view')
         request.response.status_code = 500
         return {'error': 'Terjadi kesalahan pada server.'}
 
@@ -0,0 +1,27 @@
+# file: backend/myapp/views/event_views.py
+
+from pyramid.view import view_config
+
+# request.user diisi oleh security policy (lihat myapp/security.py)
+from ..security import unauthorized
+
+# Change feed SSE; stream-nya dilayani sidecar (lihat myapp/events.py, myapp/event_server.py)
+from ..events import events_token, get_event_log
+
+
+@view_config(route_name='api_event_token', request_method='POST', renderer='json')
+def event_token_view(request):
+    """
+    Token URL berumur pendek untuk membuka change feed: GET /api/events?token=...
+    (EventSource tidak bisa mengirim header Authorization). MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Mengembalikan {'token': ..., 'expires_in': detik}.
+    """
+    if request.user is None:
+        return unauthorized(request)
+    if get_event_log() is None:
+        request.response.status_code = 404
+        return {'error': 'Change feed tidak aktif di server ini.'}
+
+    token, ttl = events_token(request.user['email'])
+    request.response.cache_control = 'no-store'
+    return {'token': token, 'expires_in': ttl}
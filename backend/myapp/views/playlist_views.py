@@ -3,128 +3,228 @@
 from pyramid.view import view_config
 from pyramid.httpexceptions import HTTPOk, HTTPNotFound, HTTPCreated, HTTPBadRequest, HTTPNoContent
 import json
-import uuid
-
-# Import fungsi utilitas dari json_utils.py
-from ..json_utils import load_data_from_json, save_data_to_json
-
-# Import sessions_db dari .auth_views
-from .auth_views import sessions_db
-
-# Nama file untuk data playlist dan lagu (akan disimpan di backend/data/)
-PLAYLISTS_DB_FILE = 'playlists.json'
-ALL_SONGS_DB_FILE = 'songs.json'
-
-# --- Data default jika file JSON belum ada ---
-DEFAULT_ALL_SONGS_DB = {
-    's1': {'id': 's1', 'title': 'Mau Dibawa Kemana', 'artist': 'Armada', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3'},
-    's2': {'id': 's2', 'title': 'Senyumlah', 'artist': 'Andmesh', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3'},
-    's3': {'id': 's3', 'title': 'Lemon', 'artist': 'Kenzhi Yonezu', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3'},
-    's4': {'id': 's4', 'title': 'Wind', 'artist': 'Akeboshi', 'url': 'URL_MUSIK_DUMMY_4.mp3'},
-    's5': {'id': 's5', 'title': 'Sparkle', 'artist': 'RADWIMPS', 'url': 'URL_MUSIK_DUMMY_5.mp3'},
-    's6': {'id': 's6', 'title': 'Blur', 'artist': 'Yorushika', 'url': 'URL_MUSIK_DUMMY_6.mp3'},
-    's7': {'id': 's7', 'title': 'Halu', 'artist': 'Feby Putri', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-4.mp3'},
-    's8': {'id': 's8', 'title': 'To The Bone', 'artist': 'Pamungkas', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-5.mp3'},
-    's9': {'id': 's9', 'title': 'Secukupnya', 'artist': 'Hindia', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-6.mp3'},
-    's10': {'id': 's10', 'title': 'Monokrom', 'artist': 'Tulus', 'url': 'https://www.soundhelix.com/examples/mp3/SoundHelix-Song-7.mp3'}
-}
-DEFAULT_PLAYLISTS_DB = {
-    'pl1': {'id': 'pl1', 'name': 'Playlist Pop Indonesia Hits', 'song_ids': ['s1', 's2', 's9', 's10']},
-    'pl2': {'id': 'pl2', 'name': 'Santai Sore OST Anime', 'song_ids': ['s3', 's4', 's5', 's6']},
-    'pl3': {'id': 'pl3', 'name': 'Indie Favorit', 'song_ids': ['s7', 's8']},
-}
-# -------------------------------------------
-
-# Muat data dari file JSON, gunakan data default jika file tidak ada/kosong
-ALL_SONGS_DB = load_data_from_json(ALL_SONGS_DB_FILE, DEFAULT_ALL_SONGS_DB)
-PLAYLISTS_DB = load_data_from_json(PLAYLISTS_DB_FILE, DEFAULT_PLAYLISTS_DB)
+import logging
+
+# Backend storage (json/sqlite) dipilih dari development.ini, lihat myapp/storage
+from ..storage import get_storage
+
+# request.user diisi oleh security policy (lihat myapp/security.py)
+from ..security import unauthorized
+
+# Pagination cursor (?limit=&cursor=) dan projection (?fields=)
+from ..pagination import PaginationError, parse_page_params, parse_fields, page_bounds, page_result, project
+
+# Versi per resource untuk ETag / If-None-Match (lihat myapp/versions.py)
+from ..versions import (
+    PLAYLISTS_RESOURCE, SONG_CATALOG_RESOURCE, playlist_resource, bump_versions, not_modified_response,
+)
+
+# Index pencarian lagu di-update per lagu baru (lihat myapp/search_index.py)
+from ..search_index import index_song
+
+# Bytes JSON per lagu di-cache; daftar lagu dirakit tanpa encode ulang (lihat myapp/renderers.py)
+from ..renderers import json_array, song_fragment
+
+# Respons streaming (app_iter) untuk playlist yang sangat panjang
+from ..fastjson import dumps
+from ..streaming import encode_stream, iter_songs_by_ids, parse_stream_format, streaming_response
+
+# Change feed SSE: event kecil per perubahan playlist (lihat myapp/events.py)
+from ..events import publish, playlist_summary
+
+# Validasi batch add/remove/move/order (lihat myapp/storage/playlist_batch.py)
+from ..storage.playlist_batch import PlaylistBatchError, apply_playlist_batch
+
+log = logging.getLogger(__name__)
+
+# Field yang boleh diminta lewat ?fields=
+PLAYLIST_FIELDS = ('id', 'name', 'song_ids', 'song_count', 'owner', 'public')
+SONG_FIELDS = ('id', 'title', 'artist', 'url', 'album', 'source', 'original_id')
+
+# Batas jumlah item per list di body PATCH /api/playlists/{id}/songs
+MAX_BATCH_ITEMS = 5000
+
+
+def _song_fields_from_object(song_object):
+    """Field lagu dari song_object (lagu baru dari Jamendo), atau None jika title/artist/url kurang."""
+    title = song_object.get('title')
+    artist = song_object.get('artist')
+    url = song_object.get('url')
+    if not all([title, artist, url]):
+        return None
+    return {
+        'title': title,
+        'artist': artist,
+        'url': url,
+        'album': song_object.get('album', 'N/A'),
+        'source': song_object.get('source', 'external'),
+        'original_id': song_object.get('original_id')  # ID asli dari Jamendo
+    }
+
+
+# Nilai ?scope= di GET /api/playlists
+PLAYLIST_SCOPES = ('mine', 'public')
+
+
+def _can_view(playlist, email):
+    # Playlist tanpa pemilik (data lama yang belum dimigrasi) tetap terbuka untuk semua user
+    return playlist.get('owner') in (None, email) or playlist.get('public', False)
+
+
+def _can_modify(playlist, email):
+    return playlist.get('owner') in (None, email)
+
+
+def _playlist_for_user(request, storage, playlist_id, modify=False):
+    """
+    Mengembalikan (playlist, None) jika user boleh melihat (modify=False) atau mengubah
+    (modify=True) playlist, atau (None, payload_error) dengan status response sudah diisi.
+    Playlist privat milik user lain dilaporkan 404, seolah tidak ada.
+    """
+    email = request.user['email']
+    playlist = storage.get_playlist(playlist_id)
+    if playlist is None or not _can_view(playlist, email):
+        request.response.status_code = 404
+        return None, {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
+    if modify and not _can_modify(playlist, email):
+        request.response.status_code = 403 # Forbidden
+        return None, {'error': 'Hanya pemilik playlist yang bisa mengubah playlist ini.'}
+    return playlist, None
+
+
+def _shape_playlist(playlist, fields):
+    if fields is None:
+        return playlist
+    # song_count dihitung, tidak disimpan
+    return {field: len(playlist['song_ids']) if field == 'song_count' else playlist[field] for field in fields}
 
 
 @view_config(route_name='api_get_playlists', request_method='GET', renderer='json')
 def get_playlists_view(request):
     """
-    Mengembalikan daftar semua playlist.
+    Mengembalikan daftar playlist milik user (termasuk playlist lama tanpa pemilik).
     MEMBUTUHKAN TOKEN AUTENTIKASI.
+    ?scope=public untuk daftar playlist publik dari semua user.
+    Tanpa ?limit/?cursor: list penuh (seperti sebelumnya).
+    Dengan ?limit/?cursor: {'items': [...], 'next_cursor': ...}.
+    ?fields=id,name,song_count untuk mengirim field tertentu saja.
     """
-    # --- PENGECEKAN TOKEN AUTENTIKASI ---
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
-
-    token = auth_header.split(' ')[-1] # Ambil token setelah 'Bearer '
-
-    # Cek apakah token ada di sessions_db kita
-    # Ingat, sessions_db kita saat ini: {'session_token_string': 'email@example.com'}
-    if token not in sessions_db: 
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Token tidak valid atau sesi telah berakhir.'}
-
-    user_email_from_token = sessions_db.get(token)
-    print(f"GET /api/playlists: Request diizinkan untuk user {user_email_from_token} dengan token {token}")
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
     # --- AKHIR PENGECEKAN TOKEN ---
 
-    # Jika token valid, lanjutkan logika view seperti biasa
-    playlists_list = [playlist_data for playlist_id, playlist_data in PLAYLISTS_DB.items()]
-    return playlists_list
+    try:
+        paginated, limit, cursor = parse_page_params(request)
+        fields = parse_fields(request, PLAYLIST_FIELDS)
+    except PaginationError as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+    scope = request.params.get('scope', 'mine').strip().lower()
+    if scope not in PLAYLIST_SCOPES:
+        request.response.status_code = 400
+        return {'error': f"Parameter \"scope\" tidak dikenal. Pilihan: {', '.join(PLAYLIST_SCOPES)}."}
+
+    not_modified = not_modified_response(request, PLAYLISTS_RESOURCE)
+    if not_modified is not None:
+        return not_modified
+
+    storage = get_storage()
+    if scope == 'public':
+        playlists_list = storage.list_public_playlists()
+    else:
+        # Lewat index pemilik: sebanding dengan jumlah playlist milik user, bukan seluruh playlist
+        playlists_list = storage.list_playlists_by_owner([request.user['email'], None])
+    if not paginated:
+        return [_shape_playlist(playlist, fields) for playlist in playlists_list]
+
+    playlist_ids = [playlist['id'] for playlist in playlists_list]
+    start, end = page_bounds(playlist_ids, limit, cursor)
+    items = [_shape_playlist(playlist, fields) for playlist in playlists_list[start:end]]
+    return page_result(items, playlist_ids, start, end)
 
 @view_config(route_name='api_get_playlist_songs', request_method='GET', renderer='json')
 def get_playlist_songs_view(request):
-    # --- PENGECEKAN TOKEN AUTENTIKASI ---
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
-
-    token = auth_header.split(' ')[-1] 
-    
-    if token not in sessions_db: 
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Token tidak valid atau sesi telah berakhir.'}
-    
-    user_email_from_token = sessions_db.get(token) # Ambil email user jika perlu
-    print(f"Request ke {request.path}: Diizinkan untuk user {user_email_from_token} dengan token.")
+    """
+    Mengembalikan detail lagu di dalam playlist.
+    Mendukung ?limit/?cursor dan ?fields seperti get_playlists_view; hanya lagu
+    di halaman yang diminta yang diambil dari storage.
+    Mode streaming (?stream=true, atau ?format=json|ndjson): seluruh lagu dikirim
+    bertahap lewat app_iter, lagu diambil per potongan (lihat myapp/streaming.py).
+    """
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
     # --- AKHIR PENGECEKAN TOKEN ---
 
+    try:
+        paginated, limit, cursor = parse_page_params(request)
+        fields = parse_fields(request, SONG_FIELDS)
+        stream_format = parse_stream_format(request, default=None)
+    except (PaginationError, ValueError) as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+    if stream_format is None and request.params.get('stream', '').lower() in ('1', 'true', 'yes'):
+        stream_format = 'json'
+    if stream_format is not None and paginated:
+        request.response.status_code = 400
+        return {'error': 'Mode streaming tidak bisa digabung dengan "limit"/"cursor".'}
+
     playlist_id = request.matchdict.get('playlist_id')
-    playlist_data = PLAYLISTS_DB.get(playlist_id)
-    
-    if not playlist_data:
-        request.response.status_code = 404
-        return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
-            
+    storage = get_storage()
+    # Hak akses dicek sebelum conditional GET: ETag mudah ditebak, jadi 304 untuk playlist
+    # privat milik user lain akan membocorkan bahwa playlist itu ada (dan kapan berubah)
+    _, error = _playlist_for_user(request, storage, playlist_id)
+    if error is not None:
+        return error
+    not_modified = not_modified_response(request, playlist_resource(playlist_id), SONG_CATALOG_RESOURCE)
+    if not_modified is not None:
+        return not_modified
+
+    # Dibaca ulang setelah versi diambil, agar body tidak lebih lama dari ETag-nya
+    playlist_data, error = _playlist_for_user(request, storage, playlist_id)
+    if error is not None:
+        return error
+
     song_ids_in_playlist = playlist_data.get('song_ids', [])
+    if stream_format is not None:
+        songs = iter_songs_by_ids(storage, song_ids_in_playlist, context={'playlist_id': playlist_id})
+        encode_song = song_fragment if fields is None else (lambda song: dumps(project(song, fields)))
+        return streaming_response(request, encode_stream(songs, encode_song, stream_format), stream_format)
+
+    start, end = 0, len(song_ids_in_playlist)
+    if paginated:
+        start, end = page_bounds(song_ids_in_playlist, limit, cursor)
+
+    page_song_ids = song_ids_in_playlist[start:end]
+    songs_by_id = storage.get_songs(page_song_ids)
     songs_in_playlist = []
-    for song_id in song_ids_in_playlist:
-        song_detail = ALL_SONGS_DB.get(song_id)
+    for song_id in page_song_ids:
+        song_detail = songs_by_id.get(song_id)
         if song_detail:
-            songs_in_playlist.append(song_detail)
+            songs_in_playlist.append(song_fragment(song_detail) if fields is None else project(song_detail, fields))
         else:
-            print(f"Peringatan: Lagu ID {song_id} di playlist {playlist_id} tidak ditemukan di ALL_SONGS_DB.")
-    return songs_in_playlist
+            log.warning('Lagu di playlist tidak ditemukan di koleksi lagu', extra={'playlist_id': playlist_id, 'song_id': song_id})
+
+    if fields is None:
+        songs_in_playlist = json_array(songs_in_playlist)
+    if not paginated:
+        return songs_in_playlist
+    return page_result(songs_in_playlist, song_ids_in_playlist, start, end)
 
 @view_config(route_name='api_create_playlist', request_method='POST', renderer='json')
 def create_playlist_view(request):
     """
-    Membuat playlist baru.
+    Membuat playlist baru milik user yang login.
     MEMBUTUHKAN TOKEN AUTENTIKASI.
-    Mengharapkan JSON body dengan field "name".
+    Mengharapkan JSON body dengan field "name", opsional "public" (boolean, default false).
     """
-    # --- PENGECEKAN TOKEN AUTENTIKASI (SAMA SEPERTI DI ATAS) ---
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        request.response.status_code = 401
-        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
-    token = auth_header.split(' ')[-1]
-    if token not in sessions_db:
-        request.response.status_code = 401
-        return {'error': 'Token tidak valid atau sesi telah berakhir.'}
-
-    user_email_from_token = sessions_db.get(token)
-    print(f"POST /api/playlists: Request diizinkan untuk user {user_email_from_token} dengan token {token}")
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
+    user_email_from_token = request.user['email']
     # --- AKHIR PENGECEKAN TOKEN ---
 
-    # Jika token valid, lanjutkan logika view seperti biasa
     try:
         data = request.json_body
         playlist_name = data.get('name')
@@ -132,17 +232,17 @@ def create_playlist_view(request):
         if not playlist_name:
             request.response.status_code = 400
             return {'error': 'Nama playlist ("name") dibutuhkan.'}
+        public = data.get('public', False)
+        if not isinstance(public, bool):
+            request.response.status_code = 400
+            return {'error': 'Field "public" harus berupa boolean.'}
 
-        # ... (sisa logika pembuatan playlist sama seperti sebelumnya) ...
-        new_playlist_id = 'pl' + str(len(PLAYLISTS_DB) + 1).zfill(2)
-        while new_playlist_id in PLAYLISTS_DB: 
-            new_playlist_id = 'pl' + str(uuid.uuid4())[:4] 
-
-        new_playlist = {'id': new_playlist_id, 'name': playlist_name, 'song_ids': []}
-        PLAYLISTS_DB[new_playlist_id] = new_playlist
-        save_data_to_json(PLAYLISTS_DB, PLAYLISTS_DB_FILE)
+        new_playlist = get_storage().create_playlist(playlist_name, owner=user_email_from_token, public=public)
+        bump_versions(PLAYLISTS_RESOURCE, playlist_resource(new_playlist['id']))
+        publish('playlist_created', {'playlist': playlist_summary(new_playlist)},
+                owner=user_email_from_token, public=public)
 
-        print(f"Playlist baru ditambahkan oleh {user_email_from_token}: {new_playlist}")
+        log.info('Playlist baru ditambahkan', extra={'playlist_id': new_playlist['id'], 'email': user_email_from_token})
 
         request.response.status_code = 201 # Created
         return new_playlist 
@@ -151,43 +251,93 @@ def create_playlist_view(request):
     except json.JSONDecodeError:
         request.response.status_code = 400
         return {'error': 'Format JSON tidak valid.'}
-    except Exception as e:
-        print(f"Error tak terduga di create_playlist_view oleh {user_email_from_token}: {e}")
+    except Exception:
+        log.exception('Error tak terduga di create_playlist_view', extra={'email': user_email_from_token})
         request.response.status_code = 500
         return {'error': 'Terjadi kesalahan internal pada server saat membuat playlist.'}
     
 @view_config(route_name='api_delete_playlist', request_method='DELETE', renderer='json')
 def delete_playlist_view(request):
-    # --- PENGECEKAN TOKEN AUTENTIKASI ---
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
-
-    token = auth_header.split(' ')[-1] 
-    
-    if token not in sessions_db: 
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Token tidak valid atau sesi telah berakhir.'}
-    
-    user_email_from_token = sessions_db.get(token) # Ambil email user jika perlu
-    print(f"Request ke {request.path}: Diizinkan untuk user {user_email_from_token} dengan token.")
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
     # --- AKHIR PENGECEKAN TOKEN ---
 
     playlist_id = request.matchdict.get('playlist_id')
-    if playlist_id in PLAYLISTS_DB:
-        deleted_playlist_name = PLAYLISTS_DB[playlist_id].get('name', 'Playlist Tanpa Nama')
-        del PLAYLISTS_DB[playlist_id]
-        save_data_to_json(PLAYLISTS_DB, PLAYLISTS_DB_FILE) # Simpan perubahan
+    storage = get_storage()
+    _, error = _playlist_for_user(request, storage, playlist_id, modify=True)
+    if error is not None:
+        return error
+    deleted_playlist = storage.delete_playlist(playlist_id)
+    if deleted_playlist is not None:
+        bump_versions(PLAYLISTS_RESOURCE, playlist_resource(playlist_id))
+        publish('playlist_deleted', {'playlist_id': playlist_id},
+                owner=deleted_playlist.get('owner'), public=deleted_playlist.get('public', False))
+        deleted_playlist_name = deleted_playlist.get('name', 'Playlist Tanpa Nama')
         
-        print(f"Playlist ID {playlist_id} ('{deleted_playlist_name}') telah dihapus.")
+        log.info('Playlist dihapus', extra={'playlist_id': playlist_id})
         return {'message': f"Playlist '{deleted_playlist_name}' (ID: {playlist_id}) berhasil dihapus."}
     else:
         request.response.status_code = 404
         return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
 
+@view_config(route_name='api_update_playlist', request_method='PATCH', renderer='json')
+def update_playlist_view(request):
+    """
+    Mengubah nama dan/atau flag publik playlist. Hanya pemilik playlist.
+    Body JSON: {"name": "...", "public": true} (minimal salah satu).
+    """
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
+    # --- AKHIR PENGECEKAN TOKEN ---
+
+    playlist_id = request.matchdict.get('playlist_id')
+    try:
+        data = request.json_body
+    except json.JSONDecodeError:
+        request.response.status_code = 400
+        return {'error': 'Format JSON tidak valid.'}
+    if not isinstance(data, dict):
+        request.response.status_code = 400
+        return {'error': 'Body harus berupa objek JSON.'}
+
+    name = data.get('name')
+    public = data.get('public')
+    if name is not None and (not isinstance(name, str) or not name.strip()):
+        request.response.status_code = 400
+        return {'error': 'Nama playlist ("name") tidak boleh kosong.'}
+    if public is not None and not isinstance(public, bool):
+        request.response.status_code = 400
+        return {'error': 'Field "public" harus berupa boolean.'}
+    if name is None and public is None:
+        request.response.status_code = 400
+        return {'error': 'Minimal salah satu dari "name" atau "public" dibutuhkan.'}
+
+    storage = get_storage()
+    old_playlist, error = _playlist_for_user(request, storage, playlist_id, modify=True)
+    if error is not None:
+        return error
+    playlist = storage.update_playlist(playlist_id, name=name, public=public)
+    if playlist is None:
+        # Playlist dihapus oleh request lain di tengah jalan
+        request.response.status_code = 404
+        return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
+
+    bump_versions(PLAYLISTS_RESOURCE, playlist_resource(playlist_id))
+    # Playlist yang baru dijadikan privat: user lain tetap perlu tahu agar bisa menghapusnya dari daftar
+    publish('playlist_updated', {'playlist': playlist_summary(playlist)}, owner=playlist.get('owner'),
+            public=old_playlist.get('public', False) or playlist.get('public', False))
+    log.info('Playlist diperbarui', extra={'playlist_id': playlist_id, 'name': name, 'public': public})
+    return playlist
+
 @view_config(route_name='api_add_song_to_playlist', request_method='POST', renderer='json')
 def add_song_to_playlist_view(request):
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
+    # --- AKHIR PENGECEKAN TOKEN ---
+
     playlist_id = request.matchdict.get('playlist_id')
 
     try:
@@ -196,53 +346,39 @@ def add_song_to_playlist_view(request):
         new_song_object_from_body = data.get('song_object')  # Untuk lagu baru dari Jamendo
 
         # --- Validasi Awal ---
-        if playlist_id not in PLAYLISTS_DB:
-            request.response.status_code = 404
-            return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
+        storage = get_storage()
+        _, error = _playlist_for_user(request, storage, playlist_id, modify=True)
+        if error is not None:
+            return error
 
-        playlist = PLAYLISTS_DB[playlist_id]
-        song_added_to_all_songs_db = False  # Flag apakah kita menambah lagu baru ke ALL_SONGS_DB
+        song_added_to_all_songs_db = False  # Flag apakah kita menambah lagu baru ke koleksi lagu
 
         # --- Logika Inti: Memproses song_id atau song_object ---
         actual_song_id_to_link = None  # ID lagu yang akan dimasukkan ke playlist.song_ids
 
         if new_song_object_from_body:
             # Kasus: Menambahkan lagu baru (misalnya dari Jamendo)
-            print(f"Menerima song_object baru: {new_song_object_from_body.get('title')}")
-            title = new_song_object_from_body.get('title')
-            artist = new_song_object_from_body.get('artist')
-            url = new_song_object_from_body.get('url')
-            album = new_song_object_from_body.get('album', 'N/A')
-            source = new_song_object_from_body.get('source', 'external')
-            original_id = new_song_object_from_body.get('original_id')  # ID asli dari Jamendo
-
-            if not all([title, artist, url]):
+            song_fields = _song_fields_from_object(new_song_object_from_body)
+            if song_fields is None:
                 request.response.status_code = 400
                 return {'error': 'Untuk lagu baru, field "title", "artist", dan "url" dibutuhkan.'}
 
-            # Buat ID lokal baru untuk lagu ini
-            local_song_id = 's' + str(len(ALL_SONGS_DB) + 1).zfill(3)  # Contoh: s011, s012
-            while local_song_id in ALL_SONGS_DB:  # Pastikan unik
-                local_song_id = 's_ext_' + uuid.uuid4().hex[:6]
-
-            ALL_SONGS_DB[local_song_id] = {
-                'id': local_song_id,
-                'title': title,
-                'artist': artist,
-                'url': url,
-                'album': album,
-                'source': source,
-                'original_id': original_id
-            }
-            save_data_to_json(ALL_SONGS_DB, ALL_SONGS_DB_FILE)  # Simpan perubahan ke ALL_SONGS_DB
-            song_added_to_all_songs_db = True
+            # Storage membuat ID lokal baru untuk lagu ini (contoh: s011, s012) dan menyimpannya,
+            # kecuali lagu dengan (source, original_id) atau URL yang sama sudah ada di koleksi
+            new_song, song_added_to_all_songs_db = storage.add_song(song_fields)
+            source = song_fields['source']
+            local_song_id = new_song['id']
             actual_song_id_to_link = local_song_id
-            print(f"Lagu baru dari {source} disimpan ke ALL_SONGS_DB dengan ID lokal: {local_song_id}")
+            if song_added_to_all_songs_db:
+                bump_versions(SONG_CATALOG_RESOURCE)
+                index_song(new_song)
+                log.info('Lagu baru disimpan ke koleksi', extra={'song_id': local_song_id, 'source': source})
+            else:
+                log.debug('Lagu sudah ada di koleksi', extra={'song_id': local_song_id, 'source': source})
 
         elif song_id_to_add_from_body:
-            # Kasus: Menambahkan lagu lokal yang sudah ada di ALL_SONGS_DB
-            print(f"Menerima song_id lokal: {song_id_to_add_from_body}")
-            if song_id_to_add_from_body not in ALL_SONGS_DB:
+            # Kasus: Menambahkan lagu lokal yang sudah ada di koleksi lagu
+            if storage.get_song(song_id_to_add_from_body) is None:
                 request.response.status_code = 404
                 return {'error': f'Lagu dengan ID lokal {song_id_to_add_from_body} tidak ditemukan di koleksi.'}
             actual_song_id_to_link = song_id_to_add_from_body
@@ -254,20 +390,27 @@ def add_song_to_playlist_view(request):
 
         # --- Menambahkan actual_song_id_to_link ke playlist ---
         if actual_song_id_to_link:
-            if actual_song_id_to_link in playlist['song_ids']:
-                song_title_info = ALL_SONGS_DB[actual_song_id_to_link].get('title', 'Lagu ini')
-                print(f"Lagu ID {actual_song_id_to_link} ('{song_title_info}') sudah ada di playlist ID {playlist_id} ('{playlist['name']})")
+            playlist, added = storage.add_song_to_playlist(playlist_id, actual_song_id_to_link)
+            if playlist is None:
+                # Playlist dihapus oleh request lain di tengah jalan
+                request.response.status_code = 404
+                return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
+
+            song_title_info = (storage.get_song(actual_song_id_to_link) or {}).get('title', 'Lagu ini')
+            if not added:
+                log.debug('Lagu sudah ada di playlist', extra={'playlist_id': playlist_id, 'song_id': actual_song_id_to_link})
                 return {  # Status 200 OK
                     'message': f"Lagu '{song_title_info}' sudah ada di playlist '{playlist['name']}'.",
                     'playlist': playlist
                 }
 
-            playlist['song_ids'].append(actual_song_id_to_link)
-            save_data_to_json(PLAYLISTS_DB, PLAYLISTS_DB_FILE)  # Simpan perubahan ke PLAYLISTS_DB
-
-            song_title_info = ALL_SONGS_DB[actual_song_id_to_link].get('title', 'Lagu ini')
-            print(f"Lagu ID {actual_song_id_to_link} ('{song_title_info}') ditambahkan ke playlist ID {playlist_id} ('{playlist['name']}')")
-            print(f"PLAYLISTS_DB[{playlist_id}] sekarang: {PLAYLISTS_DB[playlist_id]}")
+            bump_versions(PLAYLISTS_RESOURCE, playlist_resource(playlist_id))
+            publish('song_added', {
+                'playlist_id': playlist_id, 'song': storage.get_song(actual_song_id_to_link),
+                'position': len(playlist['song_ids']) - 1, 'song_count': len(playlist['song_ids'])},
+                owner=playlist.get('owner'), public=playlist.get('public', False))
+            log.info('Lagu ditambahkan ke playlist', extra={
+                'playlist_id': playlist_id, 'song_id': actual_song_id_to_link, 'song_count': len(playlist['song_ids'])})
 
             return {  # Status 200 OK
                 'message': f"Lagu '{song_title_info}' berhasil ditambahkan ke playlist '{playlist['name']}'.",
@@ -281,48 +424,208 @@ def add_song_to_playlist_view(request):
     except json.JSONDecodeError:
         request.response.status_code = 400
         return {'error': 'Format JSON tidak valid.'}
-    except Exception as e:
-        print(f"Error tak terduga di add_song_to_playlist_view: {e}")
+    except Exception:
+        log.exception('Error tak terduga di add_song_to_playlist_view')
         request.response.status_code = 500
         return {'error': 'Terjadi kesalahan internal pada server saat menambah lagu.'}
 
 @view_config(route_name='api_remove_song_from_playlist', request_method='DELETE', renderer='json')
 def remove_song_from_playlist_view(request):
-    # --- PENGECEKAN TOKEN AUTENTIKASI ---
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Header Authorization (Bearer token) dibutuhkan.'}
-
-    token = auth_header.split(' ')[-1] 
-    
-    if token not in sessions_db: 
-        request.response.status_code = 401 # Unauthorized
-        return {'error': 'Token tidak valid atau sesi telah berakhir.'}
-    
-    user_email_from_token = sessions_db.get(token) # Ambil email user jika perlu
-    print(f"Request ke {request.path}: Diizinkan untuk user {user_email_from_token} dengan token.")
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
     # --- AKHIR PENGECEKAN TOKEN ---
 
     playlist_id = request.matchdict.get('playlist_id')
     song_id_to_remove = request.matchdict.get('song_id')
 
-    if playlist_id not in PLAYLISTS_DB:
+    storage = get_storage()
+    _, error = _playlist_for_user(request, storage, playlist_id, modify=True)
+    if error is not None:
+        return error
+    playlist, removed = storage.remove_song_from_playlist(playlist_id, song_id_to_remove)
+
+    if playlist is None:
         request.response.status_code = 404
         return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
     
-    playlist = PLAYLISTS_DB[playlist_id]
-    
-    if song_id_to_remove not in playlist['song_ids']:
+    if not removed:
         request.response.status_code = 404
         return {'error': f"Lagu ID {song_id_to_remove} tidak ditemukan di playlist '{playlist['name']}'."}
-
-    playlist['song_ids'].remove(song_id_to_remove)
-    save_data_to_json(PLAYLISTS_DB, PLAYLISTS_DB_FILE) # Simpan perubahan
     
-    song_title = ALL_SONGS_DB.get(song_id_to_remove, {}).get('title', 'Lagu Tanpa Judul')
-    print(f"Lagu ID {song_id_to_remove} dihapus dari playlist ID {playlist_id}")
+    bump_versions(PLAYLISTS_RESOURCE, playlist_resource(playlist_id))
+    publish('song_removed', {
+        'playlist_id': playlist_id, 'song_id': song_id_to_remove, 'song_count': len(playlist['song_ids'])},
+        owner=playlist.get('owner'), public=playlist.get('public', False))
+    song_title = (storage.get_song(song_id_to_remove) or {}).get('title', 'Lagu Tanpa Judul')
+    log.info('Lagu dihapus dari playlist', extra={'playlist_id': playlist_id, 'song_id': song_id_to_remove})
     return {
         'message': f"Lagu '{song_title}' berhasil dihapus dari playlist '{playlist['name']}'.",
         'playlist': playlist
-    }
\ No newline at end of file
+    }
+
+def _parse_batch_body(data):
+    """
+    Memvalidasi body PATCH. Mengembalikan (add_entries, remove, moves, order) dengan
+    add_entries berupa list ('id', song_id) atau ('object', song_fields).
+    Melempar PlaylistBatchError jika format tidak valid.
+    """
+    if not isinstance(data, dict):
+        raise PlaylistBatchError('Body harus berupa objek JSON.')
+
+    def get_list(name):
+        value = data.get(name)
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            raise PlaylistBatchError(f'Field "{name}" harus berupa list.')
+        if len(value) > MAX_BATCH_ITEMS:
+            raise PlaylistBatchError(f'Field "{name}" maksimal berisi {MAX_BATCH_ITEMS} item.')
+        return value
+
+    def require_song_id(value, name):
+        if not isinstance(value, str) or not value:
+            raise PlaylistBatchError(f'Setiap song_id di "{name}" harus berupa string.')
+        return value
+
+    add_entries = []
+    for position, entry in enumerate(get_list('add')):
+        # Boleh berupa "s001", {"song_id": "s001"}, atau {"song_object": {...}} seperti endpoint POST
+        if isinstance(entry, str):
+            add_entries.append(('id', require_song_id(entry, 'add')))
+        elif isinstance(entry, dict) and entry.get('song_object'):
+            song_fields = None
+            if isinstance(entry['song_object'], dict):
+                song_fields = _song_fields_from_object(entry['song_object'])
+            if song_fields is None:
+                raise PlaylistBatchError(
+                    f'add[{position}]: untuk lagu baru, field "title", "artist", dan "url" dibutuhkan.')
+            add_entries.append(('object', song_fields))
+        elif isinstance(entry, dict) and entry.get('song_id'):
+            add_entries.append(('id', require_song_id(entry['song_id'], 'add')))
+        else:
+            raise PlaylistBatchError(f'add[{position}]: "song_id" atau "song_object" dibutuhkan.')
+
+    remove = [require_song_id(song_id, 'remove') for song_id in get_list('remove')]
+
+    moves = []
+    for position, entry in enumerate(get_list('move')):
+        if not isinstance(entry, dict) or 'song_id' not in entry or 'position' not in entry:
+            raise PlaylistBatchError(f'move[{position}]: "song_id" dan "position" dibutuhkan.')
+        moves.append((require_song_id(entry['song_id'], 'move'), entry['position']))
+
+    order = None
+    if data.get('order') is not None:
+        order = [require_song_id(song_id, 'order') for song_id in get_list('order')]
+
+    if not (add_entries or remove or moves or order is not None):
+        raise PlaylistBatchError('Minimal salah satu dari "add", "remove", "move", atau "order" dibutuhkan.')
+    return add_entries, remove, moves, order
+
+
+@view_config(route_name='api_batch_update_playlist_songs', request_method='PATCH', renderer='json')
+def batch_update_playlist_songs_view(request):
+    """
+    Mengubah banyak lagu di playlist dalam satu request. MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Body JSON (semua field opsional, minimal satu):
+      {
+        "add":    ["s001", {"song_id": "s002"}, {"song_object": {...}}],
+        "remove": ["s003"],
+        "move":   [{"song_id": "s004", "position": 0}],
+        "order":  ["s004", "s001", ...]
+      }
+    Urutan penerapan: remove, add, move, order. Semua perubahan diterapkan sekaligus
+    (satu flush ke storage), atau tidak sama sekali jika ada yang tidak valid.
+    """
+    # --- PENGECEKAN TOKEN AUTENTIKASI (lihat myapp/security.py) ---
+    if request.user is None:
+        return unauthorized(request)
+    # --- AKHIR PENGECEKAN TOKEN ---
+
+    playlist_id = request.matchdict.get('playlist_id')
+
+    try:
+        add_entries, remove, moves, order = _parse_batch_body(request.json_body)
+    except json.JSONDecodeError:
+        request.response.status_code = 400
+        return {'error': 'Format JSON tidak valid.'}
+    except PlaylistBatchError as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    storage = get_storage()
+    playlist, error = _playlist_for_user(request, storage, playlist_id, modify=True)
+    if error is not None:
+        return error
+
+    local_song_ids = [value for kind, value in add_entries if kind == 'id']
+    if local_song_ids:
+        found = storage.get_songs(local_song_ids)
+        missing = [song_id for song_id in dict.fromkeys(local_song_ids) if song_id not in found]
+        if missing:
+            request.response.status_code = 404
+            return {'error': f"Lagu dengan ID lokal berikut tidak ditemukan di koleksi: {', '.join(missing)}."}
+
+    # Batch dicoba dulu pada salinan isi playlist saat ini, SEBELUM lagu baru disimpan:
+    # batch yang ditolak tidak boleh meninggalkan lagu baru di koleksi / index pencarian.
+    # Lagu baru yang belum ada diwakili penanda unik (ID-nya belum ada, jadi tidak mungkin
+    # disebut di move/order).
+    preview_add = []
+    for kind, value in add_entries:
+        if kind == 'id':
+            preview_add.append(value)
+        else:
+            existing = storage.find_song_by_keys(value)
+            preview_add.append(existing['id'] if existing is not None else object())
+    try:
+        apply_playlist_batch(playlist['song_ids'], add=preview_add, remove=remove, moves=moves, order=order)
+    except PlaylistBatchError as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    # Lagu baru disimpan ke koleksi sekaligus (satu flush), duplikat dikenali lewat source/URL
+    songs_fields = [value for kind, value in add_entries if kind == 'object']
+    created_songs = []
+    stored_song_ids = iter(())
+    if songs_fields:
+        stored = storage.add_songs(songs_fields)
+        created_songs = [song for song, created in stored if created]
+        stored_song_ids = iter([song['id'] for song, _ in stored])
+        if created_songs:
+            bump_versions(SONG_CATALOG_RESOURCE)
+            for song in created_songs:
+                index_song(song)
+    add = [value if kind == 'id' else next(stored_song_ids) for kind, value in add_entries]
+
+    try:
+        playlist, summary = storage.update_playlist_songs(playlist_id, add=add, remove=remove, moves=moves, order=order)
+    except PlaylistBatchError as e:
+        # Hanya jika playlist diubah request lain setelah pengecekan di atas
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    if playlist is None:
+        # Playlist dihapus oleh request lain di tengah jalan
+        request.response.status_code = 404
+        return {'error': f'Playlist dengan ID {playlist_id} tidak ditemukan.'}
+
+    if summary['added'] or summary['removed'] or summary['moved']:
+        bump_versions(PLAYLISTS_RESOURCE, playlist_resource(playlist_id))
+        # Urutan bisa berubah banyak: client memuat ulang daftar lagu playlist ini
+        publish('playlist_songs_updated', {
+            'playlist_id': playlist_id, 'added': len(summary['added']), 'removed': len(summary['removed']),
+            'moved': len(summary['moved']), 'song_count': len(playlist['song_ids'])},
+            owner=playlist.get('owner'), public=playlist.get('public', False))
+    log.info('Batch playlist diterapkan', extra={
+        'playlist_id': playlist_id, 'added': len(summary['added']), 'removed': len(summary['removed']),
+        'moved': len(summary['moved']), 'created_songs': len(created_songs)})
+
+    return {
+        'message': (f"Playlist '{playlist['name']}' diperbarui: {len(summary['added'])} lagu ditambahkan, "
+                    f"{len(summary['removed'])} dihapus, {len(summary['moved'])} dipindah."),
+        'added': summary['added'],
+        'removed': summary['removed'],
+        'moved': summary['moved'],
+        'created_songs': [song['id'] for song in created_songs],
+        'playlist': playlist
+    }
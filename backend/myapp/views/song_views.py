@@ -0,0 +1,237 @@
+# file: backend/myapp/views/song_views.py
+
+import logging
+
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.view import view_config
+
+# Backend storage (json/sqlite) dipilih dari development.ini, lihat myapp/storage
+from ..storage import get_storage
+
+# request.user diisi oleh security policy (lihat myapp/security.py)
+from ..security import unauthorized
+
+# Token URL berumur pendek untuk <audio src> (lihat myapp/url_tokens.py)
+from ..url_tokens import get_url_token_signer, song_stream_scope
+
+# Inverted index title/artist/album, lihat myapp/search_index.py
+from ..search_index import get_search_index
+
+# Bytes JSON per lagu di-cache (lihat myapp/renderers.py)
+from ..renderers import json_array, song_fragment
+
+# Ekspor koleksi lagu secara streaming (lihat myapp/streaming.py)
+from ..fastjson import dumps
+from ..pagination import PaginationError, parse_fields, project
+from ..streaming import encode_stream, parse_stream_format, streaming_response
+from ..versions import SONG_CATALOG_RESOURCE, not_modified_response
+
+# File audio lokal dengan dukungan Range (lihat myapp/media.py)
+from ..media import file_body, get_media_library, if_range_matches, multipart_body, parse_range_header
+
+# Proxy + cache pencarian ke Jamendo, lihat myapp/external_search.py
+from ..external_search import ExternalSearchBusy, ExternalSearchError, get_external_search
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Field yang boleh diminta lewat ?fields= pada ekspor
+SONG_FIELDS = ('id', 'title', 'artist', 'url', 'album', 'source', 'original_id')
+
+
+def _parse_search_params(request):
+    """Mengembalikan (query, limit); melempar ValueError berisi pesan error untuk 400."""
+    query = request.params.get('q', '').strip()
+    if not query:
+        raise ValueError('Parameter "q" dibutuhkan.')
+    try:
+        limit = min(max(int(request.params.get('limit', DEFAULT_SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+    except ValueError:
+        raise ValueError('Parameter "limit" harus berupa angka.')
+    return query, limit
+
+
+@view_config(route_name='api_search_songs', request_method='GET', renderer='json')
+def search_songs_view(request):
+    """
+    Mencari lagu di koleksi lokal berdasarkan title, artist, dan album.
+    MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Query: ?q=kata kunci (kata terakhir boleh awalan), ?limit= (maks 100).
+    Mengembalikan list lagu terurut dari yang paling relevan.
+    """
+    if request.user is None:
+        return unauthorized(request)
+
+    try:
+        query, limit = _parse_search_params(request)
+    except ValueError as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    storage = get_storage()
+    ranked = get_search_index(storage).search(query, limit=limit)
+    songs_by_id = storage.get_songs(song_id for song_id, _ in ranked)
+    return json_array([song_fragment(songs_by_id[song_id]) for song_id, _ in ranked if song_id in songs_by_id])
+
+
+@view_config(route_name='api_external_search', request_method='GET', renderer='json')
+def external_search_view(request):
+    """
+    Mencari lagu di Jamendo lewat backend (client ID tidak dikirim ke browser).
+    MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Query: ?q=kata kunci, ?limit= (maks 100).
+    Mengembalikan {'results': [...]} dengan field track Jamendo (id, name, artist_name, audio, ...).
+    Header X-Cache: HIT / MISS / COALESCED.
+    """
+    if request.user is None:
+        return unauthorized(request)
+
+    try:
+        query, limit = _parse_search_params(request)
+    except ValueError as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    try:
+        results, cache_status = get_external_search().search(query, limit=limit)
+    except ExternalSearchBusy as e:
+        request.response.status_code = 503 # Service Unavailable
+        request.response.headers['Retry-After'] = str(e.retry_after)
+        return {'error': 'Layanan pencarian eksternal sedang sibuk, silakan coba lagi sebentar.'}
+    except ExternalSearchError as e:
+        log.warning('Pencarian eksternal gagal: %s', e, extra={'query': query})
+        request.response.status_code = 502 # Bad Gateway
+        return {'error': 'Gagal mengambil hasil pencarian dari Jamendo.'}
+
+    request.response.headers['X-Cache'] = cache_status
+    return {'results': results}
+
+
+@view_config(route_name='api_export_songs', request_method='GET', renderer='json')
+def export_songs_view(request):
+    """
+    Mengekspor seluruh koleksi lagu secara streaming. MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Query: ?format=json (default, array JSON) atau ?format=ndjson (satu lagu per baris),
+    ?fields=id,title untuk field tertentu saja.
+    Lagu dibaca bertahap dari storage.iter_songs() dan langsung dikirim, jadi memori
+    tidak bertambah seiring besarnya koleksi.
+    """
+    if request.user is None:
+        return unauthorized(request)
+
+    try:
+        stream_format = parse_stream_format(request)
+        fields = parse_fields(request, SONG_FIELDS)
+    except (PaginationError, ValueError) as e:
+        request.response.status_code = 400
+        return {'error': str(e)}
+
+    not_modified = not_modified_response(request, SONG_CATALOG_RESOURCE)
+    if not_modified is not None:
+        return not_modified
+
+    encode_song = dumps if fields is None else (lambda song: dumps(project(song, fields)))
+    body = encode_stream(get_storage().iter_songs(), encode_song, stream_format)
+    return streaming_response(request, body, stream_format, filename=f'songs.{stream_format}')
+
+
+@view_config(route_name='api_song_stream_token', request_method='POST', renderer='json')
+def song_stream_token_view(request):
+    """
+    URL stream file audio lokal untuk elemen <audio>, dengan token URL yang hanya
+    berlaku untuk lagu ini dan berumur pendek. MEMBUTUHKAN TOKEN AUTENTIKASI.
+    Mengembalikan {'url': '/api/songs/<id>/stream?token=...', 'expires_in': detik}.
+    """
+    if request.user is None:
+        return unauthorized(request)
+
+    song_id = request.matchdict.get('song_id')
+    song = get_storage().get_song(song_id)
+    if song is None:
+        request.response.status_code = 404
+        return {'error': f'Lagu dengan ID {song_id} tidak ditemukan.'}
+    library = get_media_library()
+    if library.find(song) is None:
+        request.response.status_code = 404
+        return {'error': f'File audio lokal untuk lagu {song_id} tidak tersedia.'}
+
+    token = get_url_token_signer().sign(song_stream_scope(song_id), request.user['email'], library.token_ttl)
+    request.response.cache_control = 'no-store'
+    return {'url': request.route_path('api_stream_song', song_id=song_id, _query={'token': token}),
+            'expires_in': library.token_ttl}
+
+
+@view_config(route_name='api_stream_song', request_method='GET', renderer='json')
+def stream_song_view(request):
+    """
+    Mengirim file audio lokal sebuah lagu (lihat myapp/media.py). MEMBUTUHKAN TOKEN
+    AUTENTIKASI: header Authorization, atau ?token= dari POST .../stream-token karena
+    elemen <audio> tidak bisa mengirim header (token login tidak diterima di URL).
+    Mendukung Range (satu atau beberapa range), If-Range, ETag/If-None-Match dan
+    If-Modified-Since.
+    """
+    song_id = request.matchdict.get('song_id')
+    if request.user is None:
+        url_token = request.params.get('token')
+        if not url_token:
+            return unauthorized(request)
+        if get_url_token_signer().verify(url_token, song_stream_scope(song_id)) is None:
+            request.response.status_code = 401 # Unauthorized
+            return {'error': 'Token URL tidak valid, bukan untuk lagu ini, atau sudah kedaluwarsa.'}
+
+    song = get_storage().get_song(song_id)
+    if song is None:
+        request.response.status_code = 404
+        return {'error': f'Lagu dengan ID {song_id} tidak ditemukan.'}
+    library = get_media_library()
+    media_file = library.find(song)
+    if media_file is None:
+        request.response.status_code = 404
+        return {'error': f'File audio lokal untuk lagu {song_id} tidak tersedia.'}
+
+    response = request.response
+    response.etag = media_file.etag
+    response.headers['Last-Modified'] = media_file.last_modified
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.cache_control = f'private, max-age={library.max_age}'
+    if request.if_none_match:
+        not_modified = media_file.etag in request.if_none_match
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and int(since.timestamp()) >= media_file.mtime
+    if not_modified:
+        return HTTPNotModified(headers={name: response.headers[name] for name in (
+            'ETag', 'Last-Modified', 'Accept-Ranges', 'Cache-Control')})
+
+    ranges = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (if_range is None or if_range_matches(if_range, media_file)):
+        ranges = parse_range_header(range_header, media_file.size)
+    if ranges == []:
+        response.status_code = 416 # Range Not Satisfiable
+        response.headers['Content-Range'] = f'bytes */{media_file.size}'
+        return {'error': 'Range yang diminta berada di luar ukuran file.'}
+
+    head = request.method == 'HEAD'
+    if ranges is None:
+        start, length = 0, media_file.size
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        length = end - start + 1
+        response.status_code = 206 # Partial Content
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{media_file.size}'
+    else:
+        boundary, body_length, body = multipart_body(media_file, ranges)
+        response.status_code = 206
+        response.content_type = f'multipart/byteranges; boundary={boundary}'
+        response.app_iter = [] if head else body
+        response.content_length = body_length
+        return response
+
+    response.content_type = media_file.content_type
+    response.app_iter = [] if head else file_body(request.environ, media_file, start, length)
+    response.content_length = length
+    return response
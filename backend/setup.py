@@ -20,14 +20,24 @@ setup(
     author='Havidz Ridho Pratama', # Ganti dengan nama abang
     author_email='havidz.122140160@student.itera.acid', # Ganti dengan email abang
     keywords='web pyramid pylons music api',
-    packages=find_packages(), # Otomatis mencari paket di dalam proyek (akan menemukan 'myapp')
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'tests', 'tests.*']), # Otomatis mencari paket di dalam proyek (akan menemukan 'myapp')
     include_package_data=True,
     zip_safe=False,
     install_requires=requires, # Dependensi yang didefinisikan di atas
+    extras_require={
+        'benchmark': ['WebTest'], # python -m benchmarks.run (lihat folder benchmarks/)
+        'testing': ['pytest', 'WebTest'], # python -m pytest (dari folder backend/, lihat folder tests/)
+    },
     entry_points={
         'paste.app_factory': [
             'main = myapp:main', # Memberitahu PServe cara menjalankan aplikasi kita
                                  # 'main' di sini merujuk ke fungsi main() di myapp/__init__.py
         ],
+        'console_scripts': [
+            'dedupe_songs = myapp.scripts.dedupe_songs:main', # Gabungkan lagu duplikat di koleksi
+            'fake_jamendo = myapp.scripts.fake_jamendo:main', # Server palsu API Jamendo untuk development
+            'assign_playlist_owner = myapp.scripts.assign_playlist_owner:main', # Migrasi pemilik playlist lama
+            'import_songs = myapp.scripts.import_songs:main', # Import massal katalog lagu (NDJSON/CSV)
+        ],
     },
 )
\ No newline at end of file
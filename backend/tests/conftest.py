@@ -0,0 +1,61 @@
+# file: backend/tests/conftest.py
+#
+# Fixture bersama. Semua file data diarahkan ke direktori sementara per test
+# (sama seperti benchmarks/run.py), jadi test tidak pernah menyentuh backend/data/.
+
+import os
+
+import pytest
+from webtest import TestApp
+
+from myapp import json_utils
+
+PASSWORD = 'rahasia123'
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_utils, 'DATA_DIR', str(tmp_path))
+    # State WAL per nama file dari test sebelumnya tidak boleh ikut terbawa
+    monkeypatch.setattr(json_utils, '_wal_state', {})
+    return tmp_path
+
+
+@pytest.fixture
+def app_settings(data_dir):
+    return {
+        'myapp.storage': 'sqlite',
+        'myapp.storage.sqlite_path': os.path.join(data_dir, 'test.sqlite3'),
+        'myapp.bcrypt.rounds': '4',
+        'myapp.bcrypt.pool_size': '1',
+        'myapp.session.persist': 'false',
+        'myapp.ratelimit.enabled': 'false',
+        'myapp.warmup': 'false',
+        'myapp.media.dir': os.path.join(data_dir, 'media'),
+    }
+
+
+@pytest.fixture
+def make_app(app_settings):
+    """make_app(**settings_tambahan) -> TestApp."""
+    from myapp import main
+
+    def make_app(**overrides):
+        return TestApp(main({}, **{**app_settings, **overrides}))
+    return make_app
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """auth_headers(email) -> header Authorization untuk user baru (signup + login)."""
+
+    def auth_headers(email):
+        app.post_json('/api/signup', {'email': email, 'password': PASSWORD, 'name': email.split('@')[0]})
+        token = app.post_json('/api/login', {'email': email, 'password': PASSWORD}).json['token']
+        return {'Authorization': f'Bearer {token}'}
+    return auth_headers
@@ -0,0 +1,199 @@
+# file: backend/tests/test_event_server.py
+#
+# Sidecar SSE (myapp/event_server.py) dijalankan sungguhan di port acak dengan
+# MemoryEventLog; client-nya socket mentah yang membaca pesan SSE satu per satu.
+
+import socket
+import threading
+
+import pytest
+
+from myapp import event_server
+from myapp.event_server import EventServer
+from myapp.events import MemoryEventLog, format_event_id
+from myapp.fastjson import loads
+from myapp.url_tokens import EVENTS_SCOPE, UrlTokenSigner, get_url_token_signer, set_url_token_signer
+
+TIMEOUT = 5
+
+
+class SSEClient:
+    """Client SSE minimal: request GET mentah, lalu pesan dibaca per blok '\\n\\n'."""
+
+    def __init__(self, port, query, headers=()):
+        self.sock = socket.create_connection(('127.0.0.1', port), timeout=TIMEOUT)
+        lines = [f'GET /api/events?{query} HTTP/1.1', 'Host: 127.0.0.1', *headers]
+        self.sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        self.buffer = b''
+        head = self._read_until(b'\r\n\r\n')
+        self.status = int(head.split(b' ', 2)[1])
+
+    def _read_until(self, separator):
+        while separator not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise EOFError('koneksi ditutup server')
+            self.buffer += chunk
+        block, _, self.buffer = self.buffer.partition(separator)
+        return block
+
+    def next_message(self):
+        """(event, id, data) pesan berikutnya; komentar (ping) dan 'retry:' dilewati."""
+        while True:
+            fields = {}
+            for line in self._read_until(b'\n\n').decode('utf-8').split('\n'):
+                name, _, value = line.partition(': ')
+                fields[name] = value
+            if 'event' in fields:
+                return fields['event'], fields.get('id'), loads(fields['data'])
+
+    def messages_until(self, event_type):
+        messages = []
+        while True:
+            message = self.next_message()
+            messages.append(message)
+            if message[0] == event_type:
+                return messages
+
+    def body(self):
+        """Sisa response sampai koneksi ditutup (untuk response JSON non-stream)."""
+        while True:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return self.buffer
+            self.buffer += chunk
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def signer():
+    previous = get_url_token_signer()
+    signer = UrlTokenSigner('rahasia-test')
+    set_url_token_signer(signer)
+    yield signer
+    set_url_token_signer(previous)
+
+
+@pytest.fixture
+def event_log():
+    return MemoryEventLog(buffer_size=20)
+
+
+@pytest.fixture
+def server(event_log, signer):
+    server = EventServer(event_log, port=0, heartbeat=TIMEOUT)
+    assert server.start()
+    return server
+
+
+@pytest.fixture
+def connect(server, signer):
+    clients = []
+
+    def connect(email, query='', headers=()):
+        token = signer.sign(EVENTS_SCOPE, email, 60)
+        client = SSEClient(server.port, f'token={token}&{query}', headers)
+        clients.append(client)
+        return client
+
+    yield connect
+    for client in clients:
+        client.close()
+
+
+def publish(event_log, name, owner=None, public=False):
+    event_log.append('playlist_updated', {'name': name}, owner, public)
+
+
+def test_rejects_missing_or_foreign_tokens(server, signer):
+    for query in ('', 'token=bukan-token', 'token=' + signer.sign('song:s001', 'a@x.id', 60),
+                  'token=' + signer.sign(EVENTS_SCOPE, 'a@x.id', -1)):
+        client = SSEClient(server.port, query)
+        assert client.status == 401, query
+        assert 'error' in loads(client.body())
+        client.close()
+
+
+def test_new_client_gets_ready_with_current_id(connect, event_log):
+    publish(event_log, 'lama')
+    client = connect('a@x.id')
+    assert client.status == 200
+    event, event_id, data = client.next_message()
+    assert (event, event_id, data) == ('ready', format_event_id(event_log.epoch, 1), {'email': 'a@x.id'})
+
+
+def test_live_events_are_filtered_by_visibility(connect, event_log):
+    client = connect('a@x.id')
+    client.messages_until('ready')
+
+    publish(event_log, 'milik-b', owner='b@x.id')
+    publish(event_log, 'milik-a', owner='a@x.id')
+    publish(event_log, 'publik-b', owner='b@x.id', public=True)
+    publish(event_log, 'tanpa-pemilik')
+
+    received = [client.next_message() for _ in range(3)]
+    assert [data['name'] for _, _, data in received] == ['milik-a', 'publik-b', 'tanpa-pemilik']
+    assert [event_id for _, event_id, _ in received] == [format_event_id(event_log.epoch, seq) for seq in (2, 3, 4)]
+
+
+def test_last_event_id_replays_only_missed_visible_events(connect, event_log):
+    for name, owner in (('satu', 'a@x.id'), ('dua', 'b@x.id'), ('tiga', 'a@x.id'), ('empat', None)):
+        publish(event_log, name, owner=owner)
+
+    client = connect('a@x.id', headers=[f'Last-Event-ID: {format_event_id(event_log.epoch, 1)}'])
+    messages = client.messages_until('ready')
+    assert [data.get('name') for _, _, data in messages[:-1]] == ['tiga', 'empat']
+    # 'ready' membawa ID event terakhir di log, termasuk yang tidak terlihat oleh client ini
+    assert messages[-1][1] == format_event_id(event_log.epoch, 4)
+
+    # Query parameter dipakai jika header tidak ada (EventSource baru setelah token diperbarui)
+    client = connect('a@x.id', f'last_event_id={format_event_id(event_log.epoch, 3)}')
+    assert [data.get('name') for _, _, data in client.messages_until('ready')[:-1]] == ['empat']
+
+
+@pytest.mark.parametrize('last_event_id', [
+    'epoch-lain-1',     # proses sudah restart
+    'sampah',
+    '{epoch}-1',        # terlalu lama: sudah keluar dari buffer
+    '{epoch}-\xb2',     # isdigit() tetapi bukan angka ASCII
+])
+def test_unusable_last_event_id_sends_reset(connect, event_log, last_event_id):
+    for index in range(25):
+        publish(event_log, f'lagu-{index}')
+
+    client = connect('a@x.id', headers=[f'Last-Event-ID: {last_event_id.format(epoch=event_log.epoch)}'])
+    messages = client.messages_until('ready')
+    assert [event for event, _, _ in messages] == ['reset', 'ready']
+    assert messages[0][1] == format_event_id(event_log.epoch, 25)
+
+
+def test_slow_client_is_disconnected(connect, event_log, server, monkeypatch):
+    monkeypatch.setattr(event_server, 'CLIENT_QUEUE_SIZE', 2)
+    client = connect('a@x.id')
+    client.messages_until('ready')
+
+    # Loop sidecar ditahan sebentar supaya semua event dibagikan dalam satu putaran
+    # pump: antrean client (2) penuh sebelum stream sempat mengirim apa pun
+    blocked, release = threading.Event(), threading.Event()
+
+    def block_loop():
+        blocked.set()
+        release.wait(TIMEOUT)
+
+    server._loop.call_soon_threadsafe(block_loop)
+    assert blocked.wait(TIMEOUT)
+    for index in range(10):
+        publish(event_log, f'lagu-{index}')
+    release.set()
+
+    received = [client.next_message()[2]['name'] for _ in range(2)]
+    assert received == ['lagu-0', 'lagu-1']
+    with pytest.raises(EOFError):
+        client.next_message()
+
+    # Tersambung ulang dengan ID terakhir yang diterima: sisa event diputar ulang dari log
+    client = connect('a@x.id', headers=[f'Last-Event-ID: {format_event_id(event_log.epoch, 2)}'])
+    replayed = [data['name'] for _, _, data in client.messages_until('ready')[:-1]]
+    assert replayed == [f'lagu-{index}' for index in range(2, 10)]
@@ -0,0 +1,221 @@
+# file: backend/tests/test_json_utils.py
+#
+# Write-ahead log di myapp/json_utils.py: replay setelah crash, compaction yang
+# berjalan bersamaan dengan penulisan, dan flush saat proses berhenti.
+# "Restart" disimulasikan dengan mengosongkan state per file (_wal_state).
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from myapp import json_utils
+from myapp.fastjson import dumps
+
+FILENAME = 'data.json'
+
+pytestmark = pytest.mark.usefixtures('data_dir')
+
+
+def restart(monkeypatch):
+    """State di memori dibuang; yang tersisa hanya file di disk."""
+    monkeypatch.setattr(json_utils, '_wal_state', {})
+    return json_utils.load_data_from_json(FILENAME)
+
+
+def record(op, key, value=None):
+    return dumps({'op': op, 'k': key, 'v': value} if op == 'put' else {'op': op, 'k': key})
+
+
+@pytest.mark.parametrize('decoder', ['fastjson', 'json'])
+@pytest.mark.parametrize('torn_tail', [
+    b'{"op":"put","k":"c","v":"setengah',      # terpotong di tengah string
+    '{"op":"put","k":"c","v":"lagu é'.encode('utf-8')[:-1],  # terpotong di tengah karakter UTF-8
+], ids=['tengah-string', 'tengah-utf8'])
+def test_replay_ignores_torn_last_line_and_later_appends_survive(data_dir, monkeypatch, decoder, torn_tail):
+    if decoder == 'json':
+        # Fallback tanpa orjson: json.loads melempar UnicodeDecodeError untuk byte UTF-8 terpotong
+        monkeypatch.setattr(json_utils, 'loads', json.loads)
+    (data_dir / FILENAME).write_bytes(dumps({'a': 1}))
+    (data_dir / (FILENAME + json_utils.WAL_SUFFIX)).write_bytes(
+        record('put', 'b', 2) + b'\n' + record('del', 'a') + b'\n' + torn_tail)
+
+    data = json_utils.load_data_from_json(FILENAME)
+    assert data == {'b': 2}
+
+    data['d'] = 4
+    json_utils.save_data_to_json(data, FILENAME, changed_keys=['d'])
+    # Record baru tidak boleh tersambung ke sisa baris yang terpotong
+    assert restart(monkeypatch) == {'b': 2, 'd': 4}
+
+
+def test_replay_keeps_last_record_missing_only_its_newline(data_dir, monkeypatch):
+    (data_dir / (FILENAME + json_utils.WAL_SUFFIX)).write_bytes(record('put', 'a', 1) + b'\n' + record('put', 'b', 2))
+
+    data = json_utils.load_data_from_json(FILENAME)
+    assert data == {'a': 1, 'b': 2}
+    data['c'] = 3
+    json_utils.save_data_to_json(data, FILENAME, changed_keys=['c'])
+    assert restart(monkeypatch) == {'a': 1, 'b': 2, 'c': 3}
+
+
+@pytest.mark.parametrize('bad_record', [
+    b'1', b'[]', b'"x"', b'null',
+    b'{"op":"put","v":1}',         # tanpa 'k'
+    b'{"op":"put","k":"c"}',       # tanpa 'v'
+    b'{"op":"del"}',
+    b'{"op":"ganti","k":"a"}',
+    b'{"k":"a"}',
+])
+def test_replay_skips_records_that_are_not_put_or_del(data_dir, bad_record):
+    (data_dir / (FILENAME + json_utils.WAL_SUFFIX)).write_bytes(
+        record('put', 'a', 1) + b'\n' + bad_record + b'\n' + record('put', 'b', 2) + b'\n')
+
+    assert json_utils.load_data_from_json(FILENAME) == {'a': 1, 'b': 2}
+
+
+def test_replay_includes_leftover_compacting_log(data_dir, monkeypatch):
+    # Crash setelah log di-rename ke '.log.compacting' tetapi sebelum snapshot baru ditulis
+    (data_dir / FILENAME).write_bytes(dumps({'a': 1}))
+    (data_dir / (FILENAME + json_utils.WAL_COMPACTING_SUFFIX)).write_bytes(record('put', 'a', 2) + b'\n')
+    (data_dir / (FILENAME + json_utils.WAL_SUFFIX)).write_bytes(record('put', 'b', 3) + b'\n')
+
+    assert json_utils.load_data_from_json(FILENAME) == {'a': 2, 'b': 3}
+
+
+def test_compaction_concurrent_with_writes_loses_nothing(data_dir, monkeypatch):
+    # Ambang kecil: compaction background juga ikut terpicu di tengah penulisan
+    monkeypatch.setattr(json_utils, 'WAL_COMPACT_THRESHOLD_BYTES', 2048)
+    data = json_utils.load_data_from_json(FILENAME)
+    writers, rounds = 4, 200
+    done = threading.Event()
+    compactions = 0
+
+    def write(writer):
+        for index in range(rounds):
+            key = f'w{writer}-{index % 20}'
+            # Nilai lama tidak diubah di tempat (diserialisasi saat flush)
+            data[key] = {'writer': writer, 'round': index}
+            changed = [key]
+            if index % 7 == 0:
+                removed = f'w{writer}-{(index + 10) % 20}'
+                data.pop(removed, None)
+                changed.append(removed)
+            json_utils.save_data_to_json(data, FILENAME, changed_keys=changed, wait=index % 3 == 0)
+
+    def compact():
+        nonlocal compactions
+        while not done.is_set():
+            json_utils.compact_json_log(FILENAME)
+            compactions += 1
+
+    compactor = threading.Thread(target=compact)
+    compactor.start()
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    compactor.join()
+
+    json_utils.flush_json_logs()
+    state = json_utils._get_state(FILENAME)
+    with state['snapshot_lock']:  # menunggu compaction background yang mungkin masih jalan
+        pass
+    assert compactions > 0
+    expected = dict(data)
+    assert restart(monkeypatch) == expected
+    assert not os.path.exists(data_dir / (FILENAME + json_utils.WAL_COMPACTING_SUFFIX))
+
+
+EXIT_SCRIPT = '''
+import sys
+from myapp import json_utils
+json_utils.DATA_DIR = sys.argv[1]
+# Flusher tidak pernah menulis: satu-satunya jalan ke disk adalah flush_json_logs() dari atexit
+json_utils._flusher_loop = lambda filename: None
+data = json_utils.load_data_from_json({filename!r})
+for index in range(50):
+    data['k%d' % index] = index
+    json_utils.save_data_to_json(data, {filename!r}, changed_keys=['k%d' % index], wait=False)
+del data['k0']
+json_utils.save_data_to_json(data, {filename!r}, changed_keys=['k0'], wait=False)
+'''
+
+
+def test_flush_json_logs_at_exit_writes_pending_keys(data_dir, monkeypatch):
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', EXIT_SCRIPT.format(filename=FILENAME), str(data_dir)],
+                   cwd=backend_dir, check=True, timeout=60)
+
+    assert restart(monkeypatch) == {f'k{index}': index for index in range(1, 50)}
+
+
+def test_flush_json_logs_without_flusher(data_dir, monkeypatch):
+    monkeypatch.setattr(json_utils, '_flusher_loop', lambda filename: None)
+    data = json_utils.load_data_from_json(FILENAME)
+    data['a'] = 1
+    ticket = json_utils.save_data_to_json(data, FILENAME, changed_keys=['a'], wait=False)
+    assert json_utils._get_state(FILENAME)['flushed'] < ticket
+
+    json_utils.flush_json_logs()
+    assert json_utils._get_state(FILENAME)['flushed'] >= ticket
+    assert restart(monkeypatch) == {'a': 1}
+
+
+@pytest.fixture
+def failing_fsync(monkeypatch):
+    """Selama list ini tidak kosong, fsync (juga milik flusher) gagal seperti disk penuh."""
+    failing = []
+    fsync = os.fsync
+
+    def maybe_failing_fsync(fd):
+        if failing:
+            raise OSError(28, 'No space left on device')
+        fsync(fd)
+
+    monkeypatch.setattr(json_utils.os, 'fsync', maybe_failing_fsync)
+    return failing
+
+
+def test_failed_flush_keeps_keys_dirty_and_raises(data_dir, monkeypatch, failing_fsync):
+    monkeypatch.setattr(json_utils, '_flusher_loop', lambda filename: None)
+    data = json_utils.load_data_from_json(FILENAME)
+    data['a'] = 1
+    ticket = json_utils.save_data_to_json(data, FILENAME, changed_keys=['a'], wait=False)
+
+    failing_fsync.append(True)
+    json_utils.flush_json_logs()
+    state = json_utils._get_state(FILENAME)
+    assert state['flushed'] < ticket and state['dirty'] == {'a'}
+    with pytest.raises(json_utils.JsonFlushError):
+        json_utils.wait_for_json_flush(FILENAME, ticket)
+
+    # Flush berikutnya yang berhasil ikut menulis key yang tadi gagal
+    failing_fsync.clear()
+    data['b'] = 2
+    later = json_utils.save_data_to_json(data, FILENAME, changed_keys=['b'], wait=False)
+    json_utils.flush_json_logs()
+    json_utils.wait_for_json_flush(FILENAME, ticket)
+    json_utils.wait_for_json_flush(FILENAME, later)
+    assert restart(monkeypatch) == {'a': 1, 'b': 2}
+
+
+def test_save_with_wait_raises_when_flusher_fails(data_dir, monkeypatch, failing_fsync):
+    monkeypatch.setattr(json_utils, 'WAL_RETRY_DELAY', 0.01)
+    data = json_utils.load_data_from_json(FILENAME)
+    data['a'] = 1
+    failing_fsync.append(True)
+    with pytest.raises(json_utils.JsonFlushError):
+        json_utils.save_data_to_json(data, FILENAME, changed_keys=['a'])
+
+    # Flusher terus mencoba lagi; setelah disk pulih mutasi tadi tetap tertulis
+    failing_fsync.clear()
+    state = json_utils._get_state(FILENAME)
+    with state['cond']:
+        assert state['cond'].wait_for(lambda: state['flushed'] >= state['requested'], timeout=5)
+    assert restart(monkeypatch) == {'a': 1}
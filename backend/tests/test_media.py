@@ -0,0 +1,231 @@
+# file: backend/tests/test_media.py
+#
+# GET /api/songs/{song_id}/stream (myapp/media.py + views/song_views.py): Range
+# (suffix, bertumpuk, multi-range, 416), If-Range, dan file di luar direktori media.
+
+import os
+
+import pytest
+
+from myapp.media import MAX_RANGES, parse_range_header
+from myapp.storage import get_storage
+
+CONTENT = bytes(range(256)) * 4  # 1024 byte
+SIZE = len(CONTENT)
+
+
+@pytest.fixture
+def media_dir(data_dir):
+    path = data_dir / 'media'
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def user(app, auth_headers):
+    return auth_headers('pendengar@x.id')
+
+
+def add_song(url, title='Lagu'):
+    (song, _), = get_storage().add_songs([{'title': title, 'artist': 'Penyanyi', 'url': url}])
+    return song['id']
+
+
+@pytest.fixture
+def song_id(app, media_dir):
+    (media_dir / 'lagu.mp3').write_bytes(CONTENT)
+    return add_song('lagu.mp3')
+
+
+def stream(app, headers, song_id, status=(200, 206), **extra_headers):
+    return app.get(f'/api/songs/{song_id}/stream', headers={**headers, **extra_headers}, status=status)
+
+
+def multipart_parts(response):
+    """[(Content-Range, isi)] dari body multipart/byteranges."""
+    boundary = response.headers['Content-Type'].split('boundary=')[1]
+    parts = []
+    for chunk in response.body.split(f'--{boundary}'.encode('ascii'))[1:-1]:
+        head, _, body = chunk.partition(b'\r\n\r\n')
+        assert body.endswith(b'\r\n')
+        headers = dict(line.split(': ', 1) for line in head.decode('ascii').strip().split('\r\n'))
+        parts.append((headers['Content-Range'], body[:-2]))
+    assert response.body.endswith(f'--{boundary}--\r\n'.encode('ascii'))
+    return parts
+
+
+# --- parse_range_header ---
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-9', [(0, 9)]),
+    ('bytes=-10', [(SIZE - 10, SIZE - 1)]),                # suffix
+    ('bytes=-5000', [(0, SIZE - 1)]),                      # suffix lebih panjang dari file
+    ('bytes=1000-', [(1000, SIZE - 1)]),
+    ('bytes=1000-99999', [(1000, SIZE - 1)]),              # akhir dipotong ke ukuran file
+    ('bytes=0-9,5-14', [(0, 14)]),                         # bertumpuk
+    ('bytes=0-4,5-9', [(0, 9)]),                           # bersebelahan
+    ('bytes=20-29,0-9', [(0, 9), (20, 29)]),               # diurutkan
+    ('bytes=-10,1000-', [(1000, SIZE - 1)]),               # suffix bertumpuk dengan range biasa
+    ('bytes=0-0, -1', [(0, 0), (SIZE - 1, SIZE - 1)]),
+    ('bytes=0-9,2000-3000', [(0, 9)]),                     # range yang tidak bisa dipenuhi dibuang
+    ('bytes=1024-', []),                                   # semua di luar file: 416
+    ('bytes=-0', []),
+    ('bytes=5-2', None),                                   # tidak valid: header diabaikan
+    ('bytes=-', None),
+    ('bytes=a-b', None),
+    ('bytes=\xb2-', None),                                # isdigit() tetapi bukan angka ASCII
+    ('items=0-9', None),
+    ('bytes=', None),
+    ('bytes=' + ','.join(f'{n * 10}-{n * 10 + 1}' for n in range(MAX_RANGES + 1)), None),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, SIZE) == expected
+
+
+# --- View stream ---
+
+def test_full_file_and_headers(app, user, song_id):
+    response = stream(app, user, song_id, status=200)
+    assert response.body == CONTENT
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['Content-Type'] == 'audio/mpeg'
+    assert response.headers['Cache-Control'].startswith('private')
+
+
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=-100', SIZE - 100, SIZE - 1),
+    ('bytes=-5000', 0, SIZE - 1),
+    ('bytes=100-199,150-299', 100, 299),
+    ('bytes=10-19,20-29,0-9', 0, 29),
+])
+def test_single_range_after_suffix_or_merge(app, user, song_id, header, start, end):
+    response = stream(app, user, song_id, status=206, Range=header)
+    assert response.headers['Content-Range'] == f'bytes {start}-{end}/{SIZE}'
+    assert response.body == CONTENT[start:end + 1]
+    assert int(response.headers['Content-Length']) == end - start + 1
+
+
+def test_multiple_ranges_are_sent_as_multipart(app, user, song_id):
+    response = stream(app, user, song_id, status=206, Range='bytes=500-509,-6,0-3,2-5')
+    assert response.headers['Content-Type'].startswith('multipart/byteranges; boundary=')
+    assert int(response.headers['Content-Length']) == len(response.body)
+    assert multipart_parts(response) == [
+        (f'bytes 0-5/{SIZE}', CONTENT[0:6]),
+        (f'bytes 500-509/{SIZE}', CONTENT[500:510]),
+        (f'bytes {SIZE - 6}-{SIZE - 1}/{SIZE}', CONTENT[-6:]),
+    ]
+
+
+def test_max_ranges(app, user, song_id):
+    specs = [f'{n * 10}-{n * 10 + 1}' for n in range(MAX_RANGES)]
+    response = stream(app, user, song_id, status=206, Range='bytes=' + ','.join(specs))
+    assert len(multipart_parts(response)) == MAX_RANGES
+
+    # Lebih dari MAX_RANGES: header diabaikan, seluruh file dikirim
+    specs.append(f'{MAX_RANGES * 10}-{MAX_RANGES * 10 + 1}')
+    response = stream(app, user, song_id, status=200, Range='bytes=' + ','.join(specs))
+    assert response.body == CONTENT
+    assert 'Content-Range' not in response.headers
+
+
+@pytest.mark.parametrize('header', [f'bytes={SIZE}-', f'bytes={SIZE}-{SIZE + 10},{SIZE * 2}-', 'bytes=-0'])
+def test_unsatisfiable_range(app, user, song_id, header):
+    response = stream(app, user, song_id, status=416, Range=header)
+    assert response.headers['Content-Range'] == f'bytes */{SIZE}'
+    assert 'error' in response.json
+
+
+@pytest.mark.parametrize('header', ['bytes=5-2', 'bytes=\xb2-', 'bytes=0-\xb9', 'halaman=1'])
+def test_invalid_range_is_ignored(app, user, song_id, header):
+    assert stream(app, user, song_id, status=200, Range=header).body == CONTENT
+
+
+def test_if_range(app, user, song_id):
+    full = stream(app, user, song_id, status=200)
+    etag, last_modified = full.headers['ETag'], full.headers['Last-Modified']
+
+    for validator in (etag, last_modified):
+        response = stream(app, user, song_id, status=206, Range='bytes=0-9', **{'If-Range': validator})
+        assert response.body == CONTENT[:10]
+
+    # Validator lama (file sudah berubah), ETag lemah, atau tanggal lain: seluruh file dikirim
+    for validator in ('"1-2"', f'W/{etag}', 'Thu, 01 Jan 2015 00:00:00 GMT', 'bukan-tanggal'):
+        response = stream(app, user, song_id, status=200, Range='bytes=0-9', **{'If-Range': validator})
+        assert response.body == CONTENT, validator
+
+
+def test_if_range_after_file_changed(app, user, song_id, media_dir):
+    etag = stream(app, user, song_id, status=200).headers['ETag']
+    path = media_dir / 'lagu.mp3'
+    path.write_bytes(CONTENT[::-1])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    response = stream(app, user, song_id, status=200, Range='bytes=0-9', **{'If-Range': etag})
+    assert response.body == CONTENT[::-1]
+
+
+def test_conditional_get(app, user, song_id):
+    etag = stream(app, user, song_id).headers['ETag']
+    stream(app, user, song_id, status=304, **{'If-None-Match': etag})
+
+
+# --- File di luar direktori media ---
+
+@pytest.fixture
+def outside_file(data_dir):
+    path = data_dir / 'rahasia.mp3'
+    path.write_bytes(b'bukan untuk umum')
+    return path
+
+
+@pytest.mark.parametrize('url', ['../rahasia.mp3', 'sub/../../rahasia.mp3', '..', 'lagu.mp3/../../rahasia.mp3'])
+def test_dot_dot_escape_is_not_served(app, user, media_dir, outside_file, url):
+    song_id = add_song(url)
+    response = stream(app, user, song_id, status=404)
+    assert 'error' in response.json
+
+
+def test_absolute_url_is_not_served(app, user, media_dir, outside_file):
+    stream(app, user, add_song(str(outside_file)), status=404)
+
+
+def test_symlink_escape_is_not_served(app, user, media_dir, outside_file):
+    os.symlink(outside_file, media_dir / 'tautan.mp3')
+    os.symlink(outside_file.parent, media_dir / 'folder')
+    stream(app, user, add_song('tautan.mp3'), status=404)
+    stream(app, user, add_song('folder/rahasia.mp3'), status=404)
+
+    # Symlink yang tetap di dalam direktori media boleh
+    (media_dir / 'asli.mp3').write_bytes(CONTENT)
+    os.symlink(media_dir / 'asli.mp3', media_dir / 'alias.mp3')
+    assert stream(app, user, add_song('alias.mp3'), status=200).body == CONTENT
+
+
+def test_symlinked_song_id_file_outside_is_not_served(app, user, media_dir, outside_file):
+    # Fallback <song_id>.<ext> juga melewati pemeriksaan yang sama
+    song_id = add_song('https://contoh.id/lagu.mp3')
+    os.symlink(outside_file, media_dir / f'{song_id}.mp3')
+    stream(app, user, song_id, status=404)
+
+
+def test_non_audio_extension_is_not_served(app, user, media_dir):
+    (media_dir / 'catatan.txt').write_bytes(b'teks')
+    stream(app, user, add_song('catatan.txt'), status=404)
+
+
+# --- Token URL ---
+
+def test_stream_token_is_scoped_to_one_song(app, user, song_id, media_dir):
+    (media_dir / 'lain.mp3').write_bytes(b'lain')
+    other_id = add_song('lain.mp3')
+
+    url = app.post(f'/api/songs/{song_id}/stream-token', headers=user).json['url']
+    assert app.get(url, headers={'Range': 'bytes=0-3'}, status=206).body == CONTENT[:4]
+
+    token = url.split('token=')[1]
+    app.get(f'/api/songs/{other_id}/stream?token={token}', status=401)
+    login_token = user['Authorization'].split(' ')[1]
+    app.get(f'/api/songs/{song_id}/stream?token={login_token}', status=401)
+    app.get(f'/api/songs/{song_id}/stream', status=401)
+    app.post(f'/api/songs/{song_id}/stream-token', status=401)
@@ -0,0 +1,90 @@
+# file: backend/tests/test_passwords.py
+#
+# Batas pekerjaan bcrypt (myapp/passwords.py) di server waitress sungguhan: saat semua
+# slot terpakai, login dibalas 503 + Retry-After, dan thread sisanya tetap melayani
+# request lain. Pool proses diganti executor palsu yang hasilnya dilepas oleh test.
+
+import http.client
+import json
+import threading
+from concurrent.futures import Future
+
+import pytest
+from waitress.server import create_server
+
+from myapp import passwords
+from myapp.passwords import DEFAULT_MAX_IN_FLIGHT, PasswordHasher
+
+TIMEOUT = 5
+THREADS = 2
+PASSWORD = 'rahasia123'
+
+
+class HeldExecutor:
+    """Executor palsu: setiap submit() menunggu sampai test memanggil release()."""
+
+    def __init__(self):
+        self.futures = []
+        self.submitted = threading.Semaphore(0)
+
+    def submit(self, func, *args):
+        future = Future()
+        self.futures.append(future)
+        self.submitted.release()
+        return future
+
+    def release(self, result):
+        for future in self.futures:
+            future.set_result(result)
+
+
+@pytest.fixture
+def server(make_app):
+    app = make_app(**{'myapp.bcrypt.pool_size': '1', 'myapp.bcrypt.max_pending': '8',
+                      'myapp.bcrypt.max_in_flight': str(THREADS - 1)})
+    app.post_json('/api/signup', {'email': 'a@x.id', 'password': PASSWORD, 'name': 'a'})
+    server = create_server(app.app, host='127.0.0.1', port=0, threads=THREADS)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    yield server
+    server.close()
+    thread.join(TIMEOUT)
+
+
+def send(server, method, path, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.effective_port, timeout=TIMEOUT)
+    connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                       headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    result = response.status, response.getheader('Retry-After'), json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_max_in_flight_is_capped():
+    assert PasswordHasher(pool_size=2, max_pending=8).max_in_flight == DEFAULT_MAX_IN_FLIGHT
+    assert PasswordHasher(pool_size=2, max_pending=1, max_in_flight=10).max_in_flight == 3
+    assert PasswordHasher(pool_size=2, max_pending=8, max_in_flight=0).max_in_flight == 1
+
+
+def test_saturated_pool_returns_503_while_other_requests_are_served(server, monkeypatch):
+    executor = HeldExecutor()
+    monkeypatch.setattr(passwords.get_password_hasher(), '_get_executor', lambda: executor)
+
+    # Login pertama memakai satu-satunya slot dan menahan satu thread waitress
+    held = []
+    login = threading.Thread(target=lambda: held.append(
+        send(server, 'POST', '/api/login', {'email': 'a@x.id', 'password': 'salah'})))
+    login.start()
+    assert executor.submitted.acquire(timeout=TIMEOUT)
+
+    status, retry_after, body = send(server, 'POST', '/api/login', {'email': 'a@x.id', 'password': PASSWORD})
+    assert (status, retry_after) == (503, '1')
+    assert 'error' in body
+    # Thread waitress yang tersisa tetap melayani request lain
+    status, _, _ = send(server, 'GET', '/api/ready')
+    assert status == 200
+
+    executor.release((False, None))
+    login.join(TIMEOUT)
+    assert held[0][0] == 401
@@ -0,0 +1,157 @@
+# file: backend/tests/test_playlist_batch.py
+#
+# PATCH /api/playlists/{playlist_id}/songs (batch add/remove/move/order) lewat WebTest,
+# untuk kedua backend storage. Batch yang ditolak tidak boleh mengubah playlist sama sekali.
+
+import pytest
+
+from myapp.storage import get_storage
+from myapp.views import playlist_views
+
+OWNER = 'pemilik@x.id'
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def app(request, make_app):
+    return make_app(**{'myapp.storage': request.param})
+
+
+@pytest.fixture
+def owner(auth_headers):
+    return auth_headers(OWNER)
+
+
+def create_playlist(app, headers, public=False, songs=5):
+    """(playlist_id, [song_id, ...]) untuk playlist baru berisi lagu-lagu baru."""
+    playlist_id = app.post_json('/api/playlists', {'name': 'Favorit', 'public': public}, headers=headers).json['id']
+    song_ids = []
+    if songs:
+        response = app.patch_json(f'/api/playlists/{playlist_id}/songs', {'add': [
+            {'song_object': {'title': f'Lagu {index}', 'artist': 'Penyanyi', 'url': f'https://x.id/{playlist_id}/{index}.mp3'}}
+            for index in range(songs)]}, headers=headers)
+        song_ids = response.json['created_songs']
+    return playlist_id, song_ids
+
+
+def playlist_song_ids(app, headers, playlist_id):
+    return [song['id'] for song in app.get(f'/api/playlists/{playlist_id}/songs', headers=headers).json]
+
+
+def catalog():
+    return sorted(song['id'] for song in get_storage().iter_songs())
+
+
+NEW_SONG = {'song_object': {'title': 'Yatim', 'artist': 'Piatu', 'url': 'https://x.id/yatim.mp3'}}
+
+
+def patch(app, headers, playlist_id, body, status=200):
+    return app.patch_json(f'/api/playlists/{playlist_id}/songs', body, headers=headers, status=status).json
+
+
+def test_remove_then_add_same_song_moves_it_to_the_end(app, owner):
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+
+    result = patch(app, owner, playlist_id, {'remove': [b], 'add': [b, c]})
+    # remove diterapkan sebelum add; c sudah ada di playlist jadi dilewati
+    assert (result['removed'], result['added']) == ([b], [b])
+    assert playlist_song_ids(app, owner, playlist_id) == [a, c, d, e, b]
+
+
+def test_move_and_order_in_one_batch(app, owner):
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+
+    result = patch(app, owner, playlist_id, {'move': [{'song_id': e, 'position': 0}, {'song_id': a, 'position': 1}],
+                                             'order': [a, e, b, c, d]})
+    assert playlist_song_ids(app, owner, playlist_id) == [a, e, b, c, d]
+    assert result['moved'] == [e, a]
+
+
+@pytest.mark.parametrize('body', [
+    lambda a, b, c, d, e: {'remove': [b], 'move': [{'song_id': b, 'position': 0}]},  # dipindah setelah dihapus
+    lambda a, b, c, d, e: {'move': [{'song_id': 'tidak-ada', 'position': 0}]},
+    lambda a, b, c, d, e: {'remove': [e], 'order': [a, b, c, d, e]},                  # order masih memuat lagu yang dihapus
+    lambda a, b, c, d, e: {'add': ['tidak-ada-juga']},
+    lambda a, b, c, d, e: {'order': [a, b, c, d]},                                   # kurang satu
+    lambda a, b, c, d, e: {'order': [a, a, b, c, d]},                                # duplikat
+    lambda a, b, c, d, e: {'add': [{'song_object': {'title': 'Tanpa URL', 'artist': 'X'}}], 'remove': [a]},
+    lambda a, b, c, d, e: {'remove': [a, 7]},
+    lambda a, b, c, d, e: {'order': None},
+    lambda a, b, c, d, e: {'add': 'bukan-list'},
+    # Lagu baru valid, tetapi bagian lain batch ditolak: lagu baru tidak boleh ikut tersimpan
+    lambda a, b, c, d, e: {'add': [NEW_SONG], 'order': ['zz']},
+    lambda a, b, c, d, e: {'add': [NEW_SONG], 'order': [a, b, c, d, e]},
+    lambda a, b, c, d, e: {'add': [NEW_SONG, b], 'move': [{'song_id': 'tidak-ada', 'position': 0}]},
+    lambda a, b, c, d, e: {'add': [NEW_SONG], 'move': [{'song_id': a, 'position': -1}]},
+    lambda a, b, c, d, e: {'add': [NEW_SONG, 'tidak-ada-juga']},
+], ids=['move-removed', 'move-missing', 'order-stale', 'add-unknown', 'order-short', 'order-duplicate',
+        'song-object-invalid', 'remove-non-string', 'empty', 'add-not-list',
+        'new-song-order-unknown', 'new-song-order-missing', 'new-song-move-missing', 'new-song-bad-position',
+        'new-song-add-unknown'])
+def test_rejected_batch_changes_nothing(app, owner, body):
+    playlist_id, song_ids = create_playlist(app, owner)
+    songs_before = catalog()
+
+    result = patch(app, owner, playlist_id, body(*song_ids), status=(400, 404))
+    assert 'error' in result
+    assert playlist_song_ids(app, owner, playlist_id) == song_ids
+    assert catalog() == songs_before
+    assert app.get('/api/songs/search', {'q': 'Yatim'}, headers=owner).json == []
+
+
+def test_existing_song_object_can_be_used_in_order(app, owner):
+    # song_object yang sudah ada di koleksi (URL sama) memakai ID lamanya, jadi boleh disebut di order
+    other_id, (x,) = create_playlist(app, owner, songs=1)
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+    song_object = {'song_object': {'title': 'Lagu 0', 'artist': 'Penyanyi', 'url': f'https://x.id/{other_id}/0.mp3'}}
+
+    result = patch(app, owner, playlist_id, {'add': [song_object], 'order': [x, a, b, c, d, e]})
+    assert (result['added'], result['created_songs']) == ([x], [])
+    assert playlist_song_ids(app, owner, playlist_id) == [x, a, b, c, d, e]
+
+
+def test_max_batch_items(app, owner, monkeypatch):
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+    limit = playlist_views.MAX_BATCH_ITEMS
+
+    # Tepat di batas masih diterima (ID yang tidak ada di playlist dilewati oleh remove)
+    result = patch(app, owner, playlist_id, {'remove': [a] + [f'x{index}' for index in range(limit - 1)]})
+    assert result['removed'] == [a]
+
+    for field, item in (('remove', b), ('add', b), ('order', b), ('move', {'song_id': b, 'position': 0})):
+        result = patch(app, owner, playlist_id, {field: [item] * (limit + 1)}, status=400)
+        assert str(limit) in result['error'], field
+    assert playlist_song_ids(app, owner, playlist_id) == [b, c, d, e]
+
+    monkeypatch.setattr(playlist_views, 'MAX_BATCH_ITEMS', 2)
+    patch(app, owner, playlist_id, {'remove': [b, c, d]}, status=400)
+    patch(app, owner, playlist_id, {'remove': [b, c]})
+    assert playlist_song_ids(app, owner, playlist_id) == [d, e]
+
+
+@pytest.mark.parametrize('position', [-1, '1', 1.5, True, None, [0]])
+def test_invalid_move_position(app, owner, position):
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+
+    result = patch(app, owner, playlist_id, {'remove': [a], 'move': [{'song_id': e, 'position': position}]}, status=400)
+    assert e in result['error']
+    assert playlist_song_ids(app, owner, playlist_id) == [a, b, c, d, e]
+
+
+def test_move_position_past_the_end_is_clamped(app, owner):
+    playlist_id, (a, b, c, d, e) = create_playlist(app, owner)
+
+    result = patch(app, owner, playlist_id, {'move': [{'song_id': a, 'position': 10 ** 9}, {'song_id': b, 'position': 0}]})
+    assert playlist_song_ids(app, owner, playlist_id) == [b, c, d, e, a]
+    # b sudah di posisi 0 setelah a dipindah, jadi tidak dihitung dipindah
+    assert result['moved'] == [a]
+
+
+@pytest.mark.parametrize('public, status', [(False, 404), (True, 403)])
+def test_patch_by_non_owner(app, owner, auth_headers, public, status):
+    playlist_id, song_ids = create_playlist(app, owner, public=public)
+    stranger = auth_headers('orang-lain@x.id')
+
+    result = patch(app, stranger, playlist_id, {'remove': song_ids[:1], 'add': [song_ids[0]]}, status=status)
+    assert 'error' in result
+    patch(app, {}, playlist_id, {'remove': song_ids[:1]}, status=401)
+    assert playlist_song_ids(app, owner, playlist_id) == song_ids
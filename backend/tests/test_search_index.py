@@ -0,0 +1,206 @@
+# file: backend/tests/test_search_index.py
+#
+# SongSearchIndex (myapp/search_index.py): urutan skor per bobot field, ekspansi prefix
+# kata terakhir di sekitar batas bisect, dan refresh dari storage.songs_added_since()
+# pada mode multi-proses.
+
+import os
+
+import pytest
+
+from myapp import search_index, versions
+from myapp.search_index import FIELD_WEIGHTS, PREFIX_MATCH_FACTOR, SongSearchIndex
+from myapp.storage import create_storage
+from myapp.versions import SONG_CATALOG_RESOURCE, MemoryVersionStore, bump_versions
+
+
+def song(song_id, title='', artist='', album=''):
+    return {'id': song_id, 'title': title, 'artist': artist, 'album': album}
+
+
+def build(*songs):
+    index = SongSearchIndex()
+    index.build(songs)
+    return index
+
+
+def test_field_weights_and_prefix_factor_order_results():
+    index = build(
+        song('album', title='Lain', album='Hujan'),
+        song('artist', title='Lain', artist='Hujan'),
+        song('title', title='Hujan'),
+        song('title+artist', title='Hujan', artist='Hujan'),
+        song('prefix', title='Hujanan'),
+    )
+    title, artist, album = FIELD_WEIGHTS['title'], FIELD_WEIGHTS['artist'], FIELD_WEIGHTS['album']
+
+    assert index.search('hujan') == [
+        ('title+artist', title + artist),
+        ('title', title),
+        ('artist', artist),
+        ('prefix', title * PREFIX_MATCH_FACTOR),
+        ('album', album),
+    ]
+    # Satu kata: berhenti setelah `limit` hasil dari bucket skor tertinggi
+    assert index.search('hujan', limit=2) == [('title+artist', title + artist), ('title', title)]
+
+
+def test_multi_word_scores_are_summed_and_only_last_word_is_a_prefix():
+    index = build(
+        song('a', title='Hujan Bulan Juni'),
+        song('b', title='Hujan', artist='Bulan'),
+        song('c', title='Bulan', album='Hujan'),
+        song('d', title='Hujan'),
+    )
+    title, artist, album = FIELD_WEIGHTS['title'], FIELD_WEIGHTS['artist'], FIELD_WEIGHTS['album']
+
+    assert index.search('hujan bulan') == [('a', 2 * title), ('b', title + artist), ('c', title + album)]
+    assert index.search('hujan bul') == [
+        ('a', title + title * PREFIX_MATCH_FACTOR),
+        ('b', title + artist * PREFIX_MATCH_FACTOR),
+        ('c', album + title * PREFIX_MATCH_FACTOR),
+    ]
+    # Kata selain yang terakhir harus cocok utuh
+    assert index.search('huj bulan') == []
+
+
+def test_accents_and_case_are_ignored():
+    index = build(song('s1', title='Crazy in Love', artist='Beyoncé'))
+    assert [song_id for song_id, _ in index.search('BEYONCE')] == ['s1']
+    assert [song_id for song_id, _ in index.search('beyoncé crazy')] == ['s1']
+
+
+@pytest.fixture
+def boundary_index():
+    # Vocabulary terurut: aa, ab, aba, abb, abz, ac, b
+    return build(*(song(f'id-{token}', title=token) for token in ('aa', 'ab', 'aba', 'abb', 'abz', 'ac', 'b')))
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('ab', ['id-ab', 'id-aba', 'id-abb', 'id-abz']),   # kata utuh + semua kata berawalan 'ab', 'ac' tidak ikut
+    ('aba', ['id-aba']),                               # tidak ada kata lain sesudahnya yang berawalan 'aba'
+    ('abc', []),                                       # titik sisip di antara 'abb' dan 'abz'
+    ('abzz', []),                                      # titik sisip tepat setelah 'abz'
+    ('a0', []),                                        # sebelum kata pertama
+    ('zz', []),                                        # setelah kata terakhir (bisect == len)
+    ('a', []),                                         # lebih pendek dari MIN_PREFIX_LENGTH
+    ('b', ['id-b']),                                   # kata utuh tetap cocok walau pendek
+])
+def test_prefix_matching_at_bisect_boundaries(boundary_index, query, expected):
+    results = boundary_index.search(query)
+    assert [song_id for song_id, _ in results] == expected
+    if len(results) > 1:
+        # Kata utuh di depan, hasil ekspansi prefix setelahnya dengan skor yang sama
+        assert results[0][1] > results[1][1] == results[-1][1]
+
+
+def test_prefix_expansion_limits(monkeypatch):
+    index = build(song('exact', title='kat'), *(song(f'kata{n}', title=f'kata{n}') for n in range(10)))
+
+    monkeypatch.setattr(search_index, 'MAX_PREFIX_EXPANSIONS', 3)
+    # Kata utuh 'kat' ada di awal slice bisect tetapi tidak menghabiskan jatah ekspansi
+    assert [song_id for song_id, _ in index.search('kat')] == ['exact', 'kata0', 'kata1', 'kata2']
+
+    monkeypatch.setattr(search_index, 'MAX_PREFIX_EXPANSIONS', 64)
+    monkeypatch.setattr(search_index, 'MAX_PREFIX_POSTINGS', 2)
+    assert [song_id for song_id, _ in index.search('kat')] == ['exact', 'kata0', 'kata1']
+
+
+def test_vocabulary_follows_add_and_remove(boundary_index):
+    boundary_index.add_song(song('id-abc', title='abc'))
+    assert [song_id for song_id, _ in boundary_index.search('ab')] == ['id-ab', 'id-aba', 'id-abb', 'id-abc', 'id-abz']
+
+    boundary_index.remove_song('id-abb')
+    # Lagu yang diperbarui: kata lamanya hilang dari index
+    boundary_index.add_song(song('id-aba', title='zaman'))
+    assert [song_id for song_id, _ in boundary_index.search('ab')] == ['id-ab', 'id-abc', 'id-abz']
+    assert [song_id for song_id, _ in boundary_index.search('zam')] == ['id-aba']
+    assert 'abb' not in boundary_index._vocabulary and 'aba' not in boundary_index._vocabulary
+    assert boundary_index._vocabulary == sorted(boundary_index._vocabulary)
+
+
+def test_add_song_is_ignored_before_build():
+    index = SongSearchIndex()
+    index.add_song(song('s1', title='Hujan'))
+    assert index.search('hujan') == []
+
+
+# --- Refresh pada mode multi-proses ---
+
+@pytest.fixture(params=['json', 'sqlite'])
+def storage(request, data_dir, monkeypatch):
+    # Index, status sinkron, dan counter versi global diganti yang baru per test
+    monkeypatch.setattr(search_index, '_search_index', SongSearchIndex())
+    monkeypatch.setattr(search_index, '_refresh_interval', None)
+    monkeypatch.setattr(search_index, '_last_refresh_check', 0.0)
+    monkeypatch.setattr(search_index, '_synced_version', None)
+    monkeypatch.setattr(search_index, '_song_marker', None)
+    monkeypatch.setattr(versions, '_store', MemoryVersionStore())
+    search_index.enable_refresh(3600)
+    return create_storage({'myapp.storage': request.param,
+                           'myapp.storage.sqlite_path': os.path.join(data_dir, 'test.sqlite3')})
+
+
+def add_from_other_worker(storage, *titles, bump=True):
+    """Lagu disimpan tanpa index_song(), seperti dari worker lain; versi katalog dinaikkan."""
+    stored = storage.add_songs([{'title': title, 'artist': 'Penyanyi', 'url': f'https://x.id/{title}.mp3'}
+                                for title in titles])
+    if bump:
+        bump_versions(SONG_CATALOG_RESOURCE)
+    return [song['id'] for song, _ in stored]
+
+
+def search_ids(storage, query):
+    return [song_id for song_id, _ in search_index.get_search_index(storage).search(query)]
+
+
+def interval_elapsed(monkeypatch):
+    monkeypatch.setattr(search_index, '_last_refresh_check', float('-inf'))
+
+
+def test_refresh_indexes_songs_added_since_last_sync(storage, monkeypatch):
+    (first,) = add_from_other_worker(storage, 'Hujan')
+    assert search_ids(storage, 'hujan') == [first]
+
+    (second,) = add_from_other_worker(storage, 'Bengawan')
+    # Versi katalog baru dicek paling sering sekali per interval
+    assert search_ids(storage, 'bengawan') == []
+    interval_elapsed(monkeypatch)
+    assert search_ids(storage, 'bengawan') == [second]
+
+    # Marker sudah maju: refresh berikutnya hanya membaca lagu yang lebih baru
+    third, fourth = add_from_other_worker(storage, 'Bengawan Solo', 'Kopi')
+    interval_elapsed(monkeypatch)
+    assert sorted(search_ids(storage, 'bengawan')) == sorted([second, third])
+    assert search_ids(storage, 'kopi') == [fourth]
+    assert search_index._song_marker == storage.song_marker()
+
+
+def test_refresh_skipped_while_catalog_version_is_unchanged(storage, monkeypatch):
+    search_ids(storage, 'apa saja')  # build index kosong
+    (song_id,) = add_from_other_worker(storage, 'Hujan', bump=False)
+
+    interval_elapsed(monkeypatch)
+    assert search_ids(storage, 'hujan') == []
+    bump_versions(SONG_CATALOG_RESOURCE)
+    interval_elapsed(monkeypatch)
+    assert search_ids(storage, 'hujan') == [song_id]
+
+
+def test_song_added_during_build_is_indexed_once(storage, monkeypatch):
+    add_from_other_worker(storage, 'Hujan Pertama')
+    iter_songs = storage.iter_songs
+    added = []
+
+    def iter_songs_with_concurrent_insert():
+        # Lagu masuk setelah marker dicatat tetapi sebelum iterasi: terbaca build DAN refresh
+        added.extend(add_from_other_worker(storage, 'Hujan Kedua'))
+        return iter_songs()
+
+    monkeypatch.setattr(storage, 'iter_songs', iter_songs_with_concurrent_insert)
+    assert len(search_ids(storage, 'hujan')) == 2
+
+    interval_elapsed(monkeypatch)
+    results = search_ids(storage, 'hujan')
+    assert sorted(results) == sorted(set(results)) and len(results) == 2
+    assert search_ids(storage, 'kedua') == added
@@ -1,5 +1,4 @@
 import React, { useState, useRef, useEffect } from 'react';
-import axios from 'axios';
 
 const formatTime = (timeInSeconds) => {
   if (isNaN(timeInSeconds) || !isFinite(timeInSeconds) || timeInSeconds < 0) {
@@ -10,6 +9,14 @@ const formatTime = (timeInSeconds) => {
   return `${String(minutes).padStart(2, '0')}:${String(seconds).padStart(2, '0')}`;
 };
 
+// Lagu dengan URL http(s) diputar langsung; selain itu (file lokal, misal 'URL_MUSIK_DUMMY_4.mp3')
+// lewat backend GET /api/songs/{id}/stream yang mendukung Range, jadi seek tidak mengunduh ulang
+// seluruh file. Elemen <audio> tidak bisa mengirim header, jadi URL-nya diminta dulu lewat
+// POST /api/songs/{id}/stream-token: token di query string hanya berlaku untuk lagu itu dan
+// berumur pendek (token login tidak pernah dimasukkan ke URL).
+const hasAudio = (song) => Boolean(song && song.url);
+const isRemoteAudio = (song) => /^https?:\/\//i.test(song.url);
+
 function MainPage({ onLogout }) {
   const fetchWithAuth = async (url, options = {}, onLogoutCallback) => {
     const token = localStorage.getItem('authToken');
@@ -57,6 +64,9 @@ function MainPage({ onLogout }) {
   const [jamendoResults, setJamendoResults] = useState([]);
   const [loadingJamendo, setLoadingJamendo] = useState(false);
   const [jamendoError, setJamendoError] = useState(null);
+  // Dinaikkan untuk memaksa fetch ulang (event 'reset' dari change feed, atau fallback tanpa SSE)
+  const [playlistsReloadKey, setPlaylistsReloadKey] = useState(0);
+  const [songsReloadKey, setSongsReloadKey] = useState(0);
 
   const searchOnJamendo = async () => {
     if (!searchTerm.trim()) {
@@ -69,27 +79,19 @@ function MainPage({ onLogout }) {
     setJamendoResults([]);
     setJamendoError(null);
 
-    const YOUR_JAMENDO_CLIENT_ID = 'c1150464'; 
-
-    if (YOUR_JAMENDO_CLIENT_ID === 'CLIENT_ID_GUA') {
-      console.error("JAMENDO CLIENT ID belum diisi!");
-      setJamendoError("Client ID Jamendo belum dikonfigurasi.");
-      setLoadingJamendo(false);
-      return;
-    }
-
     try {
-      const searchUrl = `https://api.jamendo.com/v3.0/tracks/?client_id=${YOUR_JAMENDO_CLIENT_ID}&format=jsonpretty&limit=20&search=${encodeURIComponent(currentSearchTerm)}`;
+      // Pencarian lewat backend (proxy + cache), client ID Jamendo tidak lagi ada di browser
+      const searchUrl = `/api/external/search?limit=20&q=${encodeURIComponent(currentSearchTerm)}`;
 
-      console.log("MainPage: Calling Jamendo API URL:", searchUrl);
+      console.log("MainPage: Calling backend external search URL:", searchUrl);
 
-      const response = await axios.get(searchUrl);
+      const data = await fetchWithAuth(searchUrl, {}, onLogout);
 
-      console.log("MainPage: Full Jamendo response.data:", response.data); 
+      console.log("MainPage: Full Jamendo response data:", data); 
 
-      if (response.data && response.data.results && response.data.results.length > 0) {
-        setJamendoResults(response.data.results);
-        console.log("MainPage: Hasil dari Jamendo ditemukan:", response.data.results);
+      if (data && data.results && data.results.length > 0) {
+        setJamendoResults(data.results);
+        console.log("MainPage: Hasil dari Jamendo ditemukan:", data.results);
       } else {
         setJamendoResults([]);
         console.log("MainPage: Tidak ada hasil dari Jamendo.");
@@ -98,9 +100,8 @@ function MainPage({ onLogout }) {
     } catch (e) {
       console.error("MainPage: Error fetching dari Jamendo:", e);
       let errorMessage = "Gagal mengambil data dari Jamendo.";
-      if (e.response) {
-          errorMessage += ` Status: ${e.response.status} - ${e.response.statusText}`;
-          console.error("Jamendo error response data:", e.response.data);
+      if (e.message) {
+          errorMessage += ` ${e.message}`;
       }
       setJamendoError(errorMessage);
       setJamendoResults([]);
@@ -110,6 +111,12 @@ function MainPage({ onLogout }) {
   };
 
   const audioRef = useRef(null);
+  // ID lagu yang URL-nya sedang terpasang di elemen <audio>
+  const audioSongIdRef = useRef(null);
+  // State change feed SSE (/api/events), dipakai di handler event tanpa closure basi
+  const eventsConnectedRef = useRef(false);
+  const userEmailRef = useRef(null);
+  const currentPlaylistIdRef = useRef(null);
 
   console.log('MainPage Render - currentPlaylist:', currentPlaylist?.name, 'nowPlaying:', nowPlaying?.title);
 
@@ -148,7 +155,7 @@ function MainPage({ onLogout }) {
       }
     };
     fetchPlaylistsInitial();
-  }, [onLogout]);
+  }, [onLogout, playlistsReloadKey]);
 
 
   //Fetch lagu lokal untuk currentPlaylist saat currentPlaylist berubah
@@ -175,18 +182,151 @@ function MainPage({ onLogout }) {
     console.log("MainPage: useEffect[currentPlaylist] - currentPlaylist null atau ID tidak ada, songs dikosongkan.");
     setSongs([]);
   }
-}, [currentPlaylist, onLogout]);
+  // Hanya saat playlist yang dipilih berganti (atau dipaksa lewat songsReloadKey); perubahan
+  // isi playlist datang lewat change feed tanpa fetch ulang seluruh daftar lagu
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+}, [currentPlaylist?.id, songsReloadKey, onLogout]);
+
+  useEffect(() => {
+    currentPlaylistIdRef.current = currentPlaylist?.id ?? null;
+  }, [currentPlaylist]);
+
+  // Change feed: delta perubahan playlist lewat server-sent events, pengganti polling/refetch.
+  // EventSource tersambung ulang sendiri dengan Last-Event-ID; event yang terlewat diputar ulang server.
+  // URL-nya memakai token berumur pendek dari POST /api/event-token (token login tidak masuk URL).
+  // Jika server menolak saat tersambung ulang (token sudah kedaluwarsa), token baru diminta dan
+  // stream dilanjutkan dari event terakhir lewat ?last_event_id=.
+  useEffect(() => {
+    if (!localStorage.getItem('authToken') || typeof EventSource === 'undefined') return undefined;
+
+    let source = null;
+    let stopped = false;
+    let retryTimer = null;
+    let lastEventId = null;
+
+    const connect = async () => {
+      let data;
+      try {
+        data = await fetchWithAuth('/api/event-token', { method: 'POST' }, onLogout);
+      } catch (e) {
+        // Change feed tidak aktif / tidak bisa dihubungi: handler tetap memakai fetch biasa
+        console.warn("MainPage: change feed tidak tersedia:", e.message);
+        return;
+      }
+      if (stopped) return;
+      const params = new URLSearchParams({ token: data.token });
+      if (lastEventId) params.set('last_event_id', lastEventId);
+      source = new EventSource(`/api/events?${params}`);
+
+      const on = (type, handler) => source.addEventListener(type, (event) => {
+        if (event.lastEventId) lastEventId = event.lastEventId;
+        handler(JSON.parse(event.data));
+      });
+      const isVisible = (playlist) => playlist.public || playlist.owner === userEmailRef.current;
+      const updateCount = (playlistId, songCount) => {
+        setPlaylists(prev => prev.map(p => (p.id === playlistId ? { ...p, song_count: songCount } : p)));
+      };
+
+      source.onerror = () => {
+        // Selama tersambung ulang, handler kembali memakai fetch biasa
+        eventsConnectedRef.current = false;
+        if (source.readyState === EventSource.CLOSED && !stopped) {
+          retryTimer = setTimeout(connect, 5000);
+        }
+      };
+
+      on('ready', ({ email }) => {
+        userEmailRef.current = email;
+        eventsConnectedRef.current = true;
+      });
+      on('reset', () => {
+        // Terlalu banyak event terlewat (atau server restart): muat ulang semuanya
+        console.log("MainPage: change feed reset, memuat ulang playlists & lagu.");
+        setPlaylistsReloadKey(k => k + 1);
+        setSongsReloadKey(k => k + 1);
+      });
+      on('playlist_created', ({ playlist }) => {
+        setPlaylists(prev => (prev.some(p => p.id === playlist.id) ? prev : [...prev, playlist]));
+      });
+      on('playlist_updated', ({ playlist }) => {
+        if (!isVisible(playlist)) {
+          // Playlist user lain yang dijadikan privat
+          setPlaylists(prev => prev.filter(p => p.id !== playlist.id));
+          setCurrentPlaylist(prev => (prev && prev.id === playlist.id ? null : prev));
+          return;
+        }
+        setPlaylists(prev => (prev.some(p => p.id === playlist.id)
+          ? prev.map(p => (p.id === playlist.id ? { ...p, ...playlist } : p))
+          : [...prev, playlist]));
+        setCurrentPlaylist(prev => (prev && prev.id === playlist.id ? { ...prev, ...playlist } : prev));
+      });
+      on('playlist_deleted', ({ playlist_id }) => {
+        setPlaylists(prev => prev.filter(p => p.id !== playlist_id));
+        setCurrentPlaylist(prev => (prev && prev.id === playlist_id ? null : prev));
+      });
+      on('song_added', ({ playlist_id, song, song_count }) => {
+        updateCount(playlist_id, song_count);
+        if (playlist_id === currentPlaylistIdRef.current && song) {
+          setSongs(prev => (prev.some(s => s.id === song.id) ? prev : [...prev, song]));
+        }
+      });
+      on('song_removed', ({ playlist_id, song_id, song_count }) => {
+        updateCount(playlist_id, song_count);
+        if (playlist_id === currentPlaylistIdRef.current) {
+          setSongs(prev => prev.filter(s => s.id !== song_id));
+        }
+      });
+      on('playlist_songs_updated', ({ playlist_id, song_count }) => {
+        updateCount(playlist_id, song_count);
+        if (playlist_id === currentPlaylistIdRef.current) {
+          setSongsReloadKey(k => k + 1);
+        }
+      });
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+      eventsConnectedRef.current = false;
+    };
+  }, []);
+
+  // Tanpa change feed (belum/tidak tersambung), perubahan lagu dimuat ulang lewat fetch
+  const refreshSongsIfOffline = () => {
+    if (!eventsConnectedRef.current) setSongsReloadKey(k => k + 1);
+  };
 
 
+  const resolveAudioUrl = async (song) => {
+    if (isRemoteAudio(song)) return song.url;
+    const data = await fetchWithAuth(`/api/songs/${encodeURIComponent(song.id)}/stream-token`, { method: 'POST' }, onLogout);
+    return data.url;
+  };
+
   // --- Handler untuk Player Musik (Lokal) ---
-   const handlePlaySong = (song) => {
+   const handlePlaySong = async (song) => {
     console.log('MainPage: handlePlaySong - Target:', song?.title, 'URL:', song?.url);
-    if (song && song.url && !song.url.startsWith('URL_MUSIK_DUMMY')) {
+    if (hasAudio(song)) {
       setNowPlaying(song);
       setCurrentTime(0); // Reset currentTime untuk lagu baru
       setSongDuration(0);
+      let audioUrl;
+      try {
+        audioUrl = await resolveAudioUrl(song);
+      } catch (e) {
+        console.error("MainPage: Gagal mengambil URL audio:", e);
+        audioSongIdRef.current = null;
+        setIsPlaying(false);
+        if (!e.message.toLowerCase().includes('unauthorized')) {
+          setActionMessage(`Error: ${e.message}`);
+        }
+        return;
+      }
       if (audioRef.current) {
-        audioRef.current.src = song.url;
+        audioRef.current.src = audioUrl;
+        audioSongIdRef.current = song.id;
         const playPromise = audioRef.current.play();
         if (playPromise !== undefined) {
           playPromise
@@ -204,21 +344,24 @@ function MainPage({ onLogout }) {
     } else {
       console.warn("URL lagu tidak valid:", song?.title);
       if (audioRef.current) { audioRef.current.pause(); audioRef.current.src = ''; }
+      audioSongIdRef.current = null;
       setNowPlaying(song); setIsPlaying(false); setCurrentTime(0); setSongDuration(0);
     }
   };
 
   const togglePlayPause = () => {
     console.log('MainPage: togglePlayPause - isPlaying:', isPlaying, 'Now Playing:', nowPlaying);
-    if (!audioRef.current || !nowPlaying || !nowPlaying.url || nowPlaying.url.startsWith('URL_MUSIK_DUMMY')) {
+    if (!audioRef.current || !hasAudio(nowPlaying)) {
       console.log("MainPage: Tidak ada lagu valid atau URL untuk diputar/dijeda.");
       setIsPlaying(false); return;
     }
     if (isPlaying) {
       audioRef.current.pause();
     } else {
-      if (audioRef.current.src !== nowPlaying.url && nowPlaying.url) {
-        audioRef.current.src = nowPlaying.url;
+      if (audioSongIdRef.current !== nowPlaying.id) {
+        // URL belum terpasang (atau token stream sudah kedaluwarsa): minta URL baru
+        handlePlaySong(nowPlaying);
+        return;
       }
       const playPromise = audioRef.current.play();
       if (playPromise !== undefined) {
@@ -376,6 +519,7 @@ const handleAddToPlaylist = async (songToAdd) => {
       console.log('MainPage: [AddToPlaylist] responseData.playlist dari backend (yang akan di-set):', responseData.playlist);
       
       setCurrentPlaylist(responseData.playlist);
+      refreshSongsIfOffline();
       
       console.log('MainPage: [AddToPlaylist] PANGGILAN setCurrentPlaylist(responseData.playlist) sudah dilakukan.');
 
@@ -457,9 +601,10 @@ const handleAddToPlaylist = async (songToAdd) => {
 
       if (responseData && responseData.playlist) {
         setCurrentPlaylist(responseData.playlist);
+        refreshSongsIfOffline();
       } else {
         console.warn("Backend tidak mengembalikan objek playlist setelah menambah lagu. Merefresh lagu secara manual.");
-        setCurrentPlaylist(prev => prev ? { ...prev } : null);
+        setSongsReloadKey(k => k + 1);
       }
 
     } catch (e) {
@@ -487,14 +632,16 @@ const handleAddToPlaylist = async (songToAdd) => {
       
       setActionMessage(responseData?.message || `Lagu "${songToRemove?.title || ''}" berhasil dihapus.`);
       if (responseData && responseData.playlist) {
-        setCurrentPlaylist(responseData.playlist); // Ini akan memicu useEffect untuk fetch songs
+        setCurrentPlaylist(responseData.playlist);
+        refreshSongsIfOffline(); // Jika SSE tersambung, event song_removed yang memperbarui daftar lagu
       } else {
         console.warn("MainPage: Backend tidak mengembalikan objek playlist setelah remove song. Memicu refresh lagu manual.");
-        setCurrentPlaylist(prev => prev ? { ...prev } : null); 
+        setSongsReloadKey(k => k + 1);
       }
 
       if (nowPlaying && nowPlaying.id === songIdToRemove) {
         if (audioRef.current) { audioRef.current.pause(); audioRef.current.src = ''; }
+        audioSongIdRef.current = null;
         setNowPlaying(null); setIsPlaying(false);
         setCurrentTime(0); setSongDuration(0);
       }
@@ -558,9 +705,10 @@ const handleAddToPlaylist = async (songToAdd) => {
 
     if (responseData.playlist) {
       setCurrentPlaylist(responseData.playlist);
+      refreshSongsIfOffline();
     } else {
       console.warn("Backend tidak mengembalikan objek playlist setelah menambah lagu Jamendo. Merefresh lagu secara manual.");
-      setCurrentPlaylist(prev => prev ? { ...prev } : null);
+      setSongsReloadKey(k => k + 1);
     }
 
   } catch (e) {
@@ -612,7 +760,7 @@ const handleAddToPlaylist = async (songToAdd) => {
       <audio 
         ref={audioRef} 
         onEnded={() => { if(isPlaying) {handleNextSong();} else {setIsPlaying(false);}}} 
-        onError={(e) => { console.error("MainPage: Audio Element Error:", e.nativeEvent?.target?.error); setIsPlaying(false); setSongDuration(0); setCurrentTime(0); }}
+        onError={(e) => { console.error("MainPage: Audio Element Error:", e.nativeEvent?.target?.error); audioSongIdRef.current = null; setIsPlaying(false); setSongDuration(0); setCurrentTime(0); }}
         onLoadedMetadata={handleLoadedMetadata} 
         onTimeUpdate={handleTimeUpdate}         
       />
@@ -674,7 +822,7 @@ const handleAddToPlaylist = async (songToAdd) => {
           )}
           <div className="flex items-center justify-center space-x-4 sm:space-x-6 mt-4"> {/* Pastikan ada mt-4 jika seek bar hilang atau muncul */}
             <button onClick={handlePreviousSong} disabled={!nowPlaying || songs.length < 2} className="text-brand-dark-text-secondary hover:text-brand-dark-text-primary transition-colors disabled:opacity-50"><svg xmlns="http://www.w3.org/2000/svg" className="h-6 w-6 sm:h-7 sm:w-7" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M11 19l-7-7 7-7m8 14l-7-7 7-7" /></svg></button>
-            <button onClick={togglePlayPause} disabled={!nowPlaying || !nowPlaying.url || nowPlaying.url.startsWith('URL_MUSIK_DUMMY')} className="p-2 sm:p-3 bg-brand-dark-blue-accent text-white rounded-full shadow-lg hover:bg-opacity-80 transition-opacity disabled:opacity-50"> {isPlaying ? (<svg xmlns="http://www.w3.org/2000/svg" className="h-7 w-7 sm:h-8 sm:w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M10 9v6m4-6v6" /></svg>) : (<svg xmlns="http://www.w3.org/2000/svg" className="h-7 w-7 sm:h-8 sm:w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M14.752 11.168l-3.197-2.132A1 1 0 0010 9.87v4.263a1 1 0 001.555.832l3.197-2.132a1 1 0 000-1.664z" /></svg>)}</button>
+            <button onClick={togglePlayPause} disabled={!hasAudio(nowPlaying)} className="p-2 sm:p-3 bg-brand-dark-blue-accent text-white rounded-full shadow-lg hover:bg-opacity-80 transition-opacity disabled:opacity-50"> {isPlaying ? (<svg xmlns="http://www.w3.org/2000/svg" className="h-7 w-7 sm:h-8 sm:w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M10 9v6m4-6v6" /></svg>) : (<svg xmlns="http://www.w3.org/2000/svg" className="h-7 w-7 sm:h-8 sm:w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M14.752 11.168l-3.197-2.132A1 1 0 0010 9.87v4.263a1 1 0 001.555.832l3.197-2.132a1 1 0 000-1.664z" /></svg>)}</button>
             <button onClick={handleNextSong} disabled={!nowPlaying || songs.length < 2} className="text-brand-dark-text-secondary hover:text-brand-dark-text-primary transition-colors disabled:opacity-50"><svg xmlns="http://www.w3.org/2000/svg" className="h-6 w-6 sm:h-7 sm:w-7" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth="2"><path strokeLinecap="round" strokeLinejoin="round" d="M13 5l7 7-7 7M5 5l7 7-7 7" /></svg></button>
           </div>
         </aside>
@@ -10,6 +10,12 @@ export default defineConfig({
     port: 5173, // Pastikan ini port frontend abang
 
     proxy: {
+      // Change feed SSE (/api/events) dilayani sidecar asyncio di port sendiri
+      // (myapp.events.port di development.ini). Harus di atas '/api' agar dicocokkan lebih dulu.
+      '/api/events': {
+        target: 'http://localhost:6544',
+        changeOrigin: true,
+      },
       // Kunci '/api' berarti setiap request dari frontend
       // yang dimulai dengan '/api' akan diproxy.
       // Contoh: jika frontend panggil fetch('/api/users'), request ini akan diproxy.